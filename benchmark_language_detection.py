@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+قياس أداء كشف اللغة - مقارنة langdetect مع الكاشف المتدرج
+
+يستخدم آخر الرسائل المحفوظة في قاعدة البيانات (DATABASE_URL) لتمثيل
+مزيج الرسائل الحقيقي، ويعود إلى عينة مدمجة إذا كانت القاعدة فارغة
+
+الاستخدام:
+    python benchmark_language_detection.py [عدد_الرسائل] [عدد_التكرارات]
+"""
+
+import sys
+import os
+import time
+from collections import Counter
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from langdetect import detect
+
+from src.core.nlp.language_detection import LanguageDetector, detect_by_script
+
+SUPPORTED = ['ar', 'en', 'fr', 'es', 'de', 'it', 'ru']
+
+# عينة تمثل مزيج الأسئلة والردود في المنصة
+SAMPLE_MESSAGES = [
+    "مرحباً، كيف أتعلم البرمجة؟",
+    "ما الفرق بين list و tuple في Python؟",
+    "اشرح لي مفهوم الـ recursion مع مثال",
+    "كيف أستخدم async و await في JavaScript",
+    "How do I reverse a string in Python?",
+    "What is the difference between a process and a thread?",
+    "Explain closures in JavaScript",
+    "Comment créer une classe en Python ?",
+    "¿Cómo funciona un bucle for en Java?",
+    "Wie installiere ich Django?",
+    "Come si dichiara una variabile in Go?",
+    "Как написать функцию на Python?",
+    "شكراً",
+    "ok",
+]
+
+
+def load_messages(limit: int):
+    """تحميل آخر الرسائل من قاعدة البيانات أو العينة المدمجة"""
+    try:
+        from src.core.database.session import db_session
+        from src.core.database.models import Message
+
+        with db_session() as session:
+            rows = (session.query(Message.content)
+                    .order_by(Message.created_at.desc())
+                    .limit(limit)
+                    .all())
+        messages = [content for (content,) in rows if content]
+        if messages:
+            return messages, "database"
+    except Exception as e:
+        print(f"⚠️ تعذر تحميل الرسائل من قاعدة البيانات: {e}")
+
+    return SAMPLE_MESSAGES, "sample"
+
+
+def time_calls(function, messages, repeats: int) -> float:
+    """متوسط زمن الاستدعاء الواحد بالميكروثانية"""
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for message in messages:
+            try:
+                function(message)
+            except Exception:
+                pass
+    elapsed = time.perf_counter() - started
+    return elapsed / (repeats * len(messages)) * 1e6
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    messages, source = load_messages(limit)
+    print(f"📊 {len(messages)} رسالة من {source}، {repeats} تكرارات")
+
+    resolved = sum(1 for message in messages if detect_by_script(message))
+    print(f"   تحسمها مرحلة نظام الكتابة: {resolved}/{len(messages)}")
+
+    # تحميل ملفات langdetect مرة واحدة قبل القياس
+    detect("warm up")
+
+    langdetect_us = time_calls(detect, messages, repeats)
+    script_us = time_calls(detect_by_script, messages, repeats)
+
+    # بدون ذاكرة: كل استدعاء يمر بالمستويين
+    uncached = LanguageDetector(SUPPORTED, memo_size=1)
+    tiered_us = time_calls(uncached._detect_uncached, messages, repeats)
+
+    # مع الذاكرة: الحالة الفعلية عند كشف لغة السؤال ثم الرد
+    memoized = LanguageDetector(SUPPORTED)
+    memoized_us = time_calls(memoized.detect, messages, repeats)
+
+    print(f"   langdetect فقط:          {langdetect_us:10.1f} µs/رسالة")
+    print(f"   نظام الكتابة فقط:        {script_us:10.1f} µs/رسالة")
+    print(f"   المتدرج (بدون ذاكرة):    {tiered_us:10.1f} µs/رسالة")
+    print(f"   المتدرج (مع الذاكرة):    {memoized_us:10.1f} µs/رسالة")
+
+    # مدى التوافق بين الطريقتين
+    disagreements = Counter()
+    for message in messages:
+        try:
+            baseline = detect(message)
+        except Exception:
+            baseline = 'en'
+        baseline = baseline if baseline in SUPPORTED else 'en'
+        tiered = uncached._detect_uncached(message)
+        if baseline != tiered:
+            disagreements[(baseline, tiered)] += 1
+
+    print(f"   اختلافات (langdetect -> متدرج): {dict(disagreements) or 'لا يوجد'}")
+
+
+if __name__ == "__main__":
+    main()
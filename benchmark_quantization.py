@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+قياس أثر تكميم النماذج - مقارنة الدقة والزمن لأوضاع float32 و int8 و bf16
+
+يحمّل نماذج NER و T5 و GPT-2 بكل وضع، ويقيس زمن الاستدلال وحجم النموذج
+والتوافق مع مخرجات float32 (F1 للكيانات، وتطابق/تشابه النص المولد
+بفك ترميز جشع)، ثم يكتب تقريراً بصيغة Markdown
+
+الاستخدام:
+    python benchmark_quantization.py [مسار_التقرير] [عدد_التكرارات]
+"""
+
+import sys
+import os
+import io
+import time
+import statistics
+from difflib import SequenceMatcher
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import torch
+
+from src.core.nlp.quantization import (
+    QUANTIZATION_BF16, QUANTIZATION_INT8, QUANTIZATION_NONE,
+    bf16_supported, load_pipeline
+)
+
+NER_SAMPLES = [
+    "Guido van Rossum created Python while working at CWI in Amsterdam.",
+    "Microsoft released TypeScript and GitHub hosts most of its ecosystem.",
+    "Linus Torvalds wrote Git for the Linux kernel project in Finland.",
+    "Google maintains Go and Kubernetes from Mountain View, California.",
+]
+
+T5_SAMPLES = [
+    "question: What is a Python list? context: programming tutorial",
+    "question: How do I write a for loop? context: programming tutorial",
+    "summarize: A closure is a function that remembers the variables from the scope "
+    "in which it was created, even after that scope has finished executing.",
+    "translate English to German: Functions help you reuse code.",
+]
+
+GPT2_SAMPLES = [
+    "Question: What is recursion in programming?\nAnswer:",
+    "Question: How do I reverse a string in Python?\nAnswer:",
+    "Question: What is the difference between a list and a tuple?\nAnswer:",
+    "Question: Why should I write unit tests?\nAnswer:",
+]
+
+MODELS = {
+    # اسم النموذج: (المهمة، معرف Hub، العينات، معاملات الاستدعاء)
+    "ner": ("ner", "dbmdz/bert-large-cased-finetuned-conll03-english", NER_SAMPLES,
+            {}),
+    "t5": ("text2text-generation", "t5-small", T5_SAMPLES,
+           {"max_length": 64, "do_sample": False}),
+    "gpt2": ("text-generation", "gpt2", GPT2_SAMPLES,
+             {"max_new_tokens": 32, "do_sample": False, "return_full_text": False}),
+}
+
+
+def model_size_mb(model) -> float:
+    """حجم أوزان النموذج المحفوظة بالميغابايت"""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / (1024 * 1024)
+
+
+def run(loaded, samples, call_kwargs):
+    """استدلال على العينات وإعادة المخرجات بصيغة قابلة للمقارنة"""
+    outputs = loaded(samples, **call_kwargs)
+    if loaded.task == "ner":
+        return [{(entity["word"], entity["entity_group"]) for entity in output}
+                for output in outputs]
+
+    texts = []
+    for output in outputs:
+        if isinstance(output, list):
+            output = output[0]
+        texts.append(output["generated_text"].strip())
+    return texts
+
+
+def agreement(task, baseline, outputs) -> str:
+    """التوافق مع مخرجات float32"""
+    if task == "ner":
+        true_positives = sum(len(b & o) for b, o in zip(baseline, outputs))
+        predicted = sum(len(o) for o in outputs)
+        expected = sum(len(b) for b in baseline)
+        if not predicted or not expected:
+            return "F1=n/a"
+        precision = true_positives / predicted
+        recall = true_positives / expected
+        f1 = 2 * precision * recall / (precision + recall) if true_positives else 0.0
+        return f"F1={f1:.3f}"
+
+    exact = sum(1 for b, o in zip(baseline, outputs) if b == o) / len(outputs)
+    similarity = statistics.mean(SequenceMatcher(None, b, o).ratio()
+                                 for b, o in zip(baseline, outputs))
+    return f"تطابق={exact:.0%} تشابه={similarity:.3f}"
+
+
+def benchmark(name, modes, repeats):
+    """قياس نموذج واحد بكل الأوضاع"""
+    task, model_id, samples, call_kwargs = MODELS[name]
+    # نفس معاملات التحميل المستخدمة في NLPPipeline
+    load_kwargs = {"aggregation_strategy": "simple"} if task == "ner" else {}
+    rows = []
+    baseline = None
+
+    for mode in modes:
+        started = time.perf_counter()
+        loaded = load_pipeline(task, model_id, name, mode=mode, **load_kwargs)
+        load_seconds = time.perf_counter() - started
+
+        # تمريرة تسخين خارج القياس
+        outputs = run(loaded, samples, call_kwargs)
+
+        latencies = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            run(loaded, samples, call_kwargs)
+            latencies.append((time.perf_counter() - started) / len(samples) * 1000)
+
+        if baseline is None:
+            baseline = outputs
+        rows.append({
+            "mode": mode,
+            "load": load_seconds,
+            "size": model_size_mb(loaded.model),
+            "latency": statistics.median(latencies),
+            "agreement": agreement(task, baseline, outputs),
+        })
+        print(f"   {name}/{mode}: {rows[-1]['latency']:.1f} ms/عينة، "
+              f"{rows[-1]['agreement']}")
+        del loaded
+
+    return rows
+
+
+def write_report(path, results, repeats):
+    """كتابة تقرير المقارنة بصيغة Markdown"""
+    lines = [
+        "# تقرير تكميم النماذج على المعالج",
+        "",
+        f"- PyTorch: {torch.__version__}، الخيوط: {torch.get_num_threads()}",
+        f"- دعم bf16: {'نعم' if bf16_supported() else 'لا'}",
+        f"- التكرارات: {repeats}، الزمن هو الوسيط لكل عينة",
+        "- التوافق محسوب مقارنة بمخرجات float32",
+        "",
+    ]
+    for name, rows in results.items():
+        baseline_latency = rows[0]["latency"]
+        lines += [
+            f"## {name}",
+            "",
+            "| الوضع | زمن التحميل (s) | الحجم (MB) "
+            "| الزمن (ms/عينة) | التسريع | التوافق |",
+            "|---|---|---|---|---|---|",
+        ]
+        for row in rows:
+            lines.append(
+                f"| {row['mode']} | {row['load']:.1f} | {row['size']:.0f} | "
+                f"{row['latency']:.1f} | {baseline_latency / row['latency']:.2f}x | "
+                f"{row['agreement']} |"
+            )
+        lines.append("")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as report:
+        report.write("\n".join(lines))
+
+
+def main():
+    default_path = os.path.join("reports", "quantization_benchmark.md")
+    path = sys.argv[1] if len(sys.argv) > 1 else default_path
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    modes = [QUANTIZATION_NONE, QUANTIZATION_INT8]
+    if bf16_supported():
+        modes.append(QUANTIZATION_BF16)
+    else:
+        print("⚠️ المعالج لا يدعم bf16؛ تخطي وضع bf16")
+
+    if torch.cuda.is_available():
+        print("⚠️ GPU متوفر؛ التكميم يخص المعالج فقط وستكون كل الأوضاع float16")
+
+    results = {}
+    for name in MODELS:
+        print(f"📊 قياس {name}...")
+        results[name] = benchmark(name, modes, repeats)
+
+    write_report(path, results, repeats)
+    print(f"✅ تم حفظ التقرير في {path}")
+
+
+if __name__ == "__main__":
+    main()
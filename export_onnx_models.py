@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+تصدير نماذج المعالجة اللغوية إلى ONNX
+
+يصدّر نماذج T5 و NER والتلخيص (ونماذج NER والتلخيص الأصلية لكل لغة)
+إلى MODELS_DIR/<name>/<version>/onnx، حيث يلتقطها NLPPipeline تلقائياً
+عند التحميل التالي ويشغلها عبر ONNX Runtime
+
+الاستخدام:
+    python export_onnx_models.py [الإصدار] [النماذج مفصولة بفواصل]
+"""
+
+import sys
+import os
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.config import settings
+from src.core.models.model_manager import ModelManager
+from src.core.nlp.model_registry import parse_language_models
+from src.core.nlp.onnx_backend import ONNX_AVAILABLE
+
+# اسم النموذج في مجلد النماذج: (المصدر، المهمة) - نفس نماذج NLPPipeline
+EXPORTS = {
+    "t5": ("t5-small", "text2text-generation"),
+    "ner": ("dbmdz/bert-large-cased-finetuned-conll03-english", "ner"),
+    "summarization": ("facebook/bart-large-cnn", "summarization"),
+}
+for language, model_id in parse_language_models(settings.NER_NATIVE_MODELS).items():
+    EXPORTS[f"ner-{language}"] = (model_id, "ner")
+native_summarization = parse_language_models(settings.SUMMARIZATION_NATIVE_MODELS)
+for language, model_id in native_summarization.items():
+    EXPORTS[f"summarization-{language}"] = (model_id, "summarization")
+
+
+def main():
+    if not ONNX_AVAILABLE:
+        print("❌ ONNX Runtime غير مثبت: pip install optimum[onnxruntime]")
+        sys.exit(1)
+
+    version = sys.argv[1] if len(sys.argv) > 1 else "v1.0"
+    names = sys.argv[2].split(",") if len(sys.argv) > 2 else list(EXPORTS)
+
+    manager = ModelManager(settings.MODELS_DIR)
+    failed = []
+    for name in names:
+        source, task = EXPORTS[name]
+        print(f"📦 تصدير {name} ({source})...")
+        if manager.export_onnx(name, source, task, version) is None:
+            failed.append(name)
+
+    if failed:
+        print(f"⚠️ فشل تصدير: {', '.join(failed)}")
+        sys.exit(1)
+    print(f"✅ تم تصدير {len(names)} نموذج إلى {settings.MODELS_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+تعبئة ذاكرة الترجمة مسبقاً من الرسائل السابقة
+
+يترجم الرسائل غير الإنجليزية المحفوظة في قاعدة البيانات (DATABASE_URL)
+إلى الإنجليزية - وهي الترجمة التي يحتاجها NER والتلخيص - ويحفظها في
+ذاكرة الترجمة حتى لا تُرسل العبارات المتكررة إلى Google مرة أخرى
+
+الاستخدام:
+    python preseed_translation_memory.py [عدد_الرسائل] [اللغة_الهدف]
+"""
+
+import sys
+import os
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.database.session import db_session
+from src.core.database.models import Message
+from src.core.nlp.pipeline import NLPPipeline
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    target_lang = sys.argv[2] if len(sys.argv) > 2 else 'en'
+
+    with db_session() as session:
+        rows = (session.query(Message.content)
+                .order_by(Message.created_at.desc())
+                .limit(limit)
+                .all())
+    texts = [content for (content,) in rows if content]
+    print(f"📚 {len(texts)} رسالة من قاعدة البيانات")
+
+    nlp = NLPPipeline()
+    stored = nlp.preseed_translation_memory(texts, target_lang)
+
+    print(f"✅ تم حفظ {stored} ترجمة جديدة")
+    print(f"📊 {nlp.translation_memory.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,10 @@ from typing import List
 from src.core.config import settings
 from src.api.routers import chat, recommendations
 from src.core.database.session import init_db
+from src.core.nlp.inference_executor import inference_executor
+from src.core.nlp.translation_client import translation_client
+from src.core.services.conversation_service import message_write_queue
+from src.core.utils.cache import async_cache_manager
 
 # إعداد التسجيل
 logging.basicConfig(level=logging.INFO)
@@ -52,10 +56,23 @@ def create_app() -> FastAPI:
         # تهيئة قاعدة البيانات
         init_db()
         logger.info("تم تهيئة قاعدة البيانات بنجاح")
+        # استعادة الرسائل التي لم تُحفظ قبل آخر إيقاف
+        message_write_queue.recover()
+        # تسخين النماذج في الخلفية؛ الخادم يستقبل الطلبات أثناء التحميل
+        if settings.MODEL_WARMUP_ENABLED:
+            chat.nlp_pipeline.model_registry.warm_up()
     
     @app.on_event("shutdown")
     async def shutdown_event():
         logger.info("BoAI API يتوقف...")
+        # إيقاف منفذ الاستدلال
+        inference_executor.shutdown()
+        # حفظ الرسائل المتبقية في طابور الكتابة المؤجلة
+        message_write_queue.stop()
+        # إغلاق اتصالات عميل الترجمة
+        await translation_client.aclose()
+        # إغلاق مجمع اتصالات Redis غير المتزامن
+        await async_cache_manager.aclose()
         # إغلاق الاتصال بقاعدة البيانات هنا لاحقاً
         # await database.disconnect()
     
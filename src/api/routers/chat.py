@@ -6,16 +6,25 @@ Chat Router - واجهة برمجة التطبيقات للدردشة مع BoAI
 """
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, Depends
-from fastapi.responses import JSONResponse
-from typing import List, Optional
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional, Tuple
 import logging
 import json
 from datetime import datetime
 
+from src.api.routers.chat_simple import generate_simple_response
 from src.core.nlp.pipeline import NLPPipeline
+from src.core.nlp.generation_router import TIER_CACHE, TIER_SIMPLE
+from src.core.nlp.inference_executor import (
+    inference_executor, InferenceQueueFullError, InferenceTimeoutError
+)
+from src.core.nlp.translation_client import translation_client
 from src.core.models.model_manager import ModelManager
 from src.core.config import settings
-from src.core.services.conversation_service import ConversationService, MessageService
+from src.core.services.conversation_service import (
+    ConversationService, MessageService, encode_cursor
+)
 
 # إعداد التسجيل
 logging.basicConfig(level=logging.INFO)
@@ -30,6 +39,13 @@ nlp_pipeline = NLPPipeline()
 # تهيئة مدير النماذج
 model_manager = ModelManager(settings.MODELS_DIR)
 
+# إبطال ذاكرة الردود تلقائياً عند تبديل إصدار النموذج
+nlp_pipeline.response_cache.bind_model_manager(model_manager)
+
+# نسخ ONNX ونماذج الترجمة المحلية تُحمّل عبر نفس مدير النماذج
+nlp_pipeline.model_manager = model_manager
+nlp_pipeline.local_translator.model_manager = model_manager
+
 class ChatRequest:
     """نموذج طلب الدردشة"""
     def __init__(self, message: str, conversation_id: Optional[str] = None, 
@@ -72,83 +88,279 @@ async def ask_question(
         if not model_manager.get_model(settings.DEFAULT_MODEL):
             model_manager.load_model(settings.DEFAULT_MODEL, settings.DEFAULT_MODEL_VERSION)
         
-        # معالجة الرسالة وتوليد الرد
-        response = nlp_pipeline.generate_response(
-            prompt=message,
-            context=context,
-            language=language
-        )
-        
         # TODO: الحصول على معرف المستخدم من المصادقة
         user_id = "test_user_id"
         
-        # إنشاء محادثة جديدة إذا لم تكن موجودة
-        if not conversation_id:
-            conversation = ConversationService.create_conversation(
-                user_id=user_id,
-                title=f"محادثة حول: {message[:30]}..." if len(message) > 30 else message,
-                language=language
+        # إنشاء محادثة جديدة إذا لم تكن موجودة (أدوارها السابقة تُضاف إلى السياق)
+        conversation_id = _resolve_conversation(
+            conversation_id, user_id, message, language
+        )
+        
+        # معالجة الرسالة وتوليد الرد خارج حلقة الأحداث
+        metadata = {}
+        try:
+            response = await inference_executor.run(
+                nlp_pipeline.generate_response,
+                prompt=message,
+                context=context,
+                language=language,
+                conversation_id=conversation_id,
+                metadata=metadata
+            )
+            tier = metadata.get('tier')
+        except InferenceQueueFullError as e:
+            if not settings.GENERATION_DEGRADE_ENABLED:
+                raise HTTPException(
+                    status_code=503,
+                    detail="الخادم مشغول حالياً، يرجى المحاولة لاحقاً",
+                    headers={"Retry-After": str(e.retry_after)}
+                )
+            response, tier = await _degraded_response(
+                message, context, language, conversation_id
+            )
+        except InferenceTimeoutError:
+            if not settings.GENERATION_DEGRADE_ENABLED:
+                raise HTTPException(status_code=504, detail="انتهت مهلة توليد الرد")
+            response, tier = await _degraded_response(
+                message, context, language, conversation_id
             )
-            conversation_id = conversation.id
-        else:
-            # التحقق من وجود المحادثة
-            conversation = ConversationService.get_conversation(conversation_id)
-            if not conversation:
-                raise HTTPException(status_code=404, detail="المحادثة غير موجودة")
         
-        # حفظ رسالة المستخدم في قاعدة البيانات
-        user_message = MessageService.create_message(
-            conversation_id=conversation_id,
-            sender="user",
-            content=message,
-            language=language,
-            metadata={
-                "model_used": settings.DEFAULT_MODEL,
-                "model_version": settings.DEFAULT_MODEL_VERSION,
-                "context": context
-            }
+        # حفظ رسالة المستخدم ورد المساعد في قاعدة البيانات
+        _, assistant_message = _save_turn(
+            conversation_id, message, response, language, context, tier
         )
         
-        # حفظ رد المساعد في قاعدة البيانات
-        assistant_message = MessageService.create_message(
-            conversation_id=conversation_id,
-            sender="assistant",
-            content=response,
-            language=nlp_pipeline.detect_language(response) if language == "auto" else language,
-            metadata={
-                "model_used": settings.DEFAULT_MODEL,
-                "model_version": settings.DEFAULT_MODEL_VERSION,
-                "context_used": context is not None
-            }
+        return _build_answer(
+            response, conversation_id, assistant_message['id'], language, tier
         )
         
-        if not user_message or not assistant_message:
-            raise HTTPException(status_code=500, detail="خطأ في حفظ المحادثة")
-        
-        logger.info(f"المحادثة {conversation_id}: تم حفظ الرسائل في قاعدة البيانات")
-        
-        return {
-            "success": True,
-            "response": response,
-            "conversation_id": conversation_id,
-            "message_id": assistant_message.id,
-            "timestamp": datetime.now().isoformat(),
-            "language": nlp_pipeline.detect_language(response) if language == "auto" else language,
-            "model_used": settings.DEFAULT_MODEL,
-            "model_version": settings.DEFAULT_MODEL_VERSION
-        }
-        
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"خطأ في معالجة السؤال: {e}")
         raise HTTPException(status_code=500, detail=f"خطأ في المعالجة: {str(e)}")
 
+@router.post("/ask/stream")
+async def ask_question_stream(
+    message: str,
+    conversation_id: Optional[str] = None,
+    language: str = "auto",
+    context: Optional[str] = None
+):
+    """
+    طرح سؤال على BoAI والحصول على الإجابة متدفقة (Server-Sent Events)
+    
+    الأحداث المرسلة:
+        token: مقطع نصي جديد من الرد
+        done: الرد الكامل بنفس تنسيق /chat/ask
+        error: خطأ أثناء التوليد
+    
+    Args:
+        message: السؤال أو الرسالة
+        conversation_id: معرف المحادثة (اختياري)
+        language: لغة المحادثة (auto للكشف التلقائي)
+        context: سياق إضافي (اختياري)
+    
+    Returns:
+        StreamingResponse: تدفق text/event-stream
+    """
+    # TODO: الحصول على معرف المستخدم من المصادقة
+    user_id = "test_user_id"
+    
+    # التحقق من المحادثة وحجز مكان في الطابور قبل بدء البث
+    conversation_id = _resolve_conversation(conversation_id, user_id, message, language)
+    metadata = {}
+    try:
+        token_stream = inference_executor.stream(
+            nlp_pipeline.generate_response_stream,
+            prompt=message,
+            context=context,
+            language=language,
+            conversation_id=conversation_id,
+            metadata=metadata
+        )
+    except InferenceQueueFullError as e:
+        if not settings.GENERATION_DEGRADE_ENABLED:
+            raise HTTPException(
+                status_code=503,
+                detail="الخادم مشغول حالياً، يرجى المحاولة لاحقاً",
+                headers={"Retry-After": str(e.retry_after)}
+            )
+        token_stream = None
+    
+    async def event_stream():
+        tokens = []
+        try:
+            degraded = token_stream is None
+            if not degraded:
+                try:
+                    async for token in token_stream:
+                        tokens.append(token)
+                        yield _sse_event("token", {"token": token})
+                except InferenceTimeoutError:
+                    # الرد البديل ممكن فقط قبل إرسال أول مقطع
+                    if tokens or not settings.GENERATION_DEGRADE_ENABLED:
+                        raise
+                    degraded = True
+            
+            if degraded:
+                response, tier = await _degraded_response(
+                    message, context, language, conversation_id
+                )
+                yield _sse_event("token", {"token": response})
+            else:
+                response, tier = "".join(tokens).strip(), metadata.get('tier')
+            
+            _, assistant_message = _save_turn(
+                conversation_id, message, response, language, context, tier
+            )
+            
+            yield _sse_event("done", _build_answer(
+                response, conversation_id, assistant_message['id'], language, tier
+            ))
+            
+        except InferenceTimeoutError:
+            yield _sse_event("error", {"error": "انتهت مهلة توليد الرد"})
+        except Exception as e:
+            logger.error(f"خطأ في بث الرد: {e}")
+            yield _sse_event("error", {"error": f"خطأ في المعالجة: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _resolve_conversation(conversation_id: Optional[str], user_id: str,
+                          message: str, language: str) -> str:
+    """
+    إنشاء محادثة جديدة أو التحقق من وجود المحادثة المحددة
+    
+    Returns:
+        str: معرف المحادثة
+    
+    Raises:
+        HTTPException: 404 إذا لم توجد المحادثة
+    """
+    if not conversation_id:
+        conversation = ConversationService.create_conversation(
+            user_id=user_id,
+            title=f"محادثة حول: {message[:30]}..." if len(message) > 30 else message,
+            language=language
+        )
+        nlp_pipeline.conversation_context.start(conversation.id)
+        return conversation.id
+    
+    # التحقق من وجود المحادثة
+    conversation = ConversationService.get_conversation(conversation_id)
+    if not conversation:
+        raise HTTPException(status_code=404, detail="المحادثة غير موجودة")
+    return conversation_id
+
+async def _degraded_response(message: str, context: Optional[str], language: str,
+                             conversation_id: Optional[str]) -> Tuple[str, str]:
+    """
+    رد بدون استدلال عندما يكون طابور الاستدلال ممتلئاً أو انتهت المهلة
+    
+    البحث في ذاكرة الردود (السياق والتخزين المؤقت) يعمل في مجموعة خيوط
+    منفصلة حتى لا يحجز حلقة الأحداث والخادم تحت الضغط
+    
+    Returns:
+        Tuple[str, str]: (الرد، المستوى): رد مخزن سابقاً إن وُجد،
+            وإلا المجيب بالكلمات المفتاحية
+    """
+    try:
+        cached = await run_in_threadpool(
+            nlp_pipeline.cached_response, message, context, language, conversation_id
+        )
+        if cached is not None:
+            return cached, TIER_CACHE
+    except Exception as e:
+        logger.warning(f"تعذر البحث في ذاكرة الردود: {e}")
+    
+    logger.info("الرد من المجيب المبسط (بدون استدلال)")
+    return generate_simple_response(message, language), TIER_SIMPLE
+
+def _save_turn(conversation_id: str, message: str, response: str,
+               language: str, context: Optional[str], tier: Optional[str] = None):
+    """
+    حفظ رسالة المستخدم ورد المساعد عبر طابور الكتابة المؤجلة
+    
+    Returns:
+        tuple: (رسالة المستخدم، رسالة المساعد)
+    
+    Raises:
+        HTTPException: 500 إذا فشل الحفظ
+    """
+    user_message = MessageService.create_message_deferred(
+        conversation_id=conversation_id,
+        sender="user",
+        content=message,
+        language=language,
+        metadata={
+            "model_used": settings.DEFAULT_MODEL,
+            "model_version": settings.DEFAULT_MODEL_VERSION,
+            "context": context
+        }
+    )
+    
+    assistant_message = MessageService.create_message_deferred(
+        conversation_id=conversation_id,
+        sender="assistant",
+        content=response,
+        language=(
+            nlp_pipeline.detect_language(response) if language == "auto" else language
+        ),
+        metadata={
+            "model_used": settings.DEFAULT_MODEL,
+            "model_version": settings.DEFAULT_MODEL_VERSION,
+            "context_used": context is not None,
+            "tier": tier
+        }
+    )
+    
+    if not user_message or not assistant_message:
+        raise HTTPException(status_code=500, detail="خطأ في حفظ المحادثة")
+    
+    # ترميز الدورين الجديدين فقط وإضافتهما إلى سياق المحادثة المخزن
+    nlp_pipeline.conversation_context.append_turn(conversation_id, "user", message)
+    nlp_pipeline.conversation_context.append_turn(
+        conversation_id, "assistant", response
+    )
+    
+    logger.info(f"المحادثة {conversation_id}: تمت جدولة حفظ الرسائل")
+    return user_message, assistant_message
+
+def _build_answer(response: str, conversation_id: str, message_id: str, language: str,
+                  tier: Optional[str] = None) -> dict:
+    """بناء جسم الإجابة المشترك بين /ask و /ask/stream (tier: المستوى الذي خدم الطلب)"""
+    return {
+        "success": True,
+        "response": response,
+        "conversation_id": conversation_id,
+        "message_id": message_id,
+        "timestamp": datetime.now().isoformat(),
+        "language": (
+            nlp_pipeline.detect_language(response) if language == "auto" else language
+        ),
+        "model_used": settings.DEFAULT_MODEL,
+        "model_version": settings.DEFAULT_MODEL_VERSION,
+        "tier": tier
+    }
+
+def _sse_event(event: str, data: dict) -> str:
+    """تنسيق حدث Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 @router.websocket("/ws")
 async def websocket_chat(websocket: WebSocket):
     """
     دعم الدردشة الحية عبر WebSocket
     
+    يرسل الخادم إطارات {"type": "token"} أثناء التوليد ثم إطار
+    {"type": "response"} بالرد الكامل. يمكن للعميل تعطيل البث
+    بإرسال "stream": false مع الرسالة.
+    
     Args:
         websocket: اتصال WebSocket
     """
@@ -164,6 +376,7 @@ async def websocket_chat(websocket: WebSocket):
         language="auto"
     )
     conversation_id = conversation.id
+    nlp_pipeline.conversation_context.start(conversation_id)
     
     try:
         while True:
@@ -174,6 +387,7 @@ async def websocket_chat(websocket: WebSocket):
             message = message_data.get("message", "")
             language = message_data.get("language", "auto")
             context = message_data.get("context", None)
+            stream = message_data.get("stream", True)
             
             if not message:
                 await websocket.send_json({
@@ -183,7 +397,7 @@ async def websocket_chat(websocket: WebSocket):
                 continue
             
             # حفظ رسالة المستخدم في قاعدة البيانات
-            user_message = MessageService.create_message(
+            user_message = MessageService.create_message_deferred(
                 conversation_id=conversation_id,
                 sender="user",
                 content=message,
@@ -202,34 +416,93 @@ async def websocket_chat(websocket: WebSocket):
                 })
                 continue
             
-            # معالجة الرسالة
-            response = nlp_pipeline.generate_response(
-                prompt=message,
-                context=context,
-                language=language
-            )
+            # معالجة الرسالة خارج حلقة الأحداث
+            metadata = {}
+            tokens = []
+            try:
+                if stream:
+                    # إرسال الرد مقطعاً مقطعاً فور توليده
+                    async for token in inference_executor.stream(
+                        nlp_pipeline.generate_response_stream,
+                        prompt=message,
+                        context=context,
+                        language=language,
+                        conversation_id=conversation_id,
+                        metadata=metadata
+                    ):
+                        tokens.append(token)
+                        await websocket.send_json({
+                            "type": "token",
+                            "token": token,
+                            "conversation_id": conversation_id
+                        })
+                    response = "".join(tokens).strip()
+                else:
+                    response = await inference_executor.run(
+                        nlp_pipeline.generate_response,
+                        prompt=message,
+                        context=context,
+                        language=language,
+                        conversation_id=conversation_id,
+                        metadata=metadata
+                    )
+                tier = metadata.get('tier')
+            except InferenceQueueFullError as e:
+                if not settings.GENERATION_DEGRADE_ENABLED:
+                    await websocket.send_json({
+                        "error": "الخادم مشغول حالياً، يرجى المحاولة لاحقاً",
+                        "type": "busy",
+                        "retry_after": e.retry_after
+                    })
+                    continue
+                response, tier = await _degraded_response(
+                    message, context, language, conversation_id
+                )
+            except InferenceTimeoutError:
+                # الرد البديل ممكن فقط قبل إرسال أول مقطع
+                if tokens or not settings.GENERATION_DEGRADE_ENABLED:
+                    await websocket.send_json({
+                        "error": "انتهت مهلة توليد الرد",
+                        "type": "error"
+                    })
+                    continue
+                response, tier = await _degraded_response(
+                    message, context, language, conversation_id
+                )
             
             # حفظ رد المساعد في قاعدة البيانات
-            assistant_message = MessageService.create_message(
+            assistant_message = MessageService.create_message_deferred(
                 conversation_id=conversation_id,
                 sender="assistant",
                 content=response,
-                language=nlp_pipeline.detect_language(response) if language == "auto" else language,
+                language=(
+            nlp_pipeline.detect_language(response) if language == "auto" else language
+        ),
                 metadata={
                     "model_used": settings.DEFAULT_MODEL,
                     "model_version": settings.DEFAULT_MODEL_VERSION,
-                    "context_used": context is not None
+                    "context_used": context is not None,
+                    "tier": tier
                 }
             )
             
+            # الأدوار السابقة تُرسل تلقائياً في سياق الرسالة التالية
+            nlp_pipeline.conversation_context.append_turn(
+                conversation_id, "user", message
+            )
+            nlp_pipeline.conversation_context.append_turn(
+                conversation_id, "assistant", response
+            )
+            
             # إرسال الرد
             await websocket.send_json({
                 "type": "response",
                 "response": response,
                 "conversation_id": conversation_id,
-                "message_id": assistant_message.id if assistant_message else None,
+                "message_id": assistant_message['id'] if assistant_message else None,
                 "timestamp": datetime.now().isoformat(),
-                "language": language
+                "language": language,
+                "tier": tier
             })
             
     except WebSocketDisconnect:
@@ -242,13 +515,15 @@ async def websocket_chat(websocket: WebSocket):
         })
 
 @router.get("/conversations", response_model=dict)
-async def get_conversations(limit: int = 10, offset: int = 0):
+async def get_conversations(limit: int = 10, offset: int = 0,
+                            cursor: Optional[str] = None):
     """
     الحصول على قائمة بالمحادثات
     
     Args:
         limit: عدد المحادثات
-        offset: الإزاحة للتصفح
+        offset: الإزاحة للتصفح (يُتجاهل عند تمرير cursor)
+        cursor: مؤشر الصفحة التالية من next_cursor في الاستجابة السابقة
     
     Returns:
         dict: قائمة المحادثات
@@ -258,51 +533,62 @@ async def get_conversations(limit: int = 10, offset: int = 0):
         # حالياً نستخدم مستخدم وهمي للاختبار
         user_id = "test_user_id"
         
-        # الحصول على محادثات المستخدم
-        conversations = ConversationService.get_user_conversations(
+        # الحصول على محادثات المستخدم مع عدد الرسائل في استعلام واحد
+        conversations = ConversationService.get_user_conversations_with_counts(
             user_id=user_id,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor
         )
         
         # تحويل المحادثات إلى تنسيق JSON
         conversations_data = []
-        for conv in conversations:
-            # الحصول على عدد الرسائل
-            messages = MessageService.get_conversation_messages(conv.id)
-            
+        for conv, message_count in conversations:
             conversations_data.append({
                 "id": conv.id,
                 "title": conv.title or f"محادثة {conv.id[:8]}",
-                "message_count": len(messages),
+                "message_count": message_count,
                 "language": conv.language,
                 "created_at": conv.created_at.isoformat(),
                 "updated_at": conv.updated_at.isoformat(),
                 "is_archived": conv.is_archived
             })
         
-        # TODO: حساب العدد الإجمالي الحقيقي
-        total_count = len(conversations_data) + offset
+        total_count = ConversationService.count_user_conversations(user_id)
+        
+        # مؤشر الصفحة التالية إذا كانت الصفحة ممتلئة
+        next_cursor = None
+        if len(conversations) == limit:
+            last_conversation = conversations[-1][0]
+            next_cursor = encode_cursor(
+                last_conversation.updated_at, last_conversation.id
+            )
         
         return {
             "success": True,
             "conversations": conversations_data,
             "total_count": total_count,
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "next_cursor": next_cursor
         }
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"خطأ في الحصول على المحادثات: {e}")
         raise HTTPException(status_code=500, detail=f"خطأ في الحصول على المحادثات: {str(e)}")
 
 @router.get("/conversations/{conversation_id}", response_model=dict)
-async def get_conversation(conversation_id: str):
+async def get_conversation(conversation_id: str, limit: int = 50,
+                           cursor: Optional[str] = None):
     """
     الحصول على محادثة محددة
     
     Args:
         conversation_id: معرف المحادثة
+        limit: عدد الرسائل في الصفحة
+        cursor: مؤشر الصفحة التالية من next_cursor في الاستجابة السابقة
     
     Returns:
         dict: تفاصيل المحادثة
@@ -314,7 +600,11 @@ async def get_conversation(conversation_id: str):
             raise HTTPException(status_code=404, detail="المحادثة غير موجودة")
         
         # الحصول على رسائل المحادثة
-        messages = MessageService.get_conversation_messages(conversation_id)
+        messages = MessageService.get_conversation_messages(
+            conversation_id,
+            limit=limit,
+            cursor=cursor
+        )
         
         # تحويل الرسائل إلى تنسيق JSON
         messages_data = []
@@ -325,7 +615,7 @@ async def get_conversation(conversation_id: str):
                 "content": msg.content,
                 "language": msg.language,
                 "timestamp": msg.created_at.isoformat(),
-                "metadata": msg.metadata
+                "metadata": msg.message_metadata
             })
         
         return {
@@ -334,16 +624,24 @@ async def get_conversation(conversation_id: str):
                 "id": conversation.id,
                 "title": conversation.title or f"محادثة {conversation.id[:8]}",
                 "language": conversation.language,
-                "message_count": len(messages),
+                "message_count": MessageService.count_conversation_messages(
+                    conversation_id
+                ),
                 "messages": messages_data,
                 "created_at": conversation.created_at.isoformat(),
                 "updated_at": conversation.updated_at.isoformat(),
                 "is_archived": conversation.is_archived
-            }
+            },
+            "next_cursor": (
+                encode_cursor(messages[-1].created_at, messages[-1].id)
+                if len(messages) == limit else None
+            )
         }
         
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"خطأ في الحصول على المحادثة {conversation_id}: {e}")
         raise HTTPException(status_code=500, detail=f"خطأ في الحصول على المحادثة: {str(e)}")
@@ -388,5 +686,24 @@ async def chat_health():
         "status": "healthy",
         "service": "chat",
         "timestamp": datetime.now().isoformat(),
-        "model_loaded": model_manager.get_model(settings.DEFAULT_MODEL) is not None
+        "model_loaded": model_manager.get_model(settings.DEFAULT_MODEL) is not None,
+        "models": nlp_pipeline.model_registry.get_status(),
+        "language_detection": nlp_pipeline.language_detector.get_stats(),
+        "translation_memory": nlp_pipeline.translation_memory.get_stats(),
+        "translation_client": translation_client.get_stats(),
+        "local_translation": nlp_pipeline.local_translator.get_status(),
+        "inference": inference_executor.get_stats(),
+        "response_cache": nlp_pipeline.response_cache.get_stats(),
+        "single_flight": nlp_pipeline.single_flight.get_stats(),
+        "generation_tiers": nlp_pipeline.generation_router.get_stats(),
+        "batching": {
+            "t5": (
+                nlp_pipeline.t5_batcher.get_stats()
+                if nlp_pipeline.t5_batcher else None
+            ),
+            "gpt2": (
+                nlp_pipeline.gpt2_batcher.get_stats()
+                if nlp_pipeline.gpt2_batcher else None
+            )
+        }
     }
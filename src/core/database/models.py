@@ -4,7 +4,9 @@
 هذا الملف يحتوي على نماذج SQLAlchemy للبيانات الأساسية
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import (
+    Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON, Index
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -48,6 +50,11 @@ class Conversation(Base):
     user = relationship("User", back_populates="conversations")
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
 
+    # فهرس مركب للتصفح بالمؤشر (keyset) حسب (updated_at, id)
+    __table_args__ = (
+        Index("ix_conversations_user_updated_id", "user_id", "updated_at", "id"),
+    )
+
 class Message(Base):
     """نموذج الرسالة"""
     __tablename__ = "messages"
@@ -63,6 +70,13 @@ class Message(Base):
     # العلاقات
     conversation = relationship("Conversation", back_populates="messages")
 
+    # فهرس مركب للتصفح بالمؤشر (keyset) حسب (created_at, id)
+    __table_args__ = (
+        Index(
+            "ix_messages_conversation_created_id", "conversation_id", "created_at", "id"
+        ),
+    )
+
 class Feedback(Base):
     """نموذج التقييم"""
     __tablename__ = "feedback"
@@ -52,6 +52,12 @@ def init_db():
     """تهيئة قاعدة البيانات وإنشاء الجداول"""
     try:
         Base.metadata.create_all(bind=engine)
+        
+        # create_all لا يضيف الفهارس الجديدة إلى الجداول الموجودة مسبقاً
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+        
         logger.info("تم تهيئة قاعدة البيانات بنجاح")
     except Exception as e:
         logger.error(f"خطأ في تهيئة قاعدة البيانات: {e}")
@@ -6,7 +6,7 @@
 """
 
 import logging
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List
 from pathlib import Path
 import json
 from datetime import datetime
@@ -31,6 +31,8 @@ class ModelManager:
         self.models: Dict[str, dict] = {}  # النماذج المحملة
         self.model_versions: Dict[str, List[str]] = {}  # إصدارات النماذج
         self.model_metadata: Dict[str, dict] = {}  # بيانات وصفية للنماذج
+        # مستمعو تغيير الإصدار
+        self._version_listeners: List[Callable[[str, Optional[str], str], None]] = []
         
         # إنشاء مجلد النماذج إذا لم يكن موجوداً
         self.models_dir.mkdir(exist_ok=True)
@@ -64,6 +66,7 @@ class ModelManager:
                 'status': 'loaded'
             }
             
+            previous_version = self.models.get(model_name, {}).get('version')
             self.models[model_name] = model_data
             
             # تحديث بيانات الإصدارات
@@ -73,12 +76,33 @@ class ModelManager:
                 self.model_versions[model_name].append(version)
             
             logger.info(f"تم تحميل النموذج: {model_name} v{version}")
+            
+            if previous_version != version:
+                self._notify_version_change(model_name, previous_version, version)
             return True
             
         except Exception as e:
             logger.error(f"خطأ في تحميل النموذج {model_name}: {e}")
             return False
     
+    def add_version_listener(self, callback: Callable[[str, Optional[str], str], None]):
+        """
+        تسجيل دالة تُستدعى عند تحميل إصدار مختلف من نموذج
+        
+        Args:
+            callback: دالة تستقبل (اسم النموذج، الإصدار السابق، الإصدار الجديد)
+        """
+        self._version_listeners.append(callback)
+    
+    def _notify_version_change(self, model_name: str, old_version: Optional[str],
+                               new_version: str):
+        """إبلاغ المستمعين بتغيير إصدار النموذج"""
+        for callback in self._version_listeners:
+            try:
+                callback(model_name, old_version, new_version)
+            except Exception as e:
+                logger.error(f"خطأ في مستمع تغيير إصدار النموذج {model_name}: {e}")
+    
     def unload_model(self, model_name: str) -> bool:
         """
         إلغاء تحميل النموذج من الذاكرة
@@ -177,6 +201,70 @@ class ModelManager:
         
         return self.models_dir / model_name / version / "model"
     
+    def get_onnx_path(self, model_name: str, version: str = "latest") -> Optional[Path]:
+        """
+        الحصول على مسار نسخة ONNX المصدّرة من النموذج
+
+        Args:
+            model_name: اسم النموذج
+            version: إصدار النموذج (default: "latest")
+
+        Returns:
+            Optional[Path]: مسار مجلد onnx أو None إذا لم يُصدّر النموذج
+        """
+        try:
+            onnx_path = self._get_model_path(model_name, version).parent / "onnx"
+        except FileNotFoundError:
+            return None
+
+        if not any(onnx_path.glob("*.onnx")):
+            return None
+        return onnx_path
+
+    def export_onnx(self, model_name: str, source: str, task: str,
+                    version: str = "v1.0") -> Optional[Path]:
+        """
+        تصدير نموذج transformers إلى ONNX وحفظه في MODELS_DIR/<name>/<version>/onnx
+
+        Args:
+            model_name: اسم النموذج
+            source: اسم النموذج في Hugging Face Hub أو مسار محلي
+            task: مهمة الـ pipeline (ner، summarization، text2text-generation...)
+            version: إصدار النموذج
+
+        Returns:
+            Optional[Path]: مسار مجلد onnx أو None إذا فشل التصدير
+        """
+        try:
+            from transformers import AutoTokenizer
+            from src.core.nlp.onnx_backend import ort_model_class
+
+            onnx_path = self.models_dir / model_name / version / "onnx"
+            onnx_path.mkdir(parents=True, exist_ok=True)
+
+            model = ort_model_class(task).from_pretrained(source, export=True)
+            model.save_pretrained(onnx_path)
+            AutoTokenizer.from_pretrained(source).save_pretrained(onnx_path)
+
+            self.save_model_metadata(model_name, {
+                **(self.load_model_metadata(model_name) or {}),
+                'onnx': {
+                    'source': source,
+                    'task': task,
+                    'version': version,
+                    'exported_at': datetime.now().isoformat()
+                }
+            })
+
+            logger.info(
+                f"تم تصدير النموذج {model_name} v{version} إلى ONNX: {onnx_path}"
+            )
+            return onnx_path
+
+        except Exception as e:
+            logger.error(f"خطأ في تصدير النموذج {model_name} إلى ONNX: {e}")
+            return None
+
     def _discover_versions(self, model_name: str) -> List[str]:
         """
         اكتشاف الإصدارات المتاحة للنموذج
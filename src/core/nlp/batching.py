@@ -0,0 +1,230 @@
+"""
+مجمّع الدفعات الصغيرة (Micro-Batching) - دمج طلبات التوليد المتزامنة
+
+هذا الملف يحتوي على مجدول يجمع الطلبات التي تصل في نفس الفترة
+القصيرة (نافذة زمنية أو حجم دفعة أقصى) ويمررها إلى النموذج في
+تمريرة أمامية واحدة، ثم يعيد لكل طلب نتيجته الخاصة
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+# إعداد التسجيل
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# علامة إيقاف خيط التجميع
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    مجدول يجمع الطلبات المتزامنة في دفعات ويمررها إلى دالة دفعات واحدة
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 8, max_wait_ms: float = 10,
+                 name: str = "batcher", pass_max_time: bool = False,
+                 deadline_bucket: float = 1.0):
+        """
+        تهيئة المجدول
+
+        Args:
+            batch_fn: دالة تستقبل قائمة مدخلات وتعيد قائمة نتائج بنفس الترتيب
+            max_batch_size: الحجم الأقصى للدفعة
+            max_wait_ms: أقصى وقت انتظار لتجميع الدفعة بالملي ثانية
+            name: اسم المجدول (للتسجيل)
+            pass_max_time: تمرير أقل زمن متبقٍ بين عناصر الدفعة إلى batch_fn
+                           كمعامل max_time (للعناصر المرسلة بمهلة)
+            deadline_bucket: أقصى فرق بين مهل العناصر في الدفعة الواحدة
+                             بالثواني عند pass_max_time (العناصر الأبعد
+                             مهلةً والعناصر بدون مهلة تُنفذ في دفعات منفصلة)
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+        self.pass_max_time = pass_max_time
+        self.deadline_bucket = max(0.0, deadline_bucket)
+
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats = {
+            'batches': 0,
+            'items': 0,
+            'largest_batch': 0,
+            'errors': 0
+        }
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """
+        إرسال عنصر وانتظار نتيجته
+
+        Args:
+            item: المدخل (مثل prompt)
+            timeout: مهلة الانتظار بالثواني (اختياري)
+
+        Returns:
+            Any: النتيجة الخاصة بهذا العنصر
+        """
+        self._ensure_started()
+
+        future: Future = Future()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        self._queue.put((item, future, deadline))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # إلغاء العنصر حتى يتجاهله خيط التجميع إذا لم تبدأ دفعته بعد
+            future.cancel()
+            raise
+        except CancelledError:
+            # ألغاه خيط التجميع لأن مهلته انتهت قبل بدء دفعته
+            raise FutureTimeoutError()
+
+    def _ensure_started(self):
+        """تشغيل خيط التجميع عند أول استخدام"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f"boai-{self.name}",
+                daemon=True
+            )
+            self._thread.start()
+            logger.info(
+                f"تم تشغيل مجمّع الدفعات {self.name} "
+                f"(حجم أقصى {self.max_batch_size}، نافذة {self.max_wait * 1000:.0f}ms)"
+            )
+
+    def _collect_batch(self, first) -> List:
+        """تجميع دفعة بدءاً من العنصر الأول حتى امتلائها أو انتهاء النافذة"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                # إعادة علامة الإيقاف لمعالجتها بعد هذه الدفعة
+                self._queue.put(_STOP)
+                break
+            batch.append(entry)
+
+        return batch
+
+    def _run(self):
+        """حلقة خيط التجميع"""
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+
+            batch = self._collect_batch(first)
+            now = time.monotonic()
+            live = []
+            for item, future, deadline in batch:
+                # إلغاء الطلبات المنتهية المهلة وتجاهل التي ألغاها أصحابها
+                if deadline is not None and deadline <= now:
+                    future.cancel()
+                elif future.set_running_or_notify_cancel():
+                    live.append((item, future, deadline))
+            if not live:
+                continue
+
+            for group in self._split_by_deadline(live):
+                self._run_batch(group)
+
+    def _split_by_deadline(self, batch: List) -> List[List]:
+        """
+        تقسيم الدفعة إلى مجموعات متقاربة المهلة حتى لا يقطع عنصر قارب
+        على الانتهاء توليد بقية العناصر (مع pass_max_time فقط)
+        """
+        if not self.pass_max_time:
+            return [batch]
+
+        groups = []
+        unbounded = [entry for entry in batch if entry[2] is None]
+        bounded = sorted((entry for entry in batch if entry[2] is not None),
+                         key=lambda entry: entry[2])
+        for entry in bounded:
+            if groups and entry[2] - groups[-1][0][2] <= self.deadline_bucket:
+                groups[-1].append(entry)
+            else:
+                groups.append([entry])
+        if unbounded:
+            groups.append(unbounded)
+        return groups
+
+    def _run_batch(self, batch: List):
+        """تنفيذ دفعة واحدة وتوزيع نتائجها على أصحابها"""
+        now = time.monotonic()
+        # عناصر انتهت مهلتها أثناء تنفيذ مجموعة سابقة من نفس الدفعة
+        for _, future, deadline in batch:
+            if deadline is not None and deadline <= now:
+                future.set_exception(FutureTimeoutError())
+        batch = [entry for entry in batch if entry[2] is None or entry[2] > now]
+        if not batch:
+            return
+
+        items = [item for item, _, _ in batch]
+        remaining = [deadline - now for _, _, deadline in batch if deadline is not None]
+        try:
+            if self.pass_max_time and remaining:
+                # المجموعة لا تعمل أطول من أقصر مهلة متبقية بين عناصرها
+                results = self.batch_fn(items, max_time=min(remaining))
+            else:
+                results = self.batch_fn(items)
+            if len(results) != len(items):
+                raise ValueError(
+                    f"عدد النتائج ({len(results)}) لا يطابق عدد المدخلات ({len(items)})"
+                )
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.error(f"خطأ في تنفيذ دفعة {self.name}: {e}")
+            for _, future, _ in batch:
+                future.set_exception(e)
+
+        self._stats['batches'] += 1
+        self._stats['items'] += len(batch)
+        self._stats['largest_batch'] = max(self._stats['largest_batch'], len(batch))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        الحصول على إحصائيات المجدول
+
+        Returns:
+            Dict[str, Any]: الإحصائيات
+        """
+        batches = self._stats['batches']
+        return {
+            **self._stats,
+            'average_batch_size': (
+                round(self._stats['items'] / batches, 2) if batches else 0
+            ),
+            'queued': self._queue.qsize()
+        }
+
+    def stop(self):
+        """إيقاف خيط التجميع بعد إنهاء الطلبات المنتظرة"""
+        if self._thread and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout=5)
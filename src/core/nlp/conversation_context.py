@@ -0,0 +1,258 @@
+"""
+سياق المحادثة (Conversation Context) - بناء السياق من الأدوار السابقة
+
+هذا الملف يحتوي على بناء سياق التوليد على الخادم من آخر أدوار المحادثة
+(من الذاكرة المؤقتة أو قاعدة البيانات) ضمن ميزانية رموز النموذج محسوبة
+بمحلله الفعلي، مع حذف الأقدم أولاً أو تلخيصه. الأدوار تُخزن مرمّزة لكل
+محادثة، فلا يُرمّز في كل دور جديد إلا الرسالة الجديدة
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.core.config import settings
+from src.core.utils.cache import cache_manager
+
+# إعداد التسجيل
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# استراتيجيات التعامل مع الأدوار التي لا تتسع لها الميزانية
+STRATEGY_TRUNCATE = "truncate"
+STRATEGY_SUMMARIZE = "summarize"
+
+# بادئة كل دور في السياق حسب المرسل
+SENDER_PREFIXES = {
+    "user": "User",
+    "assistant": "Assistant",
+}
+
+
+def _load_recent_turns(conversation_id: str, limit: int) -> List[Tuple[str, str]]:
+    """آخر أدوار المحادثة من قاعدة البيانات"""
+    from src.core.services.conversation_service import MessageService
+
+    return [(message.sender, message.content)
+            for message in MessageService.get_recent_messages(conversation_id, limit)]
+
+
+class ConversationContextBuilder:
+    """
+    بناء سياق المحادثة ضمن ميزانية الرموز مع تخزين الأدوار المرمّزة
+    """
+
+    def __init__(self, tokenizer_provider: Callable[[], Any],
+                 loader: Optional[Callable[[str, int], List[Tuple[str, str]]]] = None,
+                 summarizer: Optional[Callable[[str], str]] = None,
+                 max_turns: Optional[int] = None,
+                 max_tokens: Optional[int] = None,
+                 strategy: Optional[str] = None,
+                 cache=None,
+                 ttl: Optional[int] = None):
+        """
+        تهيئة الباني
+
+        Args:
+            tokenizer_provider: دالة تعيد محلل نموذج التوليد (أو None لعد الكلمات)؛
+                                تُستدعى في مسار الطلب فيجب ألا تحمّل النموذج
+            loader: دالة (معرف المحادثة، العدد) تعيد آخر الأدوار (المرسل، النص)
+            summarizer: دالة تلخيص للأدوار القديمة (لاستراتيجية summarize)
+            max_turns: عدد الأدوار السابقة المأخوذة بالحسبان
+            max_tokens: ميزانية رموز السياق
+            strategy: truncate (حذف الأقدم أولاً) أو summarize (تلخيص الأقدم)
+            cache: مدير التخزين المؤقت (افتراضياً cache_manager)
+            ttl: مدة صلاحية الأدوار المخزنة بالثواني
+        """
+        self.tokenizer_provider = tokenizer_provider
+        self.loader = loader or _load_recent_turns
+        self.summarizer = summarizer
+        self.max_turns = max_turns or settings.CONVERSATION_CONTEXT_MAX_TURNS
+        self.max_tokens = max_tokens or settings.CONVERSATION_CONTEXT_MAX_TOKENS
+        self.strategy = strategy or settings.CONVERSATION_CONTEXT_STRATEGY
+        self.cache = cache or cache_manager
+        self.ttl = ttl or settings.CONVERSATION_CONTEXT_TTL
+        self._lock = threading.Lock()
+        self._stats = {
+            'cache_hits': 0,
+            'db_loads': 0,
+            'tokenized_turns': 0,
+            'truncated_turns': 0,
+            'summaries': 0
+        }
+
+    def _tokenizer(self) -> Any:
+        """محلل النموذج، أو None إذا تعذر تحميله"""
+        try:
+            return self.tokenizer_provider()
+        except Exception as e:
+            logger.warning(f"تعذر الحصول على محلل النموذج؛ عد الكلمات بدلاً منه: {e}")
+            return None
+
+    @staticmethod
+    def _tokenizer_key(tokenizer: Any) -> str:
+        """اسم المحلل (الرموز المخزنة تخص محللاً واحداً)"""
+        if tokenizer is None:
+            return "words"
+        return getattr(tokenizer, 'name_or_path', None) or type(tokenizer).__name__
+
+    @staticmethod
+    def _encode(tokenizer: Any, text: str) -> List[Any]:
+        """ترميز النص (كلمات إذا لم يتوفر محلل)"""
+        if tokenizer is None:
+            return text.split()
+        return tokenizer.encode(text, add_special_tokens=False)
+
+    @staticmethod
+    def _decode(tokenizer: Any, ids: List[Any]) -> str:
+        """فك ترميز الرموز إلى نص"""
+        if tokenizer is None:
+            return " ".join(ids)
+        return tokenizer.decode(ids, skip_special_tokens=True)
+
+    @staticmethod
+    def _cache_key(conversation_id: str) -> str:
+        """مفتاح الأدوار المرمّزة للمحادثة"""
+        return f"conversation_context:{conversation_id}"
+
+    def _store(self, tokenizer: Any, conversation_id: str, turns: List[Dict[str, Any]]):
+        """حفظ الأدوار المرمّزة مع اسم المحلل الذي رمّزها"""
+        self.cache.set(self._cache_key(conversation_id), {
+            'tokenizer': self._tokenizer_key(tokenizer),
+            'turns': turns[-self.max_turns:]
+        }, self.ttl)
+
+    def _tokenize_line(self, tokenizer: Any, line: str) -> Dict[str, Any]:
+        """ترميز سطر دور واحد"""
+        self._stats['tokenized_turns'] += 1
+        return {'line': line, 'ids': self._encode(tokenizer, line)}
+
+    def _make_turn(self, tokenizer: Any, sender: str, content: str) -> Dict[str, Any]:
+        """ترميز دور واحد مع بادئة المرسل"""
+        return self._tokenize_line(
+            tokenizer, f"{SENDER_PREFIXES.get(sender, sender.title())}: {content}"
+        )
+
+    def _cached_turns(self, tokenizer: Any,
+                      conversation_id: str) -> Optional[List[Dict[str, Any]]]:
+        """الأدوار المخزنة (يُعاد ترميزها إذا رمّزها محلل آخر)"""
+        record = self.cache.get(self._cache_key(conversation_id))
+        if record is None:
+            return None
+
+        turns = record['turns']
+        if record['tokenizer'] != self._tokenizer_key(tokenizer):
+            turns = [self._tokenize_line(tokenizer, turn['line']) for turn in turns]
+            self._store(tokenizer, conversation_id, turns)
+        return turns
+
+    def _load_turns(self, tokenizer: Any, conversation_id: str) -> List[Dict[str, Any]]:
+        """الأدوار المرمّزة من الذاكرة المؤقتة، أو من قاعدة البيانات عند غيابها"""
+        turns = self._cached_turns(tokenizer, conversation_id)
+        if turns is not None:
+            self._stats['cache_hits'] += 1
+            return turns
+
+        self._stats['db_loads'] += 1
+        turns = [self._make_turn(tokenizer, sender, content)
+                 for sender, content in self.loader(conversation_id, self.max_turns)]
+        self._store(tokenizer, conversation_id, turns)
+        return turns
+
+    def start(self, conversation_id: str):
+        """
+        تسجيل محادثة جديدة بدون أدوار (لا حاجة لقراءة قاعدة البيانات)
+
+        Args:
+            conversation_id: معرف المحادثة
+        """
+        self._store(self._tokenizer(), conversation_id, [])
+
+    def append_turn(self, conversation_id: str, sender: str, content: str):
+        """
+        إضافة دور جديد إلى الأدوار المخزنة (ترميز الرسالة الجديدة فقط)
+
+        إذا لم تكن أدوار المحادثة مخزنة يُترك تحميلها لأول بناء للسياق
+
+        Args:
+            conversation_id: معرف المحادثة
+            sender: المرسل (user أو assistant)
+            content: نص الرسالة
+        """
+        if not conversation_id or not content:
+            return
+
+        tokenizer = self._tokenizer()
+        with self._lock:
+            turns = self._cached_turns(tokenizer, conversation_id)
+            if turns is None:
+                return
+            turns.append(self._make_turn(tokenizer, sender, content))
+            self._store(tokenizer, conversation_id, turns)
+
+    def build(self, conversation_id: str,
+              max_tokens: Optional[int] = None) -> Optional[str]:
+        """
+        بناء سياق المحادثة ضمن ميزانية الرموز
+
+        تُضاف الأدوار من الأحدث إلى الأقدم حتى تنفد الميزانية؛ ما لا
+        يتسع يُحذف (مع الاحتفاظ بآخر جزء من أول دور لا يتسع) أو يُلخص
+
+        Args:
+            conversation_id: معرف المحادثة
+            max_tokens: ميزانية الرموز (افتراضياً CONVERSATION_CONTEXT_MAX_TOKENS)
+
+        Returns:
+            Optional[str]: السياق، أو None إذا لم تكن هناك أدوار سابقة
+        """
+        budget = max_tokens or self.max_tokens
+        tokenizer = self._tokenizer()
+        with self._lock:
+            turns = self._load_turns(tokenizer, conversation_id)
+        if not turns:
+            return None
+
+        lines: List[str] = []
+        remaining = budget
+        index = len(turns) - 1
+        while index >= 0 and len(turns[index]['ids']) <= remaining:
+            lines.append(turns[index]['line'])
+            remaining -= len(turns[index]['ids'])
+            index -= 1
+
+        if index >= 0 and remaining > 0:
+            older = turns[:index + 1]
+            if self.strategy == STRATEGY_SUMMARIZE and self.summarizer:
+                prefix = self._summarize_older(tokenizer, older, remaining)
+            else:
+                # الاحتفاظ بنهاية أحدث دور لا يتسع كاملاً
+                prefix = self._decode(tokenizer, older[-1]['ids'][-remaining:])
+                self._stats['truncated_turns'] += len(older)
+            if prefix:
+                lines.append(prefix)
+        elif index >= 0:
+            self._stats['truncated_turns'] += index + 1
+
+        return "\n".join(reversed(lines)) if lines else None
+
+    def _summarize_older(self, tokenizer: Any, turns: List[Dict[str, Any]],
+                         budget: int) -> Optional[str]:
+        """تلخيص الأدوار الأقدم ضمن ما تبقى من الميزانية"""
+        try:
+            summary = self.summarizer("\n".join(turn['line'] for turn in turns))
+        except Exception as e:
+            logger.warning(f"فشل تلخيص الأدوار القديمة: {e}")
+            return None
+
+        self._stats['summaries'] += 1
+        ids = self._encode(tokenizer, f"Summary: {summary}")
+        return self._decode(tokenizer, ids[:budget])
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        الحصول على إحصائيات الباني
+
+        Returns:
+            Dict[str, int]: الإحصائيات
+        """
+        return dict(self._stats)
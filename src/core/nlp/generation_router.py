@@ -0,0 +1,210 @@
+"""
+موجّه التوليد (Generation Router) - توليد بمهلة كلية وشرائح زمنية لكل مستوى
+
+هذا الملف يحتوي على موجّه يجرب مستويات التوليد بالترتيب (OpenAI ثم T5
+ثم GPT-2) ضمن مهلة كلية للطلب، ويعطي كل مستوى شريحة زمنية لا تتجاوز ما
+تبقى من المهلة. كل مستوى يستقبل شريحته ويلتزم بها (مهلة طلب HTTP، أو
+max_time في generate لإيقاف التوليد المحلي فعلياً)، ويسجل الموجّه أي
+مستوى خدم الطلب
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.core.config import settings
+
+# إعداد التسجيل
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# مستويات الخدمة المذكورة في بيانات الرد
+TIER_CACHE = "cache"
+TIER_OPENAI = "openai"
+TIER_T5 = "t5"
+TIER_GPT2 = "gpt2"
+TIER_FALLBACK = "fallback"
+TIER_SIMPLE = "simple"
+
+# المستويات التي تولد رداً فعلياً (وتستحق التخزين في ذاكرة الردود)
+MODEL_TIERS = (TIER_OPENAI, TIER_T5, TIER_GPT2)
+
+# أقل شريحة زمنية تستحق تجربة المستوى
+MIN_TIER_SLICE = 0.5
+
+
+class PartialResponse(str):
+    """رد توقف توليده عند انتهاء شريحته الزمنية (max_time)؛ لا يُخزن في ذاكرة الردود"""
+
+
+def parse_tier_budgets(spec: str) -> Dict[str, float]:
+    """
+    قراءة الشرائح الزمنية لكل مستوى من الإعدادات
+
+    Args:
+        spec: نص بالشكل "openai:10,t5:10,gpt2:8"
+
+    Returns:
+        Dict[str, float]: المستوى -> الشريحة بالثواني
+    """
+    budgets = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        tier, seconds = item.split(":", 1)
+        budgets[tier.strip()] = float(seconds)
+    return budgets
+
+
+class Deadline:
+    """مهلة كلية للطلب تُقاس بالساعة الرتيبة"""
+
+    def __init__(self, seconds: float):
+        """
+        Args:
+            seconds: المهلة الكلية بالثواني من الآن
+        """
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """الوقت المتبقي بالثواني (صفر إذا انتهت المهلة)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def slice(self, budget: float) -> float:
+        """شريحة مستوى لا تتجاوز المتبقي من المهلة"""
+        return min(budget, self.remaining())
+
+
+class GenerationRouter:
+    """
+    تجربة مستويات التوليد بالترتيب ضمن مهلة كلية
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, float]] = None,
+                 deadline_seconds: Optional[float] = None):
+        """
+        تهيئة الموجّه
+
+        Args:
+            budgets: المستوى -> الشريحة الزمنية القصوى بالثواني
+            deadline_seconds: المهلة الكلية الافتراضية لكل طلب
+        """
+        self.budgets = (budgets if budgets is not None
+                        else parse_tier_budgets(settings.GENERATION_TIER_BUDGETS))
+        self.deadline_seconds = deadline_seconds or settings.GENERATION_DEADLINE
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def new_deadline(self) -> Deadline:
+        """
+        إنشاء مهلة كلية لطلب جديد
+
+        Returns:
+            Deadline: المهلة
+        """
+        return Deadline(self.deadline_seconds)
+
+    def _record(self, tier: str, outcome: str):
+        """تسجيل نتيجة محاولة مستوى"""
+        with self._lock:
+            tier_stats = self._stats.setdefault(
+                tier, {'served': 0, 'failed': 0, 'skipped': 0}
+            )
+            tier_stats[outcome] += 1
+
+    def generate(self, tiers: List[Tuple[str, Callable[[float], str]]],
+                 deadline: Optional[Deadline] = None
+                 ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        تجربة المستويات بالترتيب حتى ينجح أحدها أو تنتهي المهلة
+
+        Args:
+            tiers: قائمة (اسم المستوى، دالة تستقبل الشريحة الزمنية وتعيد الرد)
+            deadline: المهلة الكلية (افتراضياً GENERATION_DEADLINE من الآن)
+
+        Returns:
+            Tuple[Optional[str], Optional[str]]: (الرد، المستوى) أو (None, None)
+        """
+        deadline = deadline or self.new_deadline()
+
+        for tier, generate in tiers:
+            time_slice = deadline.slice(self.budgets.get(tier, self.deadline_seconds))
+            if time_slice < MIN_TIER_SLICE:
+                self._record(tier, 'skipped')
+                logger.warning(f"تخطي مستوى التوليد {tier}: لم يتبق وقت كافٍ")
+                continue
+
+            started = time.monotonic()
+            try:
+                response = generate(time_slice)
+            except Exception as e:
+                self._record(tier, 'failed')
+                logger.warning(
+                    f"مستوى التوليد {tier} فشل بعد "
+                    f"{time.monotonic() - started:.2f}s: {e}"
+                )
+                continue
+
+            if response:
+                self._record(tier, 'served')
+                return response, tier
+            self._record(tier, 'failed')
+
+        return None, None
+
+    def stream(self, tiers: List[Tuple[str, Callable[[float], Iterator[str]]]],
+               deadline: Optional[Deadline] = None,
+               metadata: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """
+        بث الرد من أول مستوى ينجح ضمن المهلة
+
+        الانتقال إلى المستوى التالي ممكن فقط قبل إرسال أول مقطع
+
+        Args:
+            tiers: قائمة (اسم المستوى، دالة تستقبل الشريحة الزمنية وتعيد مولد مقاطع)
+            deadline: المهلة الكلية (افتراضياً GENERATION_DEADLINE من الآن)
+            metadata: قاموس يُسجل فيه المستوى الذي خدم الطلب (اختياري)
+
+        Yields:
+            str: المقطع النصي التالي
+        """
+        deadline = deadline or self.new_deadline()
+
+        for tier, stream in tiers:
+            time_slice = deadline.slice(self.budgets.get(tier, self.deadline_seconds))
+            if time_slice < MIN_TIER_SLICE:
+                self._record(tier, 'skipped')
+                logger.warning(f"تخطي مستوى البث {tier}: لم يتبق وقت كافٍ")
+                continue
+
+            started = False
+            try:
+                for token in stream(time_slice):
+                    if not started and metadata is not None:
+                        metadata['tier'] = tier
+                    started = True
+                    yield token
+            except Exception as e:
+                if started:
+                    self._record(tier, 'failed')
+                    raise
+                self._record(tier, 'failed')
+                logger.warning(f"بث المستوى {tier} فشل: {e}")
+                continue
+
+            if started:
+                self._record(tier, 'served')
+                return
+            self._record(tier, 'failed')
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        الحصول على إحصائيات كل مستوى
+
+        Returns:
+            Dict[str, Dict[str, int]]: عدد مرات الخدمة والفشل والتخطي لكل مستوى
+        """
+        with self._lock:
+            return {tier: dict(stats) for tier, stats in self._stats.items()}
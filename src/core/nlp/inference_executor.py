@@ -0,0 +1,297 @@
+"""
+منفذ الاستدلال (Inference Executor) - تشغيل التوليد خارج حلقة الأحداث
+
+هذا الملف يحتوي على منفذ مخصص لتشغيل عمليات الاستدلال الثقيلة
+(T5, GPT-2, OpenAI) في مجموعة خيوط محدودة مع طابور محدود الحجم
+ومهلة لكل طلب، حتى تبقى حلقة أحداث uvicorn مستجيبة تحت الضغط
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from src.core.config import settings
+
+# إعداد التسجيل
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# علامة نهاية البث بين خيط الاستدلال وحلقة الأحداث
+_STREAM_END = object()
+
+
+class InferenceQueueFullError(Exception):
+    """يُرفع عندما يكون طابور الاستدلال ممتلئاً"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("طابور الاستدلال ممتلئ")
+        self.retry_after = retry_after
+
+
+class InferenceTimeoutError(Exception):
+    """يُرفع عندما يتجاوز طلب الاستدلال المهلة المحددة"""
+
+
+class _SlotReservation:
+    """
+    مكان محجوز في طابور الاستدلال لبث لم يبدأ بعد
+
+    يُحرر المكان عند إغلاق المولد أو جمعه قبل بدء تنفيذه، وتنتقل ملكيته
+    إلى المهمة بعد إرسالها إلى المنفذ
+    """
+
+    def __init__(self, executor: "InferenceExecutor"):
+        self._executor = executor
+        self._held = True
+
+    def transfer(self):
+        """نقل المكان إلى المهمة المرسلة (تحرره عند انتهائها)"""
+        self._held = False
+
+    def release(self):
+        """تحرير المكان إذا لم يُنقل بعد"""
+        if self._held:
+            self._held = False
+            self._executor._release_slot()
+
+    def __del__(self):
+        self.release()
+
+
+class InferenceExecutor:
+    """
+    منفذ استدلال محدود السعة يعمل بمجموعة خيوط مخصصة
+    """
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 max_queue_size: Optional[int] = None,
+                 timeout: Optional[float] = None,
+                 retry_after: Optional[int] = None):
+        """
+        تهيئة منفذ الاستدلال
+
+        Args:
+            max_workers: عدد خيوط الاستدلال المتزامنة
+            max_queue_size: عدد الطلبات المسموح بانتظارها فوق عدد الخيوط
+            timeout: المهلة الافتراضية لكل طلب بالثواني
+            retry_after: القيمة المقترحة لترويسة Retry-After بالثواني
+        """
+        self.max_workers = max_workers or settings.INFERENCE_MAX_WORKERS
+        self.max_queue_size = (max_queue_size if max_queue_size is not None
+                               else settings.INFERENCE_QUEUE_SIZE)
+        self.timeout = timeout or settings.INFERENCE_TIMEOUT
+        self.retry_after = retry_after or settings.INFERENCE_RETRY_AFTER
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="boai-inference"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'rejected': 0,
+            'timed_out': 0
+        }
+
+        logger.info(
+            f"تم تهيئة InferenceExecutor: {self.max_workers} خيوط، "
+            f"طابور بسعة {self.max_queue_size}"
+        )
+
+    @property
+    def capacity(self) -> int:
+        """السعة الكلية (قيد التنفيذ + في الانتظار)"""
+        return self.max_workers + self.max_queue_size
+
+    def _reserve_slot(self):
+        """حجز مكان في الطابور أو رفع InferenceQueueFullError"""
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._stats['rejected'] += 1
+                logger.warning(
+                    f"طابور الاستدلال ممتلئ ({self._pending}/{self.capacity})"
+                )
+                raise InferenceQueueFullError(self.retry_after)
+            self._pending += 1
+            self._stats['submitted'] += 1
+
+    def _release_slot(self, _future=None):
+        """تحرير المكان عند انتهاء المهمة فعلياً (وليس عند انتهاء المهلة)"""
+        with self._lock:
+            self._pending -= 1
+            self._stats['completed'] += 1
+
+    def is_saturated(self) -> bool:
+        """
+        التحقق مما إذا كان الطابور ممتلئاً
+
+        Returns:
+            bool: True إذا لم يعد هناك مكان لطلبات جديدة
+        """
+        with self._lock:
+            return self._pending >= self.capacity
+
+    async def run(self, func: Callable, *args,
+                  timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        تشغيل دالة متزامنة في منفذ الاستدلال وانتظار نتيجتها
+
+        Args:
+            func: الدالة المتزامنة (مثل generate_response)
+            *args: معاملات الدالة
+            timeout: مهلة هذا الطلب بالثواني (اختياري)
+            **kwargs: معاملات مسماة للدالة
+
+        Returns:
+            Any: نتيجة الدالة
+
+        Raises:
+            InferenceQueueFullError: إذا كان الطابور ممتلئاً
+            InferenceTimeoutError: إذا تجاوز الطلب المهلة
+        """
+        self._reserve_slot()
+
+        try:
+            future = self._executor.submit(partial(func, *args, **kwargs))
+        except Exception:
+            self._release_slot()
+            raise
+
+        # المكان يُحرر عند انتهاء الخيط فعلياً حتى تبقى السعة صادقة
+        future.add_done_callback(self._release_slot)
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future),
+                timeout=timeout or self.timeout
+            )
+        except asyncio.TimeoutError:
+            # إلغاء المهمة إذا لم تبدأ بعد
+            future.cancel()
+            with self._lock:
+                self._stats['timed_out'] += 1
+            logger.warning(f"تجاوز طلب الاستدلال المهلة ({timeout or self.timeout}s)")
+            raise InferenceTimeoutError("تجاوز طلب الاستدلال المهلة المحددة")
+
+    def stream(self, func: Callable, *args,
+               timeout: Optional[float] = None, **kwargs) -> AsyncIterator[Any]:
+        """
+        تشغيل مولد متزامن (مثل generate_response_stream) في منفذ الاستدلال
+        وبث عناصره إلى حلقة الأحداث فور إنتاجها
+
+        المكان في الطابور يُحجز فوراً عند الاستدعاء حتى يمكن رفض الطلب
+        (503) قبل بدء إرسال الاستجابة، ويُحرر إذا أُغلق المولد (aclose) أو
+        جُمع قبل بدء استهلاكه
+
+        Args:
+            func: دالة تعيد مولداً متزامناً
+            *args: معاملات الدالة
+            timeout: المهلة الكلية للبث بالثواني (اختياري)
+            **kwargs: معاملات مسماة للدالة
+
+        Returns:
+            AsyncIterator[Any]: مولد غير متزامن للعناصر
+
+        Raises:
+            InferenceQueueFullError: إذا كان الطابور ممتلئاً
+        """
+        self._reserve_slot()
+        reservation = _SlotReservation(self)
+        return self._stream(func, args, kwargs, timeout or self.timeout, reservation)
+
+    async def _stream(self, func: Callable, args: tuple, kwargs: dict,
+                      timeout: float,
+                      reservation: _SlotReservation) -> AsyncIterator[Any]:
+        """تنفيذ البث الفعلي (انظر stream)"""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop_event = threading.Event()
+
+        def push(item, error=None):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+            except RuntimeError:
+                # حلقة الأحداث أُغلقت (انقطع العميل)
+                stop_event.set()
+
+        def produce():
+            generator = None
+            try:
+                generator = func(*args, **kwargs)
+                for item in generator:
+                    if stop_event.is_set():
+                        break
+                    push(item)
+                push(_STREAM_END)
+            except Exception as e:
+                push(_STREAM_END, e)
+            finally:
+                if generator is not None and hasattr(generator, 'close'):
+                    generator.close()
+
+        try:
+            future = self._executor.submit(produce)
+        except Exception:
+            reservation.release()
+            raise
+
+        reservation.transfer()
+        future.add_done_callback(self._release_slot)
+        deadline = loop.time() + timeout
+
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+
+                item, error = await asyncio.wait_for(queue.get(), timeout=remaining)
+                if item is _STREAM_END:
+                    if error:
+                        raise error
+                    return
+                yield item
+
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._stats['timed_out'] += 1
+            logger.warning(f"تجاوز بث الاستدلال المهلة ({timeout}s)")
+            raise InferenceTimeoutError("تجاوز طلب الاستدلال المهلة المحددة")
+        finally:
+            # إيقاف المنتج إذا توقف المستهلك مبكراً
+            stop_event.set()
+            future.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        الحصول على إحصائيات المنفذ
+
+        Returns:
+            Dict[str, Any]: الإحصائيات
+        """
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queue_size': self.max_queue_size,
+                'pending': self._pending,
+                **self._stats
+            }
+
+    def shutdown(self, wait: bool = False):
+        """
+        إيقاف المنفذ
+
+        Args:
+            wait: انتظار انتهاء المهام الجارية
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        logger.info("تم إيقاف InferenceExecutor")
+
+
+# إنشاء instance عالمي
+inference_executor = InferenceExecutor()
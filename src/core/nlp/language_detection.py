@@ -0,0 +1,164 @@
+"""
+كشف اللغة المتدرج (Tiered Language Detection)
+
+هذا الملف يحتوي على كاشف لغة بمستويين: مستوى سريع يعتمد على توزيع
+الحروف حسب نظام الكتابة (عربي، لاتيني، سيريلي) ويحسم أغلب الحالات في
+ميكروثوانٍ، ومستوى n-gram (langdetect) لا يُستدعى إلا عند الحاجة للتمييز
+بين اللغات اللاتينية، مع حفظ النتائج حسب تجزئة النص
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from langdetect import detect, DetectorFactory
+
+from src.core.config import settings
+
+# ضمان نتائج ثابتة للكشف عن اللغة
+DetectorFactory.seed = 0
+
+# إعداد التسجيل
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# أنماط حروف كل نظام كتابة (نطاقات Unicode)
+_SCRIPT_PATTERNS = {
+    'arabic': re.compile(
+        '[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]'
+    ),
+    'cyrillic': re.compile('[\u0400-\u052F]'),
+    'latin': re.compile('[A-Za-z\u00C0-\u024F]'),
+}
+
+# اللغة التي يحسمها كل نظام كتابة غير لاتيني
+_SCRIPT_LANGUAGES = {
+    'arabic': 'ar',
+    'cyrillic': 'ru',
+}
+
+# أدنى نسبة لحروف نظام غير لاتيني لحسم اللغة؛ منخفضة عمداً لأن الأسئلة
+# العربية تحتوي عادة على أسماء دوال ومكتبات بحروف لاتينية
+SCRIPT_DOMINANCE = 0.3
+
+
+def script_histogram(text: str) -> Dict[str, int]:
+    """
+    عد الحروف حسب نظام الكتابة
+
+    Args:
+        text: النص المدخل
+
+    Returns:
+        Dict[str, int]: عدد الحروف لكل نظام كتابة
+    """
+    return {script: len(pattern.findall(text))
+            for script, pattern in _SCRIPT_PATTERNS.items()}
+
+
+def detect_by_script(text: str) -> Optional[str]:
+    """
+    كشف اللغة من نظام الكتابة فقط
+
+    Args:
+        text: النص المدخل
+
+    Returns:
+        Optional[str]: كود اللغة، أو None إذا كان النص لاتينياً (يحتاج n-gram)
+                       أو بدون حروف
+    """
+    counts = script_histogram(text)
+    total = sum(counts.values())
+    if not total:
+        return None
+
+    for script, language in _SCRIPT_LANGUAGES.items():
+        if counts[script] / total >= SCRIPT_DOMINANCE:
+            return language
+    return None
+
+
+class LanguageDetector:
+    """
+    كاشف لغة متدرج مع ذاكرة للنتائج
+    """
+
+    def __init__(self, supported_languages: Iterable[str],
+                 default_language: str = 'en',
+                 memo_size: Optional[int] = None):
+        """
+        تهيئة الكاشف
+
+        Args:
+            supported_languages: اللغات المدعومة
+            default_language: اللغة المفترضة عند الفشل أو عدم الدعم
+            memo_size: عدد النتائج المحفوظة
+        """
+        self.supported_languages = set(supported_languages)
+        self.default_language = default_language
+        self.memo_size = memo_size or settings.LANGUAGE_DETECTION_MEMO_SIZE
+
+        self._memo: "OrderedDict[bytes, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'memo_hits': 0,
+            'script_hits': 0,
+            'ngram_calls': 0
+        }
+
+    def detect(self, text: str) -> str:
+        """
+        كشف لغة النص
+
+        Args:
+            text: النص المدخل
+
+        Returns:
+            str: كود اللغة
+        """
+        digest = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+        with self._lock:
+            language = self._memo.get(digest)
+            if language is not None:
+                self._memo.move_to_end(digest)
+                self._stats['memo_hits'] += 1
+                return language
+
+        language = self._detect_uncached(text)
+
+        with self._lock:
+            self._memo[digest] = language
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+        return language
+
+    def _detect_uncached(self, text: str) -> str:
+        """كشف اللغة بالمستوى السريع ثم n-gram عند الحاجة"""
+        language = detect_by_script(text)
+        if language:
+            self._stats['script_hits'] += 1
+        else:
+            self._stats['ngram_calls'] += 1
+            try:
+                language = detect(text)
+            except Exception as e:
+                logger.error(f"خطأ في كشف اللغة: {e}")
+                return self.default_language
+
+        if language in self.supported_languages:
+            return language
+        return self.default_language
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        الحصول على إحصائيات الكاشف
+
+        Returns:
+            Dict[str, int]: الإحصائيات
+        """
+        return {**self._stats, 'memo_size': len(self._memo)}
@@ -0,0 +1,200 @@
+"""
+الترجمة المحلية (Local Translation) - ترجمة بدون اتصال بالشبكة
+
+هذا الملف يحتوي على محرك ترجمة محلي لأزواج اللغات المدعومة (مثل ar<->en)
+يعتمد على نماذج seq2seq (MarianMT افتراضياً) تُحمّل عبر ModelManager من
+مجلد النماذج إذا وُجدت، وإلا من Hugging Face Hub، مع استدلال في دفعات
+على المعالج ودمج طلبات الترجمة المتزامنة في تمريرة واحدة
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.config import settings
+from src.core.nlp.batching import MicroBatcher
+from src.core.nlp.model_registry import LazyModelRegistry
+
+# إعداد التسجيل
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_model_pairs(spec: str) -> Dict[Tuple[str, str], str]:
+    """
+    قراءة أزواج اللغات والنماذج من الإعدادات
+
+    Args:
+        spec: نص بالشكل "ar-en:Helsinki-NLP/opus-mt-ar-en,en-ar:..."
+
+    Returns:
+        Dict[Tuple[str, str], str]: (المصدر، الهدف) -> اسم النموذج
+    """
+    pairs = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        languages, model_id = item.split(":", 1)
+        source_lang, target_lang = languages.strip().split("-", 1)
+        pairs[(source_lang, target_lang)] = model_id.strip()
+    return pairs
+
+
+class LocalTranslator:
+    """
+    محرك ترجمة محلي بنماذج seq2seq
+    """
+
+    def __init__(self, model_manager=None,
+                 model_pairs: Optional[Dict[Tuple[str, str], str]] = None,
+                 max_batch_size: Optional[int] = None,
+                 batch_window_ms: Optional[float] = None,
+                 max_length: Optional[int] = None):
+        """
+        تهيئة المحرك
+
+        Args:
+            model_manager: مدير النماذج المستخدم لإيجاد النسخ المحلية
+            model_pairs: (المصدر، الهدف) -> اسم النموذج في Hugging Face Hub
+            max_batch_size: الحجم الأقصى لدفعة الاستدلال
+            batch_window_ms: نافذة تجميع طلبات الترجمة المتزامنة بالملي ثانية
+            max_length: أقصى طول للترجمة بالرموز
+        """
+        self.enabled = settings.LOCAL_TRANSLATION_ENABLED
+        self.model_manager = model_manager
+        self.model_pairs = (model_pairs if model_pairs is not None
+                            else parse_model_pairs(settings.LOCAL_TRANSLATION_MODELS))
+        self.max_batch_size = max_batch_size or settings.LOCAL_TRANSLATION_BATCH_SIZE
+        self.batch_window_ms = (batch_window_ms if batch_window_ms is not None
+                                else settings.LOCAL_TRANSLATION_BATCH_WINDOW_MS)
+        self.max_length = max_length or settings.LOCAL_TRANSLATION_MAX_LENGTH
+
+        self.model_registry = LazyModelRegistry()
+        self._batchers: Dict[Tuple[str, str], MicroBatcher] = {}
+        for pair in self.model_pairs:
+            self.model_registry.register(self._pair_name(pair),
+                                         lambda pair=pair: self._load_pair(pair))
+            self._batchers[pair] = MicroBatcher(
+                lambda texts, pair=pair: self.translate_batch(texts, *pair),
+                max_batch_size=self.max_batch_size,
+                max_wait_ms=self.batch_window_ms,
+                name=f"translation-{'-'.join(pair)}"
+            )
+
+    @staticmethod
+    def _pair_name(pair: Tuple[str, str]) -> str:
+        """اسم نموذج الزوج في ModelManager وسجل النماذج"""
+        return f"translation-{pair[0]}-{pair[1]}"
+
+    def supports(self, source_lang: str, target_lang: str) -> bool:
+        """
+        التحقق من توفر ترجمة محلية للزوج
+
+        Args:
+            source_lang: اللغة المصدر
+            target_lang: اللغة الهدف
+
+        Returns:
+            bool: True إذا كان المحرك مفعلاً والزوج مدعوماً
+        """
+        return self.enabled and (source_lang, target_lang) in self.model_pairs
+
+    def _resolve_model_path(self, pair: Tuple[str, str]) -> str:
+        """مسار النموذج في مجلد النماذج إذا وُجد، وإلا اسمه في Hub"""
+        if self.model_manager is None:
+            from src.core.models.model_manager import ModelManager
+            self.model_manager = ModelManager(settings.MODELS_DIR)
+
+        name = self._pair_name(pair)
+        if self.model_manager.load_model(name):
+            return self.model_manager.get_model(name)['path']
+        return self.model_pairs[pair]
+
+    def _load_pair(self, pair: Tuple[str, str]) -> Any:
+        """تحميل المحلل والنموذج لزوج لغات"""
+        # transformers و torch ثقيلتان، لذا تُستوردان عند التحميل فقط
+        import torch
+        from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+        model_path = self._resolve_model_path(pair)
+        tokenizer = AutoTokenizer.from_pretrained(model_path)
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_path)
+        model.eval()
+        if torch.cuda.is_available():
+            model = model.to("cuda")
+        logger.info(
+            f"تم تحميل نموذج الترجمة المحلي {pair[0]}->{pair[1]} من {model_path}"
+        )
+        return tokenizer, model
+
+    def _run_model(self, bundle: Any, texts: List[str]) -> List[str]:
+        """تمريرة استدلال واحدة لدفعة نصوص"""
+        import torch
+
+        tokenizer, model = bundle
+        inputs = tokenizer(texts, return_tensors="pt", padding=True,
+                           truncation=True, max_length=self.max_length)
+        inputs = {key: value.to(model.device) for key, value in inputs.items()}
+        with torch.inference_mode():
+            outputs = model.generate(**inputs, max_length=self.max_length)
+        return tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+    def translate_batch(self, texts: List[str], source_lang: str,
+                        target_lang: str) -> List[Optional[str]]:
+        """
+        ترجمة مجموعة نصوص في دفعات
+
+        Args:
+            texts: النصوص المراد ترجمتها
+            source_lang: اللغة المصدر
+            target_lang: اللغة الهدف
+
+        Returns:
+            List[Optional[str]]: الترجمات، أو None لكل نص إذا تعذر تحميل النموذج
+        """
+        bundle = self.model_registry.get(self._pair_name((source_lang, target_lang)))
+        if bundle is None:
+            return [None] * len(texts)
+
+        translations = []
+        for i in range(0, len(texts), self.max_batch_size):
+            translations.extend(
+                self._run_model(bundle, texts[i:i + self.max_batch_size])
+            )
+        return translations
+
+    def translate(self, text: str, source_lang: str, target_lang: str) -> Optional[str]:
+        """
+        ترجمة نص واحد ضمن دفعة مع الطلبات المتزامنة
+
+        Args:
+            text: النص المراد ترجمته
+            source_lang: اللغة المصدر
+            target_lang: اللغة الهدف
+
+        Returns:
+            Optional[str]: الترجمة أو None إذا تعذرت الترجمة المحلية
+        """
+        if not self.supports(source_lang, target_lang):
+            return None
+        try:
+            return self._batchers[(source_lang, target_lang)].submit(text)
+        except Exception as e:
+            logger.warning(f"فشلت الترجمة المحلية {source_lang}->{target_lang}: {e}")
+            return None
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        الحصول على حالة المحرك ونماذجه
+
+        Returns:
+            Dict[str, Any]: الحالة
+        """
+        return {
+            'enabled': self.enabled,
+            'models': self.model_registry.get_status(),
+            'batching': {
+                '-'.join(pair): batcher.get_stats()
+                for pair, batcher in self._batchers.items()
+            }
+        }
@@ -0,0 +1,197 @@
+"""
+سجل النماذج الكسول (Lazy Model Registry) - تحميل النماذج عند أول استخدام
+
+هذا الملف يحتوي على سجل يحمّل كل نموذج عند أول طلب له خلف قفل خاص
+بذلك النموذج، مع تسخين اختياري في الخلفية بعد بدء الخادم وتقرير
+جاهزية كل نموذج على حدة
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from src.core.config import settings
+
+# إعداد التسجيل
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# حالات النموذج
+STATE_NOT_LOADED = "not_loaded"
+STATE_LOADING = "loading"
+STATE_READY = "ready"
+STATE_FAILED = "failed"
+
+
+def parse_language_models(spec: str) -> Dict[str, str]:
+    """
+    قراءة نماذج كل لغة من الإعدادات
+
+    Args:
+        spec: نص بالشكل "ar:model-id,fr:model-id"
+
+    Returns:
+        Dict[str, str]: اللغة -> اسم النموذج
+    """
+    models = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        language, model_id = item.split(":", 1)
+        models[language.strip()] = model_id.strip()
+    return models
+
+
+class _ModelEntry:
+    """نموذج مسجل مع دالة تحميله وحالته"""
+
+    def __init__(self, loader: Callable[[], Any]):
+        self.loader = loader
+        self.lock = threading.Lock()
+        self.model: Any = None
+        self.state = STATE_NOT_LOADED
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.failed_at: Optional[float] = None
+
+
+class LazyModelRegistry:
+    """
+    سجل نماذج يحمّل كل نموذج عند أول استخدام
+    """
+
+    def __init__(self, retry_interval: Optional[float] = None):
+        """
+        تهيئة السجل
+
+        Args:
+            retry_interval: المدة بالثواني قبل إعادة محاولة تحميل نموذج فشل تحميله
+        """
+        self.retry_interval = (retry_interval if retry_interval is not None
+                               else settings.MODEL_LOAD_RETRY_INTERVAL)
+        self._entries: Dict[str, _ModelEntry] = {}
+        self._warmup_thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        """
+        تسجيل نموذج دون تحميله
+
+        Args:
+            name: اسم النموذج
+            loader: دالة بدون معاملات تعيد النموذج المحمل
+        """
+        self._entries[name] = _ModelEntry(loader)
+
+    def get(self, name: str) -> Any:
+        """
+        الحصول على النموذج وتحميله إذا لزم الأمر
+
+        الطلبات المتزامنة لنفس النموذج تنتظر تحميلاً واحداً، بينما لا
+        يعطل تحميل نموذج ما الطلبات التي تستخدم نماذج أخرى
+
+        Args:
+            name: اسم النموذج
+
+        Returns:
+            Any: النموذج، أو None إذا فشل تحميله
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"النموذج غير مسجل: {name}")
+
+        # المسار السريع بدون قفل بعد التحميل
+        if entry.state == STATE_READY:
+            return entry.model
+
+        with entry.lock:
+            if entry.state == STATE_READY:
+                return entry.model
+
+            if (entry.state == STATE_FAILED and
+                    time.monotonic() - entry.failed_at < self.retry_interval):
+                return None
+
+            entry.state = STATE_LOADING
+            started = time.monotonic()
+            logger.info(f"تحميل النموذج {name}...")
+
+            try:
+                entry.model = entry.loader()
+            except Exception as e:
+                entry.state = STATE_FAILED
+                entry.error = str(e)
+                entry.failed_at = time.monotonic()
+                logger.error(f"خطأ في تحميل النموذج {name}: {e}")
+                return None
+
+            entry.load_seconds = round(time.monotonic() - started, 3)
+            entry.error = None
+            entry.state = STATE_READY
+            logger.info(f"تم تحميل النموذج {name} في {entry.load_seconds}s")
+            return entry.model
+
+    def is_ready(self, name: str) -> bool:
+        """
+        التحقق من أن النموذج محمل
+
+        Args:
+            name: اسم النموذج
+
+        Returns:
+            bool: True إذا كان النموذج جاهزاً
+        """
+        entry = self._entries.get(name)
+        return entry is not None and entry.state == STATE_READY
+
+    def warm_up(self, names: Optional[Union[str, Iterable[str]]] = None
+                ) -> threading.Thread:
+        """
+        تحميل النماذج في خيط خلفي دون تعطيل استقبال الطلبات
+
+        Args:
+            names: أسماء النماذج (قائمة أو نص مفصول بفواصل)؛
+                   افتراضياً MODEL_WARMUP_MODELS
+
+        Returns:
+            threading.Thread: خيط التسخين
+        """
+        if names is None:
+            names = settings.MODEL_WARMUP_MODELS
+        if isinstance(names, str):
+            names = [name.strip() for name in names.split(",") if name.strip()]
+
+        selected: List[str] = []
+        for name in names:
+            if name in self._entries:
+                selected.append(name)
+            else:
+                logger.warning(f"تجاهل نموذج غير مسجل في التسخين: {name}")
+
+        def run():
+            for name in selected:
+                self.get(name)
+            logger.info(f"اكتمل تسخين النماذج: {', '.join(selected) or '-'}")
+
+        self._warmup_thread = threading.Thread(
+            target=run, name="boai-model-warmup", daemon=True
+        )
+        self._warmup_thread.start()
+        return self._warmup_thread
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """
+        الحصول على جاهزية كل نموذج
+
+        Returns:
+            Dict[str, Dict[str, Any]]: الحالة، زمن التحميل، وآخر خطأ لكل نموذج
+        """
+        return {
+            name: {
+                'state': entry.state,
+                'load_seconds': entry.load_seconds,
+                'error': entry.error
+            }
+            for name, entry in self._entries.items()
+        }
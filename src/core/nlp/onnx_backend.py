@@ -0,0 +1,99 @@
+"""
+واجهة ONNX Runtime - تشغيل النماذج المصدّرة إلى ONNX على المعالج
+
+هذا الملف يحتوي على تحميل النماذج المصدّرة (عبر ModelManager.export_onnx)
+من MODELS_DIR/<name>/<version>/onnx وتشغيلها عبر ONNX Runtime بعدد خيوط
+مضبوط داخل العملية الواحدة (intra-op) وبين العمليات (inter-op)، مع واجهة
+pipeline من transformers نفسها حتى لا يتغير كود الاستدعاء
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Union
+
+from src.core.config import settings
+
+# إعداد التسجيل
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# ONNX Runtime و optimum اختياريان؛ بدونهما تعمل النماذج عبر PyTorch
+try:
+    import onnxruntime
+    from optimum import onnxruntime as ort_models
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+# فئة نموذج optimum المناسبة لكل مهمة pipeline
+ORT_MODEL_CLASSES = {
+    "ner": "ORTModelForTokenClassification",
+    "token-classification": "ORTModelForTokenClassification",
+    "summarization": "ORTModelForSeq2SeqLM",
+    "text2text-generation": "ORTModelForSeq2SeqLM",
+    "translation": "ORTModelForSeq2SeqLM",
+    "text-generation": "ORTModelForCausalLM",
+}
+
+
+def ort_model_class(task: str) -> Any:
+    """
+    الحصول على فئة نموذج optimum لمهمة
+
+    Args:
+        task: مهمة الـ pipeline
+
+    Returns:
+        Any: فئة ORTModel المناسبة
+
+    Raises:
+        RuntimeError: إذا لم تكن ONNX Runtime مثبتة
+        ValueError: إذا كانت المهمة غير مدعومة
+    """
+    if not ONNX_AVAILABLE:
+        raise RuntimeError("ONNX Runtime غير مثبت (pip install optimum[onnxruntime])")
+    if task not in ORT_MODEL_CLASSES:
+        raise ValueError(f"مهمة غير مدعومة في ONNX: {task}")
+    return getattr(ort_models, ORT_MODEL_CLASSES[task])
+
+
+def session_options() -> Any:
+    """
+    إعدادات جلسة ONNX Runtime
+
+    Returns:
+        onnxruntime.SessionOptions: خيوط intra/inter-op وتحسين الرسم الكامل
+    """
+    options = onnxruntime.SessionOptions()
+    # 0 يعني أن ONNX Runtime يختار عدد الأنوية الفعلية
+    options.intra_op_num_threads = settings.ONNX_INTRA_OP_THREADS
+    options.inter_op_num_threads = settings.ONNX_INTER_OP_THREADS
+    options.execution_mode = (onnxruntime.ExecutionMode.ORT_PARALLEL
+                              if settings.ONNX_INTER_OP_THREADS > 1
+                              else onnxruntime.ExecutionMode.ORT_SEQUENTIAL)
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return options
+
+
+def load_onnx_pipeline(task: str, onnx_path: Union[str, Path], **kwargs) -> Any:
+    """
+    تحميل نموذج ONNX مصدّر في pipeline من transformers
+
+    Args:
+        task: مهمة الـ pipeline
+        onnx_path: مجلد النموذج المصدّر (الرسوم والمحلل)
+        **kwargs: معاملات إضافية للـ pipeline
+
+    Returns:
+        Any: الـ pipeline المحمل
+    """
+    from transformers import AutoTokenizer, pipeline
+
+    model = ort_model_class(task).from_pretrained(
+        str(onnx_path),
+        provider="CPUExecutionProvider",
+        session_options=session_options()
+    )
+    tokenizer = AutoTokenizer.from_pretrained(str(onnx_path))
+    logger.info(f"تم تحميل نموذج ONNX ({task}) من {onnx_path}")
+    return pipeline(task, model=model, tokenizer=tokenizer, **kwargs)
@@ -5,32 +5,60 @@
 يدعم كشف اللغة، الترجمة، والتوليد متعدد اللغات
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import queue
 import re
-from langdetect import detect, DetectorFactory
+import threading
+import time
 import spacy
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
+from transformers import (
+    AutoTokenizer, AutoModelForSeq2SeqLM, StoppingCriteria, StoppingCriteriaList,
+    TextIteratorStreamer
+)
 from deep_translator import GoogleTranslator
 import torch
-import httpx
-from functools import lru_cache
-import requests
 from urllib.parse import quote
 import openai
 
 # Import settings
 from src.core.config import settings
-
-# ضمان نتائج ثابتة للكشف عن اللغة
-DetectorFactory.seed = 0
+from src.core.nlp.batching import MicroBatcher
+from src.core.nlp.conversation_context import ConversationContextBuilder
+from src.core.nlp.generation_router import (
+    TIER_CACHE, TIER_FALLBACK, TIER_GPT2, TIER_OPENAI, TIER_T5,
+    Deadline, GenerationRouter, PartialResponse
+)
+from src.core.nlp.language_detection import LanguageDetector
+from src.core.nlp.local_translation import LocalTranslator
+from src.core.nlp.model_registry import LazyModelRegistry, parse_language_models
+from src.core.nlp.onnx_backend import ONNX_AVAILABLE, load_onnx_pipeline
+from src.core.nlp.quantization import load_pipeline
+from src.core.nlp.response_cache import ResponseCache
+from src.core.nlp.summarization import ChunkedSummarizer, model_key
+from src.core.nlp.translation_client import translation_client
+from src.core.nlp.translation_memory import TranslationMemory
+from src.core.utils.singleflight import SingleFlight
 
 # إعداد التسجيل
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# تعيين HTTP client للترجمة
-translation_client = httpx.AsyncClient(timeout=30.0)
+# أقصى انتظار لخيط generate بعد طلب الإيقاف (يتوقف عند الرمز التالي)
+# حتى لا يبقى خيط المنفذ محجوزاً طوال مهلة الرمز
+_GENERATION_STOP_JOIN_TIMEOUT = 0.5
+
+
+class _StopEventCriteria(StoppingCriteria):
+    """إيقاف generate عند تعيين علامة الإيقاف (توقف المستهلك أو انقطاع العميل)"""
+
+    def __init__(self, stop_event: threading.Event):
+        self.stop_event = stop_event
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        return self.stop_event.is_set()
+
 
 class NLPPipeline:
     """
@@ -42,44 +70,180 @@ class NLPPipeline:
         تهيئة خط أنابيب المعالجة اللغوية
         """
         self.supported_languages = ['ar', 'en', 'fr', 'es', 'de', 'it', 'ru']
+        self.language_detector = LanguageDetector(self.supported_languages)
+        
+        # محرك الترجمة المحلي (اختياري) وذاكرة الترجمة المشتركة بين العمال
+        self.local_translator = LocalTranslator()
+        self.translation_memory = TranslationMemory()
+        
+        # ذاكرة مؤقتة للردود المولدة
+        self.response_cache = ResponseCache()
+        
+        # دمج الطلبات المتطابقة الجارية في عملية توليد واحدة
+        self.single_flight = SingleFlight()
+        
+        # مجمّعات الدفعات لطلبات التوليد المتزامنة
+        self.t5_batcher = None
+        self.gpt2_batcher = None
+        if settings.GENERATION_BATCHING_ENABLED:
+            self.t5_batcher = MicroBatcher(
+                self._generate_t5_batch,
+                max_batch_size=settings.GENERATION_BATCH_MAX_SIZE,
+                max_wait_ms=settings.GENERATION_BATCH_WINDOW_MS,
+                name="t5-batcher",
+                pass_max_time=True,
+                deadline_bucket=settings.GENERATION_BATCH_DEADLINE_BUCKET
+            )
+            self.gpt2_batcher = MicroBatcher(
+                self._generate_gpt2_batch,
+                max_batch_size=settings.GENERATION_BATCH_MAX_SIZE,
+                max_wait_ms=settings.GENERATION_BATCH_WINDOW_MS,
+                name="gpt2-batcher",
+                pass_max_time=True,
+                deadline_bucket=settings.GENERATION_BATCH_DEADLINE_BUCKET
+            )
         
-        # تحميل نماذج معالجة اللغة الطبيعية
-        self._load_models()
+        # مهلة كلية لكل طلب توليد وشريحة زمنية لكل مستوى (OpenAI, T5, GPT-2)
+        self.generation_router = GenerationRouter()
+        
+        # نماذج للترجمة (سيتم تحميلها عند الحاجة)
+        self.translation_models = {}
+        
+        # تهيئة OpenAI إذا كان المفتاح متوفراً
+        if settings.OPENAI_API_KEY:
+            openai.api_key = settings.OPENAI_API_KEY
+        
+        # تسجيل النماذج دون تحميلها؛ كل نموذج يُحمّل عند أول استخدام
+        # (من نسخة ONNX في مجلد النماذج إذا وُجدت)
+        self.model_manager = None
+        self.model_registry = LazyModelRegistry()
+        self.native_ner_models = parse_language_models(settings.NER_NATIVE_MODELS)
+        self.native_summarization_models = parse_language_models(
+            settings.SUMMARIZATION_NATIVE_MODELS
+        )
+        self._register_models()
+        
+        # سياق المحادثة من الأدوار السابقة ضمن ميزانية رموز نموذج التوليد
+        self.conversation_context = ConversationContextBuilder(
+            self._context_tokenizer,
+            summarizer=lambda text: self._summarize_text(
+                text, self.detect_language(text)
+            )
+        )
         
         logger.info("تم تهيئة NLPPipeline بنجاح")
     
-    def _load_models(self):
-        """تحميل نماذج المعالجة اللغوية"""
-        try:
-            # نموذج لكشف الكيانات المسماة (NER)
-            self.ner_model = pipeline(
-                "ner",
-                aggregation_strategy="simple",
-                device=0 if torch.cuda.is_available() else -1
+    def _register_models(self):
+        """تسجيل دوال تحميل نماذج المعالجة اللغوية"""
+        self.model_registry.register("ner", self._load_ner_model)
+        self.model_registry.register("summarization", self._load_summarization_model)
+        
+        # نماذج أصلية متعددة اللغات لكل لغة (بدون الترجمة إلى الإنجليزية)
+        for language, model_id in self.native_ner_models.items():
+            self.model_registry.register(
+                f"ner:{language}",
+                lambda model_id=model_id, name=f"ner:{language}":
+                    self._load_ner_model(model_id, name)
             )
-            
-            # نموذج للتلخيص
-            self.summarization_model = pipeline(
-                "summarization",
-                model="facebook/bart-large-cnn",
-                device=0 if torch.cuda.is_available() else -1
+        for language, model_id in self.native_summarization_models.items():
+            self.model_registry.register(
+                f"summarization:{language}",
+                lambda model_id=model_id, name=f"summarization:{language}":
+                    self._load_summarization_model(model_id, name)
             )
+        self.model_registry.register("t5", self._load_t5_model)
+        self.model_registry.register("gpt2", self._load_gpt2_model)
+    
+    def _get_model_manager(self):
+        """مدير النماذج (يُنشأ عند الحاجة إذا لم يُربط من الخارج)"""
+        if self.model_manager is None:
+            from src.core.models.model_manager import ModelManager
+            self.model_manager = ModelManager(settings.MODELS_DIR)
+        return self.model_manager
+    
+    def _load_backend(self, task: str, model_id: Optional[str], name: str, **kwargs):
+        """
+        تحميل النموذج عبر ONNX Runtime إذا كانت له نسخة مصدّرة، وإلا عبر PyTorch
+        
+        Args:
+            task: مهمة الـ pipeline
+            model_id: اسم النموذج في Hugging Face Hub
+            name: اسم النموذج في سجل النماذج
+            **kwargs: معاملات إضافية للـ pipeline
             
-            # نموذج للترجمة (سيتم تحميله عند الحاجة)
-            self.translation_models = {}
-            
-            # تهيئة OpenAI إذا كان المفتاح متوفراً
-            if settings.OPENAI_API_KEY:
-                openai.api_key = settings.OPENAI_API_KEY
-            
-            logger.info("تم تحميل نماذج المعالجة اللغوية بنجاح")
+        Returns:
+            الـ pipeline المحمل
+        """
+        if settings.ONNX_ENABLED and ONNX_AVAILABLE:
+            # ner:ar -> ner-ar في مجلد النماذج
+            onnx_path = self._get_model_manager().get_onnx_path(name.replace(":", "-"))
+            if onnx_path:
+                try:
+                    return load_onnx_pipeline(task, onnx_path, **kwargs)
+                except Exception as e:
+                    logger.warning(
+                        f"تعذر تحميل نسخة ONNX من {name}؛ استخدام PyTorch: {e}"
+                    )
+        return load_pipeline(task, model_id, name, **kwargs)
+    
+    def _load_ner_model(self, model_id: Optional[str] = None, name: str = "ner"):
+        """تحميل نموذج كشف الكيانات المسماة (NER)"""
+        return self._load_backend("ner", model_id, name, aggregation_strategy="simple")
+    
+    def _load_summarization_model(self, model_id: str = "facebook/bart-large-cnn",
+                                  name: str = "summarization"):
+        """تحميل نموذج التلخيص"""
+        return self._load_backend("summarization", model_id, name)
+    
+    def _load_t5_model(self):
+        """تحميل نموذج T5"""
+        return self._load_backend("text2text-generation", "t5-small", "t5")
+    
+    def _load_gpt2_model(self):
+        """تحميل نموذج GPT-2"""
+        text_generation_model = self._load_backend("text-generation", "gpt2", "gpt2")
+        # GPT-2 بدون رمز حشو؛ الحشو من اليسار ضروري للتوليد في دفعات
+        tokenizer = text_generation_model.tokenizer
+        tokenizer.pad_token = tokenizer.eos_token
+        tokenizer.padding_side = "left"
+        return text_generation_model
+    
+    @property
+    def ner_model(self):
+        """نموذج NER (يُحمّل عند أول استخدام)"""
+        return self.model_registry.get("ner")
+    
+    @property
+    def summarization_model(self):
+        """نموذج التلخيص (يُحمّل عند أول استخدام)"""
+        return self.model_registry.get("summarization")
+    
+    def _context_tokenizer(self):
+        """
+        محلل نموذج التوليد (T5) لحساب ميزانية سياق المحادثة
+        
+        لا يحمّل النموذج؛ قبل تحميله تُعد الكلمات بدلاً من الرموز
+        """
+        if not self.model_registry.is_ready("t5"):
+            return None
+        return self.model_registry.get("t5").tokenizer
+    
+    def _get_native_model(self, task: str, language: str):
+        """
+        الحصول على النموذج الأصلي للغة إذا كان مُعداً
+        
+        Args:
+            task: المهمة (ner أو summarization)
+            language: لغة النص
             
-        except Exception as e:
-            logger.error(f"خطأ في تحميل النماذج: {e}")
-            # نماذج بديلة في حالة الخطأ
-            self.ner_model = None
-            self.summarization_model = None
-            self.translation_models = {}
+        Returns:
+            النموذج، أو None إذا لم يكن للغة نموذج أصلي أو فشل تحميله
+        """
+        native_models = (self.native_ner_models if task == "ner"
+                         else self.native_summarization_models)
+        if language not in native_models:
+            return None
+        return self.model_registry.get(f"{task}:{language}")
     
     def detect_language(self, text: str) -> str:
         """
@@ -95,21 +259,13 @@ class NLPPipeline:
             if not text or len(text.strip()) < 3:
                 return 'unknown'
             
-            # استخدام langdetect للكشف عن اللغة
-            detected_lang = detect(text)
-            
-            # التأكد من أن اللغة مدعومة
-            if detected_lang in self.supported_languages:
-                return detected_lang
-            else:
-                # افتراض الإنجليزية إذا كانت اللغة غير مدعومة
-                return 'en'
+            # نظام الكتابة أولاً، ثم langdetect للنصوص اللاتينية فقط
+            return self.language_detector.detect(text)
                 
         except Exception as e:
             logger.error(f"خطأ في كشف اللغة: {e}")
             return 'en'  # افتراض الإنجليزية في حالة الخطأ
     
-    @lru_cache(maxsize=1000)
     def translate_text(self, text: str, target_lang: str = 'en', 
                       source_lang: str = 'auto') -> str:
         """
@@ -133,73 +289,120 @@ class NLPPipeline:
             if source_lang == target_lang:
                 return text  # لا حاجة للترجمة إذا كانت اللغة نفسها
             
-            # محاولة استخدام Google Translate API الرسمي إذا كان المفتاح متوفراً
-            if settings.GOOGLE_TRANSLATE_API_KEY:
-                try:
-                    translation = self._translate_with_google_api(text, source_lang, target_lang)
-                    if translation:
-                        return translation
-                except Exception as e:
-                    logger.warning(f"Google Translate API فشل: {e}")
+            # البحث في ذاكرة الترجمة قبل استدعاء الخدمات الخارجية
+            translation = self.translation_memory.get(text, source_lang, target_lang)
+            if translation is not None:
+                return translation
             
-            # استخدام deep-translator كبديل
-            try:
-                translator = GoogleTranslator(source=source_lang, target=target_lang)
-                translation = translator.translate(text)
-                if translation:
-                    return translation
-            except Exception as e:
-                logger.warning(f"deep-translator فشل: {e}")
+            # المحرك المحلي أولاً (بدون شبكة)، ثم الخدمات الخارجية
+            translation = self.local_translator.translate(
+                text, source_lang, target_lang
+            )
+            if not translation:
+                translation = self._translate_with_providers(
+                    text, source_lang, target_lang
+                )
+            if translation:
+                self.translation_memory.set(text, source_lang, target_lang, translation)
+                return translation
             
-            # Fallback إلى الترجمة البسيطة إذا فشلت جميع APIs
+            # Fallback إلى الترجمة البسيطة إذا فشلت جميع APIs (لا تُحفظ)
             return self._simple_translation_fallback(text, source_lang, target_lang)
             
         except Exception as e:
             logger.error(f"خطأ في الترجمة: {e}")
             return self._simple_translation_fallback(text, source_lang, target_lang)
     
-    def _translate_with_google_api(self, text: str, source_lang: str, target_lang: str) -> str:
+    def _translate_with_providers(self, text: str, source_lang: str,
+                                  target_lang: str,
+                                  use_google_api: bool = True) -> Optional[str]:
         """
-        استخدام Google Translate API الرسمي للترجمة
+        الترجمة عبر الخدمات الخارجية بالترتيب
         
         Args:
             text: النص المترجم
             source_lang: اللغة المصدر
             target_lang: اللغة المستهدفة
+            use_google_api: تجربة Google Translate API الرسمي أولاً
             
         Returns:
-            str: النص المترجم
+            Optional[str]: النص المترجم، أو None إذا فشلت جميع الخدمات
         """
+        # محاولة استخدام Google Translate API الرسمي إذا كان المفتاح متوفراً
+        if use_google_api and settings.GOOGLE_TRANSLATE_API_KEY:
+            try:
+                translation = self._translate_with_google_api(
+                    text, source_lang, target_lang
+                )
+                if translation:
+                    return translation
+            except Exception as e:
+                logger.warning(f"Google Translate API فشل: {e}")
+        
+        # استخدام deep-translator كبديل
         try:
-            # بناء URL لـ Google Translate API
-            base_url = "https://translation.googleapis.com/language/translate/v2"
-            params = {
-                'q': text,
-                'source': source_lang,
-                'target': target_lang,
-                'format': 'text',
-                'key': settings.GOOGLE_TRANSLATE_API_KEY
-            }
-            
-            # إرسال الطلب
-            response = requests.post(base_url, data=params, timeout=10)
-            response.raise_for_status()
-            
-            # معالجة الاستجابة
-            data = response.json()
-            if 'data' in data and 'translations' in data['data']:
-                translations = data['data']['translations']
-                if translations and len(translations) > 0:
-                    return translations[0]['translatedText']
+            translator = GoogleTranslator(source=source_lang, target=target_lang)
+            translation = translator.translate(text)
+            if translation:
+                return translation
+        except Exception as e:
+            logger.warning(f"deep-translator فشل: {e}")
+        
+        return None
+    
+    def preseed_translation_memory(self, texts: List[str],
+                                   target_lang: str = 'en') -> int:
+        """
+        ترجمة مجموعة نصوص (مثل الرسائل السابقة) مسبقاً وحفظها في ذاكرة الترجمة
+        
+        Args:
+            texts: النصوص المراد ترجمتها
+            target_lang: اللغة المستهدفة
             
-            return None
+        Returns:
+            int: عدد الترجمات الجديدة المحفوظة
+        """
+        # تجميع النصوص حسب اللغة المصدر للبحث عنها في ذاكرة الترجمة دفعة واحدة
+        groups: Dict[str, List[str]] = {}
+        for text in dict.fromkeys(texts):
+            if not text or not text.strip():
+                continue
+            source_lang = self.detect_language(text)
+            if source_lang != target_lang:
+                groups.setdefault(source_lang, []).append(text)
+        
+        entries = []
+        for source_lang, group in groups.items():
+            cached = self.translation_memory.get_many(group, source_lang, target_lang)
+            for text, known in zip(group, cached):
+                if known is not None:
+                    continue
+                translation = self._translate_with_providers(
+                    text, source_lang, target_lang
+                )
+                if translation:
+                    entries.append((text, source_lang, target_lang, translation))
+        
+        stored = self.translation_memory.preseed(entries)
+        logger.info(f"تم حفظ {stored} ترجمة مسبقاً في ذاكرة الترجمة")
+        return stored
+    
+    def _translate_with_google_api(self, text: str, source_lang: str, target_lang: str) -> str:
+        """
+        استخدام Google Translate API الرسمي للترجمة
+        
+        Args:
+            text: النص المترجم
+            source_lang: اللغة المصدر
+            target_lang: اللغة المستهدفة
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"خطأ في اتصال Google Translate API: {e}")
-            raise
-        except Exception as e:
-            logger.error(f"خطأ في معالجة استجابة Google Translate API: {e}")
-            raise
+        Returns:
+            str: النص المترجم
+        """
+        # عبر العميل المشترك (اتصالات مُعاد استخدامها وإعادة محاولة)
+        return translation_client.translate_batch_sync(
+            [text], source_lang, target_lang
+        )[0]
     
     def _simple_translation_fallback(self, text: str, source_lang: str, target_lang: str) -> str:
         """
@@ -270,9 +473,134 @@ class NLPPipeline:
                                  source_lang: str = 'auto') -> str:
         """
         ترجمة غير متزامنة للنص (للاستخدام في واجهات غير متزامنة)
+        
+        Args:
+            text: النص المترجم
+            target_lang: اللغة المستهدفة
+            source_lang: اللغة المصدر (auto للكشف التلقائي)
+            
+        Returns:
+            str: النص المترجم
+        """
+        translations = await self.translate_batch_async(
+            [text], target_lang, source_lang
+        )
+        return translations[0]
+    
+    async def translate_batch_async(self, texts: List[str], target_lang: str = 'en',
+                                    source_lang: str = 'auto') -> List[str]:
+        """
+        ترجمة مجموعة نصوص بشكل غير متزامن مع تجميعها في طلبات مشتركة
+        
+        النصوص الموجودة في ذاكرة الترجمة لا تُرسل، والباقي يُجمع حسب
+        اللغة المصدر في طلبات Translate v2 متعددة الـ q
+        
+        Args:
+            texts: النصوص المراد ترجمتها
+            target_lang: اللغة المستهدفة
+            source_lang: اللغة المصدر (auto للكشف التلقائي)
+            
+        Returns:
+            List[str]: الترجمات بنفس ترتيب النصوص
+        """
+        results = list(texts)
+        groups: Dict[str, Dict[str, List[int]]] = {}
+        
+        for index, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            text_source = (
+                self.detect_language(text) if source_lang == 'auto' else source_lang
+            )
+            if text_source == target_lang:
+                continue
+            # تجميع النصوص المتكررة في عنصر واحد
+            groups.setdefault(text_source, {}).setdefault(text, []).append(index)
+        
+        # البحث في ذاكرة الترجمة دفعة واحدة لكل لغة مصدر
+        pending: Dict[str, Dict[str, List[int]]] = {}
+        for text_source, group in groups.items():
+            unique_texts = list(group)
+            cached = self.translation_memory.get_many(
+                unique_texts, text_source, target_lang
+            )
+            for text, translation in zip(unique_texts, cached):
+                if translation is not None:
+                    for index in group[text]:
+                        results[index] = translation
+                else:
+                    pending.setdefault(text_source, {})[text] = group[text]
+        
+        for text_source, group in pending.items():
+            unique_texts = list(group)
+            translations = await self._translate_group_async(
+                unique_texts, text_source, target_lang
+            )
+            
+            self.translation_memory.preseed([
+                (text, text_source, target_lang, translation)
+                for text, translation in zip(unique_texts, translations)
+                if translation
+            ])
+            translations = [
+                translation
+                or self._simple_translation_fallback(text, text_source, target_lang)
+                for text, translation in zip(unique_texts, translations)
+            ]
+            
+            for text, translation in zip(unique_texts, translations):
+                for index in group[text]:
+                    results[index] = translation
+        
+        return results
+    
+    async def _translate_group_async(self, texts: List[str], source_lang: str,
+                                     target_lang: str) -> List[Optional[str]]:
+        """
+        ترجمة نصوص بنفس اللغة المصدر: محلياً أولاً، ثم Google API، ثم deep-translator
+        
+        Args:
+            texts: النصوص (بدون تكرار)
+            source_lang: اللغة المصدر
+            target_lang: اللغة المستهدفة
+            
+        Returns:
+            List[Optional[str]]: الترجمات، وNone لما فشلت جميع الطرق في ترجمته
         """
-        # يمكن تنفيذ هذا لاحقاً باستخدام async HTTP clients
-        return self.translate_text(text, target_lang, source_lang)
+        translations: List[Optional[str]] = [None] * len(texts)
+        
+        if self.local_translator.supports(source_lang, target_lang):
+            try:
+                translations = await asyncio.to_thread(
+                    self.local_translator.translate_batch,
+                    texts, source_lang, target_lang
+                )
+            except Exception as e:
+                logger.warning(f"فشلت الترجمة المحلية: {e}")
+        
+        missing = [i for i, translation in enumerate(translations) if not translation]
+        if missing and settings.GOOGLE_TRANSLATE_API_KEY:
+            try:
+                network_translations = await translation_client.translate_batch(
+                    [texts[i] for i in missing], source_lang, target_lang
+                )
+                for i, translation in zip(missing, network_translations):
+                    translations[i] = translation
+            except Exception as e:
+                logger.warning(f"Google Translate API فشل: {e}")
+        
+        missing = [i for i, translation in enumerate(translations) if not translation]
+        if missing:
+            # deep-translator متزامن، لذا يعمل خارج حلقة الأحداث
+            fallback_translations = await asyncio.gather(*[
+                asyncio.to_thread(self._translate_with_providers, texts[i],
+                                  source_lang, target_lang, False)
+                for i in missing
+            ])
+            for i, translation in zip(missing, fallback_translations):
+                translations[i] = translation
+        
+        return translations
     
     def process_text(self, text: str, language: str = 'auto', 
                     operations: List[str] = None) -> Dict:
@@ -319,7 +647,7 @@ class NLPPipeline:
                         'tokens': tokens[:10]  # أول 10 tokens فقط للعرض
                     }
                 
-                elif operation == 'ner' and self.ner_model:
+                elif operation == 'ner':
                     entities = self._extract_entities(text, results['language'])
                     results['entities'] = entities
                     results['operations']['ner'] = {
@@ -327,7 +655,7 @@ class NLPPipeline:
                         'entities': entities
                     }
                 
-                elif operation == 'summarize' and self.summarization_model:
+                elif operation == 'summarize':
                     summary = self._summarize_text(text, results['language'])
                     results['operations']['summarization'] = {
                         'summary': summary,
@@ -343,6 +671,105 @@ class NLPPipeline:
             results['error'] = str(e)
             return results
     
+    def process_texts(self, texts: Iterable[str], language: str = 'auto',
+                      operations: List[str] = None,
+                      batch_size: Optional[int] = None) -> Iterator[Dict]:
+        """
+        معالجة مجموعة نصوص في دفعات (للمهام الليلية على المحادثات السابقة)
+        
+        النصوص تُقرأ في نوافذ بحجم batch_size، وتُجمع كل نافذة حسب اللغة
+        بحيث يمر NER والتلخيص في تمريرة واحدة لكل لغة، ثم تُعاد النتائج
+        بنفس ترتيب المدخلات فور انتهاء كل نافذة
+        
+        Args:
+            texts: النصوص المدخلة (يمكن أن تكون مولداً)
+            language: لغة النصوص (auto للكشف التلقائي لكل نص)
+            operations: قائمة العمليات المطلوبة (كما في process_text)
+            batch_size: حجم النافذة
+            
+        Yields:
+            Dict: نتائج المعالجة لكل نص بنفس شكل process_text
+        """
+        if operations is None:
+            operations = ['detect_language', 'tokenize', 'ner']
+        batch_size = batch_size or settings.PROCESS_TEXTS_BATCH_SIZE
+        
+        window: List[str] = []
+        for text in texts:
+            window.append(text)
+            if len(window) >= batch_size:
+                yield from self._process_window(window, language, operations)
+                window = []
+        if window:
+            yield from self._process_window(window, language, operations)
+    
+    def _process_window(self, texts: List[str], language: str,
+                        operations: List[str]) -> List[Dict]:
+        """معالجة نافذة نصوص مجمعة حسب اللغة (انظر process_texts)"""
+        results = [{
+            'original_text': text,
+            'processed_text': text,
+            'language': language,
+            'operations': {},
+            'entities': [],
+            'tokens': []
+        } for text in texts]
+        
+        # كشف اللغة وتجميع النصوص حسبها
+        groups: Dict[str, List[int]] = {}
+        for index, text in enumerate(texts):
+            if language == 'auto':
+                detected_lang = self.detect_language(text)
+                results[index]['language'] = detected_lang
+                results[index]['operations']['language_detection'] = {
+                    'detected_language': detected_lang,
+                    'confidence': 'high'
+                }
+            groups.setdefault(results[index]['language'], []).append(index)
+        
+        for group_language, indices in groups.items():
+            group_texts = [texts[i] for i in indices]
+            try:
+                for operation in operations:
+                    if operation == 'tokenize':
+                        for i in indices:
+                            tokens = self._tokenize_text(texts[i], group_language)
+                            results[i]['tokens'] = tokens
+                            results[i]['operations']['tokenization'] = {
+                                'token_count': len(tokens),
+                                'tokens': tokens[:10]
+                            }
+                    
+                    elif operation == 'ner':
+                        batch_entities = self._extract_entities_batch(
+                            group_texts, group_language
+                        )
+                        for i, entities in zip(indices, batch_entities):
+                            results[i]['entities'] = entities
+                            results[i]['operations']['ner'] = {
+                                'entity_count': len(entities),
+                                'entities': entities
+                            }
+                    
+                    elif operation == 'summarize':
+                        summaries = self._summarize_texts_batch(
+                            group_texts, group_language
+                        )
+                        for i, summary in zip(indices, summaries):
+                            results[i]['operations']['summarization'] = {
+                                'summary': summary,
+                                'original_length': len(texts[i]),
+                                'summary_length': len(summary)
+                            }
+                            results[i]['processed_text'] = summary
+            
+            except Exception as e:
+                logger.error(f"خطأ في معالجة دفعة النصوص ({group_language}): {e}")
+                for i in indices:
+                    results[i]['error'] = str(e)
+        
+        return results
+    
     def _tokenize_text(self, text: str, language: str) -> List[str]:
         """
         تقسيم النص إلى tokens
@@ -374,35 +801,51 @@ class NLPPipeline:
         Returns:
             List[Dict]: قائمة الكيانات المستخرجة
         """
-        try:
-            if not self.ner_model:
-                return []
+        return self._extract_entities_batch([text], language)[0]
+    
+    def _extract_entities_batch(self, texts: List[str],
+                                language: str) -> List[List[Dict]]:
+        """
+        استخراج الكيانات المسماة من نصوص بنفس اللغة في تمريرة واحدة
+        
+        Args:
+            texts: النصوص المدخلة
+            language: لغة النصوص
             
-            # الترجم إلى الإنجليزية للـ NER (النماذج الإنجليزية أفضل عادة)
-            if language != 'en':
-                translated_text = self.translate_text(text, 'en', language)
-            else:
-                translated_text = text
+        Returns:
+            List[List[Dict]]: الكيانات المستخرجة لكل نص
+        """
+        try:
+            # نموذج أصلي للغة: تمريرة واحدة والمواضع تشير إلى النص الأصلي
+            ner_model = self._get_native_model("ner", language)
+            inputs = texts
+            if not ner_model:
+                ner_model = self.ner_model
+                if not ner_model:
+                    return [[] for _ in texts]
+                
+                # الترجم إلى الإنجليزية للـ NER (المواضع تشير إلى النص المترجم)
+                if language != 'en':
+                    inputs = self._translate_many(texts, 'en', language)
             
             # استخراج الكيانات
-            entities = self.ner_model(translated_text)
+            outputs = ner_model(inputs, batch_size=len(inputs))
             
             # معالجة النتائج
-            processed_entities = []
-            for entity in entities:
-                processed_entities.append({
+            return [
+                [{
                     'entity': entity['entity_group'],
                     'word': entity['word'],
                     'score': float(entity['score']),
                     'start': entity['start'],
                     'end': entity['end']
-                })
-            
-            return processed_entities
+                } for entity in entities]
+                for entities in outputs
+            ]
             
         except Exception as e:
             logger.error(f"خطأ في استخراج الكيانات: {e}")
-            return []
+            return [[] for _ in texts]
     
     def _summarize_text(self, text: str, language: str) -> str:
         """
@@ -415,37 +858,115 @@ class NLPPipeline:
         Returns:
             str: النص المختصر
         """
+        return self._summarize_texts_batch([text], language)[0]
+    
+    def _summarize_texts_batch(self, texts: List[str], language: str) -> List[str]:
+        """
+        تلخيص نصوص بنفس اللغة في تمريرة واحدة
+        
+        Args:
+            texts: النصوص المدخلة
+            language: لغة النصوص
+            
+        Returns:
+            List[str]: الملخصات بنفس ترتيب النصوص
+        """
         try:
-            if not self.summarization_model:
-                return text
+            # نموذج أصلي للغة: تلخيص مباشر بدون ترجمة ذهاباً وإياباً
+            summarization_model = self._get_native_model("summarization", language)
+            translate = False
+            if not summarization_model:
+                summarization_model = self.summarization_model
+                if not summarization_model:
+                    return list(texts)
+                translate = language != 'en'
             
             # الترجم إلى الإنجليزية للتلخيص
-            if language != 'en':
-                translated_text = self.translate_text(text, 'en', language)
-            else:
-                translated_text = text
+            inputs = self._translate_many(texts, 'en', language) if translate else texts
+            
+            def summarize_batch(batch: List[str]) -> List[str]:
+                outputs = summarization_model(
+                    batch,
+                    batch_size=len(batch),
+                    max_length=150,
+                    min_length=30,
+                    do_sample=False
+                )
+                return [output['summary_text'] for output in outputs]
+            
+            # النصوص الأطول من نافذة النموذج تُلخص بطريقة map-reduce
+            # بدلاً من أن يقتطعها النموذج بصمت
+            summaries: List[Optional[str]] = [None] * len(inputs)
+            short_indices = list(range(len(inputs)))
+            if settings.SUMMARIZATION_CHUNKING_ENABLED:
+                tokenizer = summarization_model.tokenizer
+                chunked_summarizer = ChunkedSummarizer(
+                    summarize_batch,
+                    lambda text: len(tokenizer.encode(text, add_special_tokens=False)),
+                    model_key=model_key(summarization_model)
+                )
+                short_indices = []
+                for i, text in enumerate(inputs):
+                    if chunked_summarizer.needs_chunking(text):
+                        summaries[i] = chunked_summarizer.summarize(text)
+                    else:
+                        short_indices.append(i)
             
             # التلخيص
-            summary = self.summarization_model(
-                translated_text,
-                max_length=150,
-                min_length=30,
-                do_sample=False
-            )
+            if short_indices:
+                short_summaries = summarize_batch([inputs[i] for i in short_indices])
+                for i, summary in zip(short_indices, short_summaries):
+                    summaries[i] = summary
             
             # الترجم مرة أخرى إلى اللغة الأصلية إذا لزم الأمر
-            if language != 'en':
-                translated_summary = self.translate_text(summary[0]['summary_text'], language, 'en')
-                return translated_summary
-            else:
-                return summary[0]['summary_text']
+            if translate:
+                summaries = self._translate_many(summaries, language, 'en')
+            return summaries
             
         except Exception as e:
             logger.error(f"خطأ في التلخيص: {e}")
-            return text
+            return list(texts)
+    
+    def _translate_many(self, texts: List[str], target_lang: str,
+                        source_lang: str) -> List[str]:
+        """
+        ترجمة عدة نصوص بنفس اللغة المصدر (دفعة واحدة محلياً إذا أمكن)
+        
+        Args:
+            texts: النصوص المراد ترجمتها
+            target_lang: اللغة المستهدفة
+            source_lang: اللغة المصدر
+            
+        Returns:
+            List[str]: الترجمات بنفس ترتيب النصوص
+        """
+        if self.local_translator.supports(source_lang, target_lang):
+            cached = self.translation_memory.get_many(texts, source_lang, target_lang)
+            missing = [i for i, translation in enumerate(cached) if translation is None]
+            if missing:
+                try:
+                    local = self.local_translator.translate_batch(
+                        [texts[i] for i in missing], source_lang, target_lang
+                    )
+                    self.translation_memory.preseed([
+                        (texts[i], source_lang, target_lang, translation)
+                        for i, translation in zip(missing, local) if translation
+                    ])
+                    for i, translation in zip(missing, local):
+                        cached[i] = translation
+                except Exception as e:
+                    logger.warning(f"فشلت الترجمة المحلية: {e}")
+            return [
+                translation or self.translate_text(text, target_lang, source_lang)
+                for text, translation in zip(texts, cached)
+            ]
+        
+        return [self.translate_text(text, target_lang, source_lang) for text in texts]
     
     def generate_response(self, prompt: str, context: str = None, 
-                         language: str = 'auto') -> str:
+                         language: str = 'auto',
+                         conversation_id: Optional[str] = None,
+                         metadata: Optional[Dict[str, Any]] = None) -> str:
         """
         توليد رد ذكي بناء على prompt وسياق باستخدام نموذج توليد
         
@@ -453,72 +974,446 @@ class NLPPipeline:
             prompt: المطالبة المدخلة
             context: السياق (اختياري)
             language: لغة الرد
+            conversation_id: معرف المحادثة لإضافة أدوارها السابقة إلى السياق (اختياري)
+            metadata: قاموس يُسجل فيه مستوى الخدمة tier (اختياري)
             
         Returns:
             str: الرد المولد
         """
+        if metadata is None:
+            metadata = {}
+        deadline = self.generation_router.new_deadline()
         try:
             # كشف اللغة إذا كان تلقائي
             if language == 'auto':
                 language = self.detect_language(prompt)
             
-            # بناء prompt كامل مع السياق
-            full_prompt = prompt
-            if context:
-                full_prompt = f"Context: {context}\nQuestion: {prompt}\nAnswer:"
+            context = self._with_history(conversation_id, context)
             
-            # استخدام نموذج توليد متقدم
-            response = self._generate_with_advanced_model(full_prompt, language)
+            # البحث في ذاكرة الردود قبل التوليد
+            cached_response = self.response_cache.get(prompt, context, language)
+            if cached_response is not None:
+                metadata['tier'] = TIER_CACHE
+                return cached_response
             
-            # تنظيف الرد وإزالة التكرارات
-            cleaned_response = self._clean_generated_response(response, language)
-            
-            return cleaned_response
+            # الطلبات المتطابقة المتزامنة تشترك في عملية توليد واحدة
+            request_key = self.response_cache.make_key(prompt, context, language)
+            result = self.single_flight.do(
+                f"generate:{request_key}",
+                lambda: self._generate_and_cache(prompt, context, language, deadline),
+                timeout=deadline.remaining(),
+                # الرد البديل لا يُشارك مع العمال الآخرين كما لا يُخزن
+                shareable=lambda result: result['tier'] != TIER_FALLBACK
+            )
+            metadata['tier'] = result['tier']
+            return result['response']
                 
         except Exception as e:
             logger.error(f"خطأ في توليد الرد: {e}")
             # Fallback إلى الردود الأساسية في حالة الخطأ
+            metadata['tier'] = TIER_FALLBACK
             return self._fallback_response(prompt, language)
     
-    def _generate_with_advanced_model(self, prompt: str, language: str) -> str:
+    def cached_response(self, prompt: str, context: Optional[str] = None,
+                        language: str = 'auto',
+                        conversation_id: Optional[str] = None) -> Optional[str]:
         """
-        توليد الرد باستخدام نماذج متقدمة (OpenAI, T5, GPT-2)
+        البحث عن رد مخزن بدون توليد (للاستخدام عندما يكون طابور الاستدلال ممتلئاً)
         
         Args:
             prompt: المطالبة المدخلة
+            context: السياق (اختياري)
             language: لغة الرد
+            conversation_id: معرف المحادثة (اختياري)
             
         Returns:
-            str: الرد المولد
+            Optional[str]: الرد المخزن أو None
+        """
+        if language == 'auto':
+            language = self.detect_language(prompt)
+        context = self._with_history(conversation_id, context)
+        return self.response_cache.get(prompt, context, language)
+    
+    def _generate_and_cache(self, prompt: str, context: Optional[str], language: str,
+                            deadline: Optional[Deadline] = None) -> Dict[str, str]:
+        """
+        توليد الرد وتنظيفه وتخزينه في ذاكرة الردود
+        
+        Args:
+            prompt: المطالبة المدخلة
+            context: السياق (اختياري)
+            language: لغة الرد (بعد الكشف)
+            deadline: المهلة الكلية للطلب
+            
+        Returns:
+            Dict[str, str]: الرد بعد التنظيف (response) والمستوى الذي ولّده (tier)
+        """
+        # بناء prompt كامل مع السياق
+        full_prompt = self._build_prompt(prompt, context)
+        
+        # استخدام نموذج توليد متقدم
+        response, tier = self._generate_with_advanced_model(
+            full_prompt, language, deadline
+        )
+        if response is None:
+            # فشلت كل المستويات أو انتهت المهلة: الرد البديل لا يُخزن
+            return {
+                'response': self._fallback_response(prompt, language),
+                'tier': TIER_FALLBACK
+            }
+        
+        # تنظيف الرد وإزالة التكرارات
+        cleaned_response = self._clean_generated_response(response, language)
+        
+        # الرد المقطوع عند انتهاء المهلة يُرسل للمستخدم لكن لا يُخزن
+        if not isinstance(response, PartialResponse):
+            self.response_cache.set(prompt, context, language, cleaned_response)
+        return {'response': cleaned_response, 'tier': tier}
+    
+    def generate_response_stream(self, prompt: str, context: str = None,
+                                 language: str = 'auto',
+                                 conversation_id: Optional[str] = None,
+                                 metadata: Optional[Dict[str, Any]] = None
+                                 ) -> Iterator[str]:
+        """
+        توليد رد ذكي على شكل مقاطع نصية متتالية (token-by-token)
+        
+        Args:
+            prompt: المطالبة المدخلة
+            context: السياق (اختياري)
+            language: لغة الرد
+            conversation_id: معرف المحادثة لإضافة أدوارها السابقة إلى السياق (اختياري)
+            metadata: قاموس يُسجل فيه مستوى الخدمة tier (اختياري)
+            
+        Yields:
+            str: المقطع النصي التالي من الرد
         """
+        if metadata is None:
+            metadata = {}
+        deadline = self.generation_router.new_deadline()
+        started = False
         try:
-            # محاولة استخدام OpenAI API أولاً إذا كان المفتاح متوفراً
-            if settings.OPENAI_API_KEY:
-                try:
-                    return self._generate_with_openai(prompt, language)
-                except Exception as e:
-                    logger.warning(f"OpenAI API فشل: {e}")
+            # كشف اللغة إذا كان تلقائي
+            if language == 'auto':
+                language = self.detect_language(prompt)
             
-            # استخدام نموذج T5 للأسئلة البرمجية (أفضل من GPT-2 للإجابة على الأسئلة)
-            try:
-                return self._generate_with_t5(prompt, language)
-            except Exception as e:
-                logger.warning(f"نموذج T5 فشل: {e}")
+            context = self._with_history(conversation_id, context)
+            
+            # الرد المخزن يُرسل كمقطع واحد
+            cached_response = self.response_cache.get(prompt, context, language)
+            if cached_response is not None:
+                started = True
+                metadata['tier'] = TIER_CACHE
+                yield cached_response
+                return
+            
+            full_prompt = self._build_prompt(prompt, context)
             
-            # Fallback إلى GPT-2
-            return self._generate_with_gpt2(prompt, language)
+            tokens = []
+            for token in self._stream_with_advanced_model(
+                full_prompt, language, deadline, metadata
+            ):
+                if token:
+                    started = True
+                    tokens.append(token)
+                    yield token
+            
+            if not started:
+                metadata['tier'] = TIER_FALLBACK
+                yield self._fallback_response(prompt, language)
+            else:
+                self.response_cache.set(
+                    prompt, context, language,
+                    self._clean_generated_response("".join(tokens), language)
+                )
                 
         except Exception as e:
-            logger.error(f"خطأ في توليد النموذج المتقدم: {e}")
-            raise
+            logger.error(f"خطأ في توليد الرد المتدفق: {e}")
+            # لا يمكن استبدال رد بدأ إرساله بالفعل
+            if not started:
+                metadata['tier'] = TIER_FALLBACK
+                yield self._fallback_response(prompt, language)
+    
+    def _with_history(self, conversation_id: Optional[str],
+                      context: Optional[str]) -> Optional[str]:
+        """
+        دمج الأدوار السابقة للمحادثة مع السياق المرسل من العميل
+        
+        Args:
+            conversation_id: معرف المحادثة (اختياري)
+            context: السياق المرسل من العميل (اختياري)
+            
+        Returns:
+            Optional[str]: السياق الكامل
+        """
+        if not conversation_id:
+            return context
+        
+        history = self.conversation_context.build(conversation_id)
+        if not history:
+            return context
+        return f"{history}\n{context}" if context else history
+    
+    def _build_prompt(self, prompt: str, context: Optional[str]) -> str:
+        """
+        بناء prompt كامل مع السياق
+        
+        Args:
+            prompt: المطالبة المدخلة
+            context: السياق (اختياري)
+            
+        Returns:
+            str: الـ prompt الكامل
+        """
+        if context:
+            return f"Context: {context}\nQuestion: {prompt}\nAnswer:"
+        return prompt
+    
+    def _stream_with_advanced_model(self, prompt: str, language: str,
+                                    deadline: Optional[Deadline] = None,
+                                    metadata: Optional[Dict[str, Any]] = None
+                                    ) -> Iterator[str]:
+        """
+        بث الرد من نماذج متقدمة (OpenAI, T5, GPT-2) بنفس ترتيب الأولوية
+        
+        يتم الانتقال إلى النموذج التالي فقط إذا فشل النموذج الحالي قبل
+        إرسال أول مقطع، وكل نموذج محدود بشريحة زمنية من المهلة الكلية
+        
+        Args:
+            prompt: المطالبة المدخلة
+            language: لغة الرد
+            deadline: المهلة الكلية للطلب
+            metadata: قاموس يُسجل فيه المستوى الذي خدم الطلب
+            
+        Yields:
+            str: المقطع النصي التالي من الرد
+        """
+        tiers = []
+        if settings.OPENAI_API_KEY:
+            tiers.append((TIER_OPENAI, lambda timeout: self._stream_with_openai(
+                prompt, language, timeout
+            )))
+        tiers.append((TIER_T5, lambda timeout: self._stream_with_t5(
+            prompt, language, timeout
+        )))
+        tiers.append((TIER_GPT2, lambda timeout: self._stream_with_gpt2(
+            prompt, language, timeout
+        )))
+        
+        yield from self.generation_router.stream(tiers, deadline, metadata)
+    
+    def _stream_with_openai(self, prompt: str, language: str,
+                            timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        بث الرد من OpenAI API
+        
+        Args:
+            prompt: المطالبة المدخلة
+            language: لغة الرد
+            timeout: مهلة الطلب بالثواني (اختياري)
+            
+        Yields:
+            str: المقطع النصي التالي من الرد
+        """
+        response = openai.ChatCompletion.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {
+                    "role": "system",
+                    "content": (
+                        "You are BoAI, a helpful programming tutor assistant. "
+                        "Provide clear, concise, and accurate answers to "
+                        "programming questions. Focus on educational value and "
+                        "practical examples."
+                    )
+                },
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=300,
+            temperature=0.7,
+            top_p=0.9,
+            stream=True,
+            request_timeout=timeout
+        )
+        
+        for chunk in response:
+            delta = chunk.choices[0].get('delta', {}) if chunk.choices else {}
+            content = delta.get('content')
+            if content:
+                yield content
+    
+    def _stream_with_t5(self, prompt: str, language: str,
+                        timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        بث الرد من نموذج T5
+        
+        Args:
+            prompt: المطالبة المدخلة
+            language: لغة الرد
+            timeout: أقصى زمن للتوليد بالثواني (يتوقف بعده generate)
+            
+        Yields:
+            str: المقطع النصي التالي من الرد
+        """
+        t5_model = self._get_t5_model()
+        
+        yield from self._stream_generate(
+            t5_model,
+            f"question: {prompt} answer:",
+            skip_prompt=False,
+            max_length=200,
+            max_time=timeout,
+            temperature=0.7,
+            do_sample=True,
+            repetition_penalty=1.1
+        )
+    
+    def _stream_with_gpt2(self, prompt: str, language: str,
+                          timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        بث الرد من نموذج GPT-2
+        
+        Args:
+            prompt: المطالبة المدخلة
+            language: لغة الرد
+            timeout: أقصى زمن للتوليد بالثواني (يتوقف بعده generate)
+            
+        Yields:
+            str: المقطع النصي التالي من الرد
+        """
+        text_generation_model = self._get_gpt2_model()
+        
+        yield from self._stream_generate(
+            text_generation_model,
+            prompt,
+            skip_prompt=True,
+            max_length=150,
+            max_time=timeout,
+            temperature=0.7,
+            do_sample=True,
+            pad_token_id=50256  # GPT-2 pad token
+        )
+    
+    def _stream_generate(self, hf_pipeline, prompt: str, skip_prompt: bool,
+                         **generate_kwargs) -> Iterator[str]:
+        """
+        تشغيل model.generate في خيط منفصل وبث النص عبر TextIteratorStreamer
+        
+        Args:
+            hf_pipeline: pipeline من transformers (يوفر model و tokenizer)
+            prompt: المطالبة الكاملة
+            skip_prompt: تجاهل الـ prompt في المخرجات (لنماذج decoder-only)
+            **generate_kwargs: معاملات التوليد
+            
+        Yields:
+            str: المقطع النصي التالي
+        """
+        tokenizer = hf_pipeline.tokenizer
+        model = hf_pipeline.model
+        
+        inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
+        # مهلة انتظار كل مقطع حتى لا يعلق المستهلك إذا توقف generate
+        token_timeout = generate_kwargs.get('max_time') or settings.INFERENCE_TIMEOUT
+        streamer = TextIteratorStreamer(
+            tokenizer,
+            skip_prompt=skip_prompt,
+            skip_special_tokens=True,
+            timeout=token_timeout
+        )
+        stop_event = threading.Event()
+        errors = []
+        
+        def run_generate():
+            try:
+                model.generate(
+                    **inputs,
+                    streamer=streamer,
+                    stopping_criteria=StoppingCriteriaList(
+                        [_StopEventCriteria(stop_event)]
+                    ),
+                    **generate_kwargs
+                )
+            except Exception as e:
+                # إنهاء البث حتى لا ينتظر المستهلك مقاطع لن تصل
+                errors.append(e)
+                streamer.end()
+        
+        generation_thread = threading.Thread(target=run_generate, daemon=True)
+        generation_thread.start()
+        
+        try:
+            for text in streamer:
+                if text:
+                    yield text
+        except queue.Empty:
+            raise TimeoutError(f"لم يصل مقطع جديد من النموذج خلال {token_timeout}s")
+        finally:
+            # إيقاف generate إذا توقف المستهلك مبكراً (مثل انقطاع العميل)
+            stop_event.set()
+            generation_thread.join(timeout=_GENERATION_STOP_JOIN_TIMEOUT)
+            if generation_thread.is_alive():
+                logger.warning("خيط التوليد لم يتوقف بعد؛ تحرير خيط المنفذ")
+        
+        if errors:
+            raise errors[0]
+    
+    def _get_t5_model(self):
+        """الحصول على نموذج T5 (يُحمّل عند أول استخدام)"""
+        t5_model = self.model_registry.get("t5")
+        if t5_model is None:
+            raise RuntimeError("نموذج T5 غير متاح")
+        return t5_model
+    
+    def _get_gpt2_model(self):
+        """الحصول على نموذج GPT-2 (يُحمّل عند أول استخدام)"""
+        text_generation_model = self.model_registry.get("gpt2")
+        if text_generation_model is None:
+            raise RuntimeError("نموذج GPT-2 غير متاح")
+        return text_generation_model
+    
+    def _generate_with_advanced_model(self, prompt: str, language: str,
+                                      deadline: Optional[Deadline] = None
+                                      ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        توليد الرد باستخدام نماذج متقدمة (OpenAI, T5, GPT-2)
+        
+        كل نموذج يحصل على شريحة زمنية من المهلة الكلية، وينتقل الموجّه إلى
+        النموذج التالي عند الفشل أو انتهاء الشريحة
+        
+        Args:
+            prompt: المطالبة المدخلة
+            language: لغة الرد
+            deadline: المهلة الكلية للطلب
+            
+        Returns:
+            Tuple[Optional[str], Optional[str]]: (الرد، المستوى) أو (None, None)
+        """
+        tiers = []
+        # محاولة استخدام OpenAI API أولاً إذا كان المفتاح متوفراً
+        if settings.OPENAI_API_KEY:
+            tiers.append((TIER_OPENAI, lambda timeout: self._generate_with_openai(
+                prompt, language, timeout
+            )))
+        # استخدام نموذج T5 للأسئلة البرمجية (أفضل من GPT-2 للإجابة على الأسئلة)
+        tiers.append((TIER_T5, lambda timeout: self._generate_with_t5(
+            prompt, language, timeout
+        )))
+        # Fallback إلى GPT-2
+        tiers.append((TIER_GPT2, lambda timeout: self._generate_with_gpt2(
+            prompt, language, timeout
+        )))
+        
+        return self.generation_router.generate(tiers, deadline)
     
-    def _generate_with_openai(self, prompt: str, language: str) -> str:
+    def _generate_with_openai(self, prompt: str, language: str,
+                              timeout: Optional[float] = None) -> str:
         """
         توليد الرد باستخدام OpenAI API
         
         Args:
             prompt: المطالبة المدخلة
             language: لغة الرد
+            timeout: مهلة الطلب بالثواني (اختياري)
             
         Returns:
             str: الرد المولد
@@ -542,7 +1437,8 @@ class NLPPipeline:
                 messages=[system_message, user_message],
                 max_tokens=300,
                 temperature=0.7,
-                top_p=0.9
+                top_p=0.9,
+                request_timeout=timeout
             )
             
             if response and 'choices' in response and len(response.choices) > 0:
@@ -554,45 +1450,30 @@ class NLPPipeline:
             logger.error(f"خطأ في توليد النص مع OpenAI: {e}")
             raise
     
-    def _generate_with_t5(self, prompt: str, language: str) -> str:
+    def _generate_with_t5(self, prompt: str, language: str,
+                          timeout: Optional[float] = None) -> str:
         """
         توليد الرد باستخدام نموذج T5 (أفضل للإجابة على الأسئلة)
         
         Args:
             prompt: المطالبة المدخلة
             language: لغة الرد
+            timeout: أقصى زمن للانتظار والتوليد بالثواني (اختياري)
             
         Returns:
             str: الرد المولد
         """
         try:
-            # تحميل نموذج T5 إذا لم يكن محملاً
-            if not hasattr(self, 't5_model'):
-                self.t5_model = pipeline(
-                    "text2text-generation",
-                    model="t5-small",
-                    device=0 if torch.cuda.is_available() else -1,
-                    torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32
-                )
-            
             # صياغة الـ prompt بشكل مناسب لـ T5
             t5_prompt = f"question: {prompt} answer:"
             
-            # توليد الرد
-            generated_text = self.t5_model(
-                t5_prompt,
-                max_length=200,
-                num_return_sequences=1,
-                temperature=0.7,
-                do_sample=True,
-                repetition_penalty=1.1
-            )
+            # توليد الرد (ضمن دفعة مع الطلبات المتزامنة إذا كان التجميع مفعلاً)
+            if self.t5_batcher:
+                response = self.t5_batcher.submit(t5_prompt, timeout=timeout)
+            else:
+                response = self._generate_t5_batch([t5_prompt], max_time=timeout)[0]
             
-            if generated_text and len(generated_text) > 0:
-                response = generated_text[0]['generated_text'].strip()
-                # إزالة البادئة إذا كانت موجودة
-                if response.startswith("answer:"):
-                    response = response[7:].strip()
+            if response:
                 return response
             else:
                 return "I'll help you with your programming question."
@@ -601,48 +1482,140 @@ class NLPPipeline:
             logger.error(f"خطأ في توليد النص مع T5: {e}")
             raise
     
-    def _generate_with_gpt2(self, prompt: str, language: str) -> str:
+    def _generate_t5_batch(self, prompts: List[str],
+                           max_time: Optional[float] = None) -> List[str]:
+        """
+        توليد ردود T5 لدفعة من الـ prompts في تمريرة واحدة
+        
+        Args:
+            prompts: قائمة الـ prompts المصاغة لـ T5
+            max_time: أقصى زمن للتوليد بالثواني (افتراضياً شريحة T5)؛ في وضع
+                      التجميع هو أقصر مهلة متبقية بين عناصر الدفعة، وبعده
+                      يتوقف generate فلا يستهلك طلب ملغى المعالج
+            
+        Returns:
+            List[str]: الردود بنفس ترتيب المدخلات
+        """
+        # تحميل نموذج T5 إذا لم يكن محملاً
+        t5_model = self._get_t5_model()
+        
+        max_time = max_time or self.generation_router.budgets.get(TIER_T5)
+        started = time.monotonic()
+        
+        # الـ pipeline يقوم بحشو (padding) المدخلات معاً عند batch_size > 1
+        outputs = t5_model(
+            prompts,
+            batch_size=len(prompts),
+            max_length=200,
+            max_time=max_time,
+            num_return_sequences=1,
+            temperature=0.7,
+            do_sample=True,
+            repetition_penalty=1.1
+        )
+        
+        responses = []
+        for output in outputs:
+            if isinstance(output, list):
+                output = output[0] if output else {}
+            response = output.get('generated_text', '').strip()
+            # إزالة البادئة إذا كانت موجودة
+            if response.startswith("answer:"):
+                response = response[7:].strip()
+            responses.append(response)
+        
+        return self._mark_partial(responses, started, max_time)
+    
+    def _generate_with_gpt2(self, prompt: str, language: str,
+                            timeout: Optional[float] = None) -> str:
         """
         توليد الرد باستخدام نموذج GPT-2 (النسخة الاحتياطية)
         
         Args:
             prompt: المطالبة المدخلة
             language: لغة الرد
+            timeout: أقصى زمن للانتظار والتوليد بالثواني (اختياري)
             
         Returns:
             str: الرد المولد
         """
         try:
-            # تحميل نموذج التوليد إذا لم يكن محملاً
-            if not hasattr(self, 'text_generation_model'):
-                self.text_generation_model = pipeline(
-                    "text-generation",
-                    model="gpt2",
-                    device=0 if torch.cuda.is_available() else -1,
-                    torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32
-                )
-            
-            # توليد الرد
-            generated_text = self.text_generation_model(
-                prompt,
-                max_length=150,
-                num_return_sequences=1,
-                temperature=0.7,
-                do_sample=True,
-                pad_token_id=50256  # GPT-2 pad token
-            )
+            # توليد الرد (ضمن دفعة مع الطلبات المتزامنة إذا كان التجميع مفعلاً)
+            if self.gpt2_batcher:
+                response = self.gpt2_batcher.submit(prompt, timeout=timeout)
+            else:
+                response = self._generate_gpt2_batch([prompt], max_time=timeout)[0]
             
-            if generated_text and len(generated_text) > 0:
-                # استخراج النص المولد فقط (بعد الـ prompt)
-                full_text = generated_text[0]['generated_text']
-                response = full_text[len(prompt):].strip()
+            if response:
                 return response
             else:
                 return "I'm here to help you learn programming and technical concepts."
                 
         except Exception as e:
             logger.error(f"خطأ في توليد النص الإنجليزي: {e}")
-            return "I'll try to help you with your question about programming."
+            raise
+    
+    def _generate_gpt2_batch(self, prompts: List[str],
+                             max_time: Optional[float] = None) -> List[str]:
+        """
+        توليد ردود GPT-2 لدفعة من الـ prompts في تمريرة واحدة
+        
+        Args:
+            prompts: قائمة الـ prompts
+            max_time: أقصى زمن للتوليد بالثواني (افتراضياً شريحة GPT-2، وفي
+                      وضع التجميع أقصر مهلة متبقية بين عناصر الدفعة)
+            
+        Returns:
+            List[str]: النص المولد بعد كل prompt بنفس ترتيب المدخلات
+        """
+        # تحميل نموذج التوليد إذا لم يكن محملاً
+        text_generation_model = self._get_gpt2_model()
+        
+        max_time = max_time or self.generation_router.budgets.get(TIER_GPT2)
+        started = time.monotonic()
+        
+        outputs = text_generation_model(
+            prompts,
+            batch_size=len(prompts),
+            max_length=150,
+            max_time=max_time,
+            num_return_sequences=1,
+            temperature=0.7,
+            do_sample=True,
+            pad_token_id=50256  # GPT-2 pad token
+        )
+        
+        responses = []
+        for prompt, output in zip(prompts, outputs):
+            if isinstance(output, list):
+                output = output[0] if output else {}
+            # استخراج النص المولد فقط (بعد الـ prompt)
+            full_text = output.get('generated_text', '')
+            responses.append(full_text[len(prompt):].strip())
+        
+        return self._mark_partial(responses, started, max_time)
+    
+    @staticmethod
+    def _mark_partial(responses: List[str], started: float,
+                      max_time: Optional[float]) -> List[str]:
+        """
+        تمييز الردود كجزئية إذا توقف generate عند max_time
+        
+        generate لا يرفع خطأ عند انتهاء max_time بل يعيد النص المولد حتى
+        تلك اللحظة، لذا يُستدل على التوقف من الزمن المستغرق
+        
+        Args:
+            responses: الردود المولدة
+            started: وقت بدء التوليد (time.monotonic)
+            max_time: أقصى زمن التوليد المسموح
+            
+        Returns:
+            List[str]: الردود، كـ PartialResponse إذا استُنفد max_time
+        """
+        if max_time is None or time.monotonic() - started < max_time:
+            return responses
+        logger.warning(f"توقف التوليد عند انتهاء max_time ({max_time:.2f}s)؛ الرد جزئي")
+        return [PartialResponse(response) for response in responses]
     
     def _clean_generated_response(self, response: str, language: str) -> str:
         """
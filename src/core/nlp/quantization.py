@@ -0,0 +1,162 @@
+"""
+تكميم النماذج (Quantization) - تسريع الاستدلال على المعالج
+
+هذا الملف يحتوي على تحميل نماذج transformers مع وضع تكميم قابل للضبط
+يُطبق عند التحميل على الخوادم بدون GPU:
+- int8: تكميم ديناميكي لطبقات Linear (الأوزان int8 والتفعيلات تُكمم أثناء التشغيل)
+- bf16: تحميل الأوزان بدقة bfloat16 إذا كان المعالج يدعمها
+- none: float32 كما في السابق
+"""
+
+import logging
+from typing import Any, Optional
+
+import torch
+from transformers import pipeline
+
+from src.core.config import settings
+
+# إعداد التسجيل
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# أوضاع التكميم المدعومة
+QUANTIZATION_NONE = "none"
+QUANTIZATION_INT8 = "int8"
+QUANTIZATION_BF16 = "bf16"
+QUANTIZATION_MODES = (QUANTIZATION_NONE, QUANTIZATION_INT8, QUANTIZATION_BF16)
+
+
+def bf16_supported() -> bool:
+    """
+    التحقق من دعم المعالج لعمليات bfloat16 السريعة (AVX512-BF16 / AMX)
+
+    Returns:
+        bool: True إذا كان المعالج يدعم bf16
+    """
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except Exception:
+        return False
+
+
+def resolve_mode(model_name: str, mode: Optional[str] = None) -> str:
+    """
+    تحديد وضع التكميم الفعلي لنموذج
+
+    التكميم يخص المعالج فقط؛ على GPU تبقى النماذج بدقة float16
+
+    Args:
+        model_name: اسم النموذج في سجل النماذج (مثل t5 أو ner:ar)
+        mode: الوضع المطلوب (افتراضياً MODEL_QUANTIZATION)
+
+    Returns:
+        str: none أو int8 أو bf16
+    """
+    if mode is None:
+        mode = settings.MODEL_QUANTIZATION.lower()
+        selected = [
+            name.strip() for name in settings.MODEL_QUANTIZATION_MODELS.split(",")
+        ]
+        # النماذج الأصلية لكل لغة (ner:ar) تتبع إعداد مهمتها (ner)
+        if model_name.split(":", 1)[0] not in selected:
+            return QUANTIZATION_NONE
+
+    if mode not in QUANTIZATION_MODES:
+        logger.warning(f"وضع تكميم غير معروف: {mode}؛ استخدام none")
+        return QUANTIZATION_NONE
+
+    if mode == QUANTIZATION_NONE or torch.cuda.is_available():
+        return QUANTIZATION_NONE
+
+    if mode == QUANTIZATION_BF16 and not bf16_supported():
+        logger.warning(f"المعالج لا يدعم bf16؛ تحميل {model_name} بدقة float32")
+        return QUANTIZATION_NONE
+
+    return mode
+
+
+def model_dtype(mode: str) -> torch.dtype:
+    """
+    دقة تحميل الأوزان حسب الجهاز ووضع التكميم
+
+    Args:
+        mode: وضع التكميم الفعلي
+
+    Returns:
+        torch.dtype: float16 على GPU، bfloat16 لوضع bf16، وإلا float32
+    """
+    if torch.cuda.is_available():
+        return torch.float16
+    if mode == QUANTIZATION_BF16:
+        return torch.bfloat16
+    return torch.float32
+
+
+def _conv1d_to_linear(module: torch.nn.Module):
+    """
+    استبدال طبقات Conv1D (المستخدمة في GPT-2) بطبقات Linear مكافئة
+
+    التكميم الديناميكي لا يتعرف إلا على nn.Linear، وConv1D في transformers
+    هي Linear بأوزان مقلوبة
+    """
+    from transformers.pytorch_utils import Conv1D
+
+    for name, child in module.named_children():
+        if isinstance(child, Conv1D):
+            in_features, out_features = child.weight.shape
+            linear = torch.nn.Linear(in_features, out_features)
+            linear.weight.data = child.weight.data.t().contiguous()
+            linear.bias.data = child.bias.data
+            setattr(module, name, linear)
+        else:
+            _conv1d_to_linear(child)
+
+
+def quantize_model(model: torch.nn.Module, mode: str) -> torch.nn.Module:
+    """
+    تطبيق التكميم الديناميكي int8 على طبقات Linear
+
+    Args:
+        model: نموذج PyTorch محمل بدقة float32
+        mode: وضع التكميم الفعلي
+
+    Returns:
+        torch.nn.Module: النموذج المكمم (أو نفسه إذا لم يكن الوضع int8)
+    """
+    if mode != QUANTIZATION_INT8:
+        return model
+
+    _conv1d_to_linear(model)
+    return torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+def load_pipeline(task: str, model_id: Optional[str], model_name: str,
+                  mode: Optional[str] = None, **kwargs) -> Any:
+    """
+    تحميل pipeline من transformers مع تطبيق وضع التكميم
+
+    Args:
+        task: مهمة الـ pipeline (ner، summarization، text-generation...)
+        model_id: اسم النموذج في Hugging Face Hub (None للنموذج الافتراضي للمهمة)
+        model_name: اسم النموذج في سجل النماذج (لاختيار الوضع من الإعدادات)
+        mode: فرض وضع معين بدلاً من الإعدادات (يستخدمه سكربت القياس)
+        **kwargs: معاملات إضافية للـ pipeline
+
+    Returns:
+        Any: الـ pipeline المحمل
+    """
+    mode = resolve_mode(model_name, mode)
+    loaded = pipeline(
+        task,
+        model=model_id,
+        device=0 if torch.cuda.is_available() else -1,
+        torch_dtype=model_dtype(mode),
+        **kwargs
+    )
+    if mode != QUANTIZATION_NONE:
+        loaded.model = quantize_model(loaded.model, mode)
+        logger.info(f"تم تحميل {model_name} بوضع التكميم {mode}")
+    return loaded
@@ -0,0 +1,302 @@
+"""
+ذاكرة الردود المؤقتة (Response Cache) - تجنب إعادة توليد الأسئلة المتكررة
+
+هذا الملف يحتوي على طبقة تخزين مؤقت أمام generate_response
+المفتاح مبني على الـ prompt والسياق بعد التطبيع، واللغة، وإصدار النموذج،
+مع مطابقة اختيارية للأسئلة شبه المتطابقة عبر تشابه المتجهات
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from src.core.config import settings
+from src.core.utils.cache import cache_manager
+
+# إعداد التسجيل
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# أبعاد متجه التضمين المبني على تجزئة الـ trigrams
+EMBEDDING_DIM = 512
+
+# مفتاح عداد الأجيال المستخدم في الإبطال عبر جميع العمال
+GENERATION_KEY = "response_cache:generation"
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """
+    تطبيع النص قبل بناء المفتاح
+
+    Args:
+        text: النص المدخل
+
+    Returns:
+        str: النص بأحرف صغيرة ومسافات موحدة وبدون علامات الترقيم الطرفية
+    """
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text.lower()).strip()
+    return text.strip('?!.,;:؟،؛ ')
+
+
+def embed_text(text: str) -> np.ndarray:
+    """
+    تضمين خفيف للنص عبر تجزئة الـ trigrams الحرفية (بدون نموذج)
+
+    Args:
+        text: النص بعد التطبيع
+
+    Returns:
+        np.ndarray: متجه مطبّع بطول EMBEDDING_DIM
+    """
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    padded = f"  {text} "
+    for i in range(len(padded) - 2):
+        digest = hashlib.md5(padded[i:i + 3].encode('utf-8')).digest()
+        vector[int.from_bytes(digest[:4], 'little') % EMBEDDING_DIM] += 1.0
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class ResponseCache:
+    """
+    ذاكرة مؤقتة للردود المولدة مدعومة بـ CacheManager
+    """
+
+    def __init__(self, cache=None, ttl: Optional[int] = None,
+                 semantic_enabled: Optional[bool] = None,
+                 similarity_threshold: Optional[float] = None,
+                 index_size: Optional[int] = None,
+                 generation_ttl: Optional[float] = None):
+        """
+        تهيئة ذاكرة الردود
+
+        Args:
+            cache: مدير التخزين المؤقت (افتراضياً cache_manager)
+            ttl: مدة صلاحية الرد بالثواني
+            semantic_enabled: تفعيل مطابقة الأسئلة شبه المتطابقة
+            similarity_threshold: أدنى تشابه (cosine) لاعتبار السؤالين متطابقين
+            index_size: عدد المتجهات المحفوظة في فهرس التشابه المحلي
+            generation_ttl: مدة الاحتفاظ بجيل الإبطال محلياً قبل قراءته من جديد
+        """
+        self.cache = cache or cache_manager
+        self.enabled = settings.RESPONSE_CACHE_ENABLED
+        self.ttl = ttl or settings.RESPONSE_CACHE_TTL
+        self.semantic_enabled = (settings.RESPONSE_CACHE_SEMANTIC_ENABLED
+                                 if semantic_enabled is None else semantic_enabled)
+        self.similarity_threshold = (similarity_threshold
+                                     or settings.RESPONSE_CACHE_SIMILARITY_THRESHOLD)
+        self.index_size = index_size or settings.RESPONSE_CACHE_INDEX_SIZE
+        self.model_version = settings.DEFAULT_MODEL_VERSION
+        self.generation_ttl = (generation_ttl if generation_ttl is not None
+                               else settings.RESPONSE_CACHE_GENERATION_TTL)
+
+        # نسخة محلية من جيل الإبطال حتى لا يكلف كل بحث رحلة إضافية
+        self._generation: Optional[int] = None
+        self._generation_expires = 0.0
+
+        # فهرس التشابه: مفتاح التخزين -> (النطاق، اللغة، المتجه)
+        self._index: "OrderedDict[str, Tuple[str, str, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'semantic_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'invalidations': 0
+        }
+
+    def _namespace(self) -> str:
+        """نطاق المفاتيح الحالي (إصدار النموذج + جيل الإبطال)"""
+        now = time.monotonic()
+        if self._generation is None or now >= self._generation_expires:
+            # إبطال عامل آخر يظهر هنا خلال generation_ttl على الأكثر
+            self._set_generation(self.cache.get(GENERATION_KEY, 0), now)
+        return f"response_cache:{self.model_version}:{self._generation}"
+
+    def _set_generation(self, generation: Optional[int], now: Optional[float] = None):
+        """تحديث نسخة الجيل المحلية (None لإعادة قراءتها في البحث التالي)"""
+        self._generation = generation
+        self._generation_expires = (now or time.monotonic()) + self.generation_ttl
+
+    def make_key(self, prompt: str, context: Optional[str], language: str) -> str:
+        """
+        بناء مفتاح الرد
+
+        Args:
+            prompt: المطالبة
+            context: السياق (اختياري)
+            language: لغة الرد
+
+        Returns:
+            str: تجزئة المدخلات بعد التطبيع
+        """
+        raw = "\x1f".join([
+            normalize_text(prompt),
+            normalize_text(context),
+            language or "auto",
+            self.model_version
+        ])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, prompt: str, context: Optional[str], language: str) -> Optional[str]:
+        """
+        البحث عن رد مخزن
+
+        Args:
+            prompt: المطالبة
+            context: السياق (اختياري)
+            language: لغة الرد
+
+        Returns:
+            Optional[str]: الرد المخزن أو None
+        """
+        if not self.enabled:
+            return None
+
+        namespace = self._namespace()
+        storage_key = f"{namespace}:{self.make_key(prompt, context, language)}"
+
+        response = self.cache.get(storage_key)
+        if response is not None:
+            self._stats['hits'] += 1
+            return response
+
+        if self.semantic_enabled:
+            match_key = self._find_similar(namespace, language, prompt, context)
+            if match_key:
+                response = self.cache.get(match_key)
+                if response is not None:
+                    self._stats['semantic_hits'] += 1
+                    logger.debug("تم استرجاع رد لسؤال شبه متطابق")
+                    return response
+
+        self._stats['misses'] += 1
+        return None
+
+    def set(self, prompt: str, context: Optional[str], language: str,
+            response: str) -> bool:
+        """
+        تخزين رد مولد
+
+        Args:
+            prompt: المطالبة
+            context: السياق (اختياري)
+            language: لغة الرد
+            response: الرد المولد
+
+        Returns:
+            bool: True إذا تم التخزين بنجاح
+        """
+        if not self.enabled or not response:
+            return False
+
+        namespace = self._namespace()
+        storage_key = f"{namespace}:{self.make_key(prompt, context, language)}"
+        stored = self.cache.set(storage_key, response, self.ttl)
+
+        if stored:
+            self._stats['stores'] += 1
+            if self.semantic_enabled:
+                self._add_to_index(storage_key, namespace, language, prompt, context)
+
+        return stored
+
+    def _semantic_text(self, prompt: str, context: Optional[str]) -> str:
+        """النص المستخدم في التضمين"""
+        return f"{normalize_text(context)} {normalize_text(prompt)}".strip()
+
+    def _add_to_index(self, storage_key: str, namespace: str, language: str,
+                      prompt: str, context: Optional[str]):
+        """إضافة متجه الرد إلى فهرس التشابه المحدود"""
+        vector = embed_text(self._semantic_text(prompt, context))
+        with self._lock:
+            self._index[storage_key] = (namespace, language, vector)
+            self._index.move_to_end(storage_key)
+            while len(self._index) > self.index_size:
+                self._index.popitem(last=False)
+
+    def _find_similar(self, namespace: str, language: str,
+                      prompt: str, context: Optional[str]) -> Optional[str]:
+        """البحث عن أقرب سؤال مخزن فوق عتبة التشابه"""
+        with self._lock:
+            candidates = [
+                (key, vector) for key, (entry_namespace, entry_language, vector)
+                in self._index.items()
+                if entry_namespace == namespace and entry_language == language
+            ]
+
+        if not candidates:
+            return None
+
+        query = embed_text(self._semantic_text(prompt, context))
+        keys = [key for key, _ in candidates]
+        similarities = np.stack([vector for _, vector in candidates]) @ query
+
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.similarity_threshold:
+            return keys[best]
+        return None
+
+    def invalidate(self):
+        """إبطال جميع الردود المخزنة على جميع العمال"""
+        self._set_generation(self.cache.increment(GENERATION_KEY))
+        with self._lock:
+            self._index.clear()
+        self._stats['invalidations'] += 1
+        logger.info("تم إبطال ذاكرة الردود المؤقتة")
+
+    def set_model_version(self, version: str):
+        """
+        تحديث إصدار النموذج المستخدم في المفاتيح
+
+        Args:
+            version: الإصدار الجديد
+        """
+        if version == self.model_version:
+            return
+        logger.info(
+            f"تغيير إصدار النموذج في ذاكرة الردود: {self.model_version} -> {version}"
+        )
+        self.model_version = version
+        self.invalidate()
+
+    def bind_model_manager(self, model_manager, model_name: Optional[str] = None):
+        """
+        إبطال الذاكرة تلقائياً عند تبديل ModelManager لإصدار النموذج
+
+        Args:
+            model_manager: مدير النماذج
+            model_name: اسم النموذج المراقب (افتراضياً DEFAULT_MODEL)
+        """
+        watched = model_name or settings.DEFAULT_MODEL
+
+        def on_version_change(name: str, old_version: Optional[str], new_version: str):
+            if name == watched:
+                self.set_model_version(new_version)
+
+        model_manager.add_version_listener(on_version_change)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        الحصول على إحصائيات ذاكرة الردود
+
+        Returns:
+            Dict[str, Any]: الإحصائيات
+        """
+        hits = self._stats['hits'] + self._stats['semantic_hits']
+        lookups = hits + self._stats['misses']
+        return {
+            **self._stats,
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+            'index_size': len(self._index),
+            'model_version': self.model_version
+        }
@@ -0,0 +1,213 @@
+"""
+التلخيص المجزأ (Map-Reduce Summarization) - تلخيص النصوص الطويلة
+
+هذا الملف يحتوي على أدوات تقسيم النص الطويل عند حدود الجمل إلى أجزاء
+ضمن ميزانية رموز النموذج، وتلخيص الأجزاء في دفعة واحدة ثم تلخيص
+الملخصات، مع تخزين ملخص كل جزء حسب تجزئته حتى لا يُعاد حساب إلا
+الأجزاء التي تغيرت عند تعديل المحادثة
+"""
+
+import hashlib
+import logging
+import re
+from typing import Callable, Dict, List, Optional
+
+from src.core.config import settings
+from src.core.utils.cache import cache_manager
+
+# إعداد التسجيل
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# نهاية الجملة: علامات الترقيم العربية واللاتينية أو سطر جديد
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?؟؛])\s+|\n+')
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    تقسيم النص إلى جمل
+
+    Args:
+        text: النص المدخل
+
+    Returns:
+        List[str]: الجمل بدون الفراغات الطرفية
+    """
+    return [sentence.strip() for sentence in _SENTENCE_BOUNDARY.split(text)
+            if sentence.strip()]
+
+
+def chunk_text(text: str, max_tokens: int,
+               count_tokens: Callable[[str], int]) -> List[str]:
+    """
+    تجميع الجمل في أجزاء لا تتجاوز ميزانية الرموز
+
+    الجملة الأطول من الميزانية تُقسم على الكلمات
+
+    Args:
+        text: النص المدخل
+        max_tokens: أقصى عدد رموز في الجزء
+        count_tokens: دالة عد الرموز (محلل النموذج)
+
+    Returns:
+        List[str]: الأجزاء بالترتيب
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            chunks.append(" ".join(current))
+        current, current_tokens = [], 0
+
+    for sentence in split_sentences(text):
+        tokens = count_tokens(sentence)
+
+        if tokens > max_tokens:
+            # جملة طويلة جداً: تقسيمها على الكلمات
+            flush()
+            for word in sentence.split():
+                word_tokens = count_tokens(word)
+                if current and current_tokens + word_tokens > max_tokens:
+                    flush()
+                current.append(word)
+                current_tokens += word_tokens
+            flush()
+            continue
+
+        if current and current_tokens + tokens > max_tokens:
+            flush()
+        current.append(sentence)
+        current_tokens += tokens
+
+    flush()
+    return chunks
+
+
+def model_key(hf_pipeline) -> str:
+    """
+    اسم نموذج التلخيص لمفاتيح التخزين
+
+    نماذج ONNX/Optimum قد لا تملك name_or_path فيُستخدم اسم الإعدادات
+
+    Args:
+        hf_pipeline: خط معالجة transformers
+
+    Returns:
+        str: اسم النموذج أو اسم صنفه
+    """
+    model = hf_pipeline.model
+    config = getattr(model, 'config', None)
+    return (getattr(model, 'name_or_path', None)
+            or getattr(config, '_name_or_path', None)
+            or type(model).__name__)
+
+
+class ChunkedSummarizer:
+    """
+    تلخيص النصوص الطويلة بطريقة map-reduce مع ذاكرة لملخصات الأجزاء
+    """
+
+    def __init__(self, summarize_batch: Callable[[List[str]], List[str]],
+                 count_tokens: Callable[[str], int],
+                 model_key: str,
+                 chunk_tokens: Optional[int] = None,
+                 cache=None,
+                 cache_ttl: Optional[int] = None,
+                 max_levels: int = 3):
+        """
+        تهيئة الملخص
+
+        Args:
+            summarize_batch: دالة تلخص قائمة نصوص في تمريرة واحدة
+            count_tokens: دالة عد الرموز
+            model_key: معرف النموذج (جزء من مفتاح الذاكرة)
+            chunk_tokens: ميزانية الرموز لكل جزء
+            cache: مدير التخزين المؤقت (افتراضياً cache_manager)
+            cache_ttl: مدة صلاحية ملخص الجزء بالثواني
+            max_levels: أقصى عدد مراحل reduce قبل الاكتفاء بالنتيجة
+        """
+        self.summarize_batch = summarize_batch
+        self.count_tokens = count_tokens
+        self.model_key = model_key
+        self.chunk_tokens = chunk_tokens or settings.SUMMARIZATION_CHUNK_TOKENS
+        self.cache = cache or cache_manager
+        self.cache_ttl = cache_ttl or settings.SUMMARIZATION_CHUNK_CACHE_TTL
+        self.max_levels = max_levels
+        self._stats = {
+            'chunks': 0,
+            'cached_chunks': 0
+        }
+
+    def _cache_key(self, chunk: str) -> str:
+        """مفتاح ملخص الجزء"""
+        digest = hashlib.sha256(chunk.encode('utf-8')).hexdigest()
+        return f"summary_chunk:{self.model_key}:{digest}"
+
+    def _summarize_chunks(self, chunks: List[str]) -> List[str]:
+        """تلخيص الأجزاء غير المخزنة في دفعة واحدة"""
+        keys = [self._cache_key(chunk) for chunk in chunks]
+        cached = self.cache.get_many(keys)
+        summaries: List[Optional[str]] = [cached.get(key) for key in keys]
+        missing = [i for i, summary in enumerate(summaries) if summary is None]
+
+        self._stats['chunks'] += len(chunks)
+        self._stats['cached_chunks'] += len(chunks) - len(missing)
+
+        if missing:
+            computed = self.summarize_batch([chunks[i] for i in missing])
+            for i, summary in zip(missing, computed):
+                summaries[i] = summary
+            self.cache.set_many(
+                {keys[i]: summary for i, summary in zip(missing, computed)},
+                self.cache_ttl
+            )
+
+        return summaries
+
+    def needs_chunking(self, text: str) -> bool:
+        """
+        التحقق مما إذا كان النص أطول من ميزانية الجزء الواحد
+
+        Args:
+            text: النص المدخل
+
+        Returns:
+            bool: True إذا كان النص يحتاج إلى تقسيم
+        """
+        return self.count_tokens(text) > self.chunk_tokens
+
+    def summarize(self, text: str) -> str:
+        """
+        تلخيص نص طويل: تلخيص الأجزاء (map) ثم تلخيص الملخصات (reduce)
+
+        Args:
+            text: النص المدخل
+
+        Returns:
+            str: الملخص النهائي
+        """
+        current = text
+        for _ in range(self.max_levels):
+            chunks = chunk_text(current, self.chunk_tokens, self.count_tokens)
+            summaries = self._summarize_chunks(chunks)
+            if len(summaries) == 1:
+                return summaries[0]
+
+            current = "\n".join(summaries)
+            if not self.needs_chunking(current):
+                return self._summarize_chunks([current])[0]
+
+        logger.warning(f"تجاوز التلخيص {self.max_levels} مراحل؛ إعادة آخر مرحلة")
+        return current
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        الحصول على إحصائيات الملخص
+
+        Returns:
+            Dict[str, int]: الإحصائيات
+        """
+        return dict(self._stats)
@@ -0,0 +1,319 @@
+"""
+عميل الترجمة (Translation Client) - اتصال مشترك بـ Google Translate v2
+
+هذا الملف يحتوي على عميل ترجمة يعيد استخدام اتصالات HTTP (HTTP/2 عند
+توفر حزمة h2)، ويجمع عدة نصوص في طلب واحد عبر معاملات q المتعددة،
+ويحد عدد الطلبات المتزامنة لكل خادم، ويعيد المحاولة مع تأخير متزايد.
+عنوان الخدمة قابل للتغيير لاستخدام خادم محلي بديل في الاختبارات
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from src.core.config import settings
+
+# إعداد التسجيل
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# HTTP/2 يتطلب حزمة h2 (httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# رموز الحالة التي تستحق إعادة المحاولة
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TranslationAPIError(Exception):
+    """يُرفع عند فشل طلب الترجمة بعد استنفاد المحاولات"""
+
+
+class GoogleTranslateClient:
+    """
+    عميل Google Translate v2 باتصالات مشتركة وطلبات مجمعة
+    """
+
+    def __init__(self, api_key: Optional[str] = None,
+                 base_url: Optional[str] = None,
+                 max_batch_size: Optional[int] = None,
+                 max_concurrency: Optional[int] = None,
+                 max_retries: Optional[int] = None,
+                 backoff: Optional[float] = None,
+                 timeout: Optional[float] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 sync_transport: Optional[httpx.BaseTransport] = None):
+        """
+        تهيئة العميل
+
+        Args:
+            api_key: مفتاح Google Translate API
+            base_url: عنوان خدمة الترجمة (يمكن توجيهه إلى خادم بديل)
+            max_batch_size: أقصى عدد نصوص في الطلب الواحد
+            max_concurrency: أقصى عدد طلبات متزامنة لكل خادم
+            max_retries: عدد مرات إعادة المحاولة
+            backoff: التأخير الأساسي بين المحاولات بالثواني (يتضاعف)
+            timeout: مهلة الطلب بالثواني
+            transport: ناقل httpx غير متزامن بديل (للاختبارات)
+            sync_transport: ناقل httpx متزامن بديل (للاختبارات)
+        """
+        self.api_key = (api_key if api_key is not None
+                        else settings.GOOGLE_TRANSLATE_API_KEY)
+        self.base_url = base_url or settings.TRANSLATION_API_BASE_URL
+        self.max_batch_size = max_batch_size or settings.TRANSLATION_BATCH_MAX_SIZE
+        self.max_concurrency = max_concurrency or settings.TRANSLATION_MAX_CONCURRENCY
+        self.max_retries = (max_retries if max_retries is not None
+                            else settings.TRANSLATION_MAX_RETRIES)
+        self.backoff = (backoff if backoff is not None
+                        else settings.TRANSLATION_RETRY_BACKOFF)
+        self.timeout = timeout or settings.TRANSLATION_TIMEOUT
+        self._transport = transport
+        self._sync_transport = sync_transport
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._sync_client: Optional[httpx.Client] = None
+        self._client_lock = threading.Lock()
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._stats = {
+            'requests': 0,
+            'texts': 0,
+            'retries': 0,
+            'failures': 0
+        }
+
+    def _limits(self) -> httpx.Limits:
+        """حدود مجموعة الاتصالات"""
+        return httpx.Limits(
+            max_connections=self.max_concurrency,
+            max_keepalive_connections=self.max_concurrency
+        )
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """إنشاء العميل غير المتزامن عند أول استخدام"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = httpx.AsyncClient(
+                        http2=HTTP2_AVAILABLE and settings.TRANSLATION_HTTP2,
+                        limits=self._limits(),
+                        timeout=self.timeout,
+                        transport=self._transport
+                    )
+        return self._client
+
+    def _get_sync_client(self) -> httpx.Client:
+        """إنشاء العميل المتزامن عند أول استخدام"""
+        if self._sync_client is None:
+            with self._client_lock:
+                if self._sync_client is None:
+                    self._sync_client = httpx.Client(
+                        http2=HTTP2_AVAILABLE and settings.TRANSLATION_HTTP2,
+                        limits=self._limits(),
+                        timeout=self.timeout,
+                        transport=self._sync_transport
+                    )
+        return self._sync_client
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """حد التزامن الخاص بخادم الترجمة"""
+        host = urlparse(self.base_url).netloc
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[host] = semaphore
+        return semaphore
+
+    def _chunks(self, texts: List[str]) -> List[List[str]]:
+        """تقسيم النصوص إلى دفعات بالحجم الأقصى"""
+        return [texts[i:i + self.max_batch_size]
+                for i in range(0, len(texts), self.max_batch_size)]
+
+    def _build_params(self, texts: List[str], source_lang: str,
+                      target_lang: str) -> Dict[str, Any]:
+        """معاملات الطلب مع تكرار q لكل نص"""
+        return {
+            'q': list(texts),
+            'source': source_lang,
+            'target': target_lang,
+            'format': 'text',
+            'key': self.api_key
+        }
+
+    @staticmethod
+    def _parse_response(response: httpx.Response, expected: int) -> List[str]:
+        """استخراج الترجمات بنفس ترتيب النصوص"""
+        translations = response.json().get('data', {}).get('translations', [])
+        if len(translations) != expected:
+            raise TranslationAPIError(
+                f"عدد الترجمات ({len(translations)}) لا يطابق عدد النصوص ({expected})"
+            )
+        return [item.get('translatedText') for item in translations]
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        """التأخير قبل المحاولة التالية (Retry-After أو تأخير متزايد مع عشوائية)"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                # لا ننتظر أطول من مهلة الطلب مهما طلب الخادم
+                return min(float(retry_after), self.timeout)
+        return self.backoff * (2 ** attempt) * (1 + random.random() * 0.1)
+
+    def _should_retry(self, attempt: int, error: Exception,
+                      response: Optional[httpx.Response]) -> bool:
+        """تحديد ما إذا كانت المحاولة التالية مسموحة"""
+        if attempt >= self.max_retries:
+            return False
+        if response is not None:
+            return response.status_code in RETRYABLE_STATUS_CODES
+        return isinstance(error, httpx.TransportError)
+
+    async def translate_batch(self, texts: List[str], source_lang: str,
+                              target_lang: str) -> List[str]:
+        """
+        ترجمة مجموعة نصوص بأقل عدد من الطلبات
+
+        Args:
+            texts: النصوص المراد ترجمتها
+            source_lang: اللغة المصدر
+            target_lang: اللغة المستهدفة
+
+        Returns:
+            List[str]: الترجمات بنفس ترتيب النصوص
+
+        Raises:
+            TranslationAPIError: إذا فشل أحد الطلبات بعد استنفاد المحاولات
+        """
+        if not texts:
+            return []
+
+        chunks = self._chunks(texts)
+        results = await asyncio.gather(*[
+            self._request(chunk, source_lang, target_lang) for chunk in chunks
+        ])
+        return [translation for chunk in results for translation in chunk]
+
+    async def translate(self, text: str, source_lang: str, target_lang: str) -> str:
+        """
+        ترجمة نص واحد
+
+        Args:
+            text: النص المراد ترجمته
+            source_lang: اللغة المصدر
+            target_lang: اللغة المستهدفة
+
+        Returns:
+            str: النص المترجم
+        """
+        return (await self.translate_batch([text], source_lang, target_lang))[0]
+
+    async def _request(self, texts: List[str], source_lang: str,
+                       target_lang: str) -> List[str]:
+        """إرسال طلب واحد مع إعادة المحاولة"""
+        params = self._build_params(texts, source_lang, target_lang)
+        client = self._get_client()
+        attempt = 0
+
+        while True:
+            response = None
+            try:
+                async with self._semaphore():
+                    self._stats['requests'] += 1
+                    response = await client.post(self.base_url, data=params)
+                response.raise_for_status()
+                self._stats['texts'] += len(texts)
+                return self._parse_response(response, len(texts))
+
+            except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                if not self._should_retry(attempt, e, response):
+                    self._stats['failures'] += 1
+                    logger.error(f"خطأ في اتصال Google Translate API: {e}")
+                    raise TranslationAPIError(str(e)) from e
+
+                delay = self._retry_delay(attempt, response)
+                attempt += 1
+                self._stats['retries'] += 1
+                logger.warning(
+                    f"إعادة محاولة الترجمة ({attempt}/{self.max_retries}) "
+                    f"بعد {delay:.2f}s: {e}"
+                )
+                await asyncio.sleep(delay)
+
+    def translate_batch_sync(self, texts: List[str], source_lang: str,
+                             target_lang: str) -> List[str]:
+        """
+        النسخة المتزامنة من translate_batch (لمسار translate_text)
+
+        Args:
+            texts: النصوص المراد ترجمتها
+            source_lang: اللغة المصدر
+            target_lang: اللغة المستهدفة
+
+        Returns:
+            List[str]: الترجمات بنفس ترتيب النصوص
+        """
+        translations = []
+        for chunk in self._chunks(texts):
+            translations.extend(self._request_sync(chunk, source_lang, target_lang))
+        return translations
+
+    def _request_sync(self, texts: List[str], source_lang: str,
+                      target_lang: str) -> List[str]:
+        """إرسال طلب متزامن واحد مع إعادة المحاولة"""
+        params = self._build_params(texts, source_lang, target_lang)
+        client = self._get_sync_client()
+        attempt = 0
+
+        while True:
+            response = None
+            try:
+                self._stats['requests'] += 1
+                response = client.post(self.base_url, data=params)
+                response.raise_for_status()
+                self._stats['texts'] += len(texts)
+                return self._parse_response(response, len(texts))
+
+            except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                if not self._should_retry(attempt, e, response):
+                    self._stats['failures'] += 1
+                    logger.error(f"خطأ في اتصال Google Translate API: {e}")
+                    raise TranslationAPIError(str(e)) from e
+
+                delay = self._retry_delay(attempt, response)
+                attempt += 1
+                self._stats['retries'] += 1
+                logger.warning(
+                    f"إعادة محاولة الترجمة ({attempt}/{self.max_retries}) "
+                    f"بعد {delay:.2f}s: {e}"
+                )
+                time.sleep(delay)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        الحصول على إحصائيات العميل
+
+        Returns:
+            Dict[str, int]: الإحصائيات
+        """
+        return dict(self._stats)
+
+    async def aclose(self):
+        """إغلاق الاتصالات المفتوحة"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
+
+
+# إنشاء instance عالمي
+translation_client = GoogleTranslateClient()
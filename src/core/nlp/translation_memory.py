@@ -0,0 +1,324 @@
+"""
+ذاكرة الترجمة (Translation Memory) - تخزين الترجمات على مستويين
+
+هذا الملف يحتوي على ذاكرة ترجمة مشتركة بين العمال وباقية بعد إعادة
+التشغيل: مستوى أول LRU محدود داخل العملية، ومستوى ثانٍ في Redis (عبر
+CacheManager) أو SQLite عند عدم توفر Redis، بمفتاح
+(اللغة المصدر، اللغة الهدف، تجزئة النص)
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.core.config import settings
+from src.core.utils.cache import cache_manager
+
+# إعداد التسجيل
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def text_hash(text: str) -> str:
+    """
+    تجزئة النص المستخدمة في مفتاح الترجمة
+
+    Args:
+        text: النص الأصلي
+
+    Returns:
+        str: تجزئة SHA-256 للنص
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class _SQLiteStore:
+    """مخزن ترجمات في ملف SQLite"""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "source TEXT NOT NULL, target TEXT NOT NULL, text_hash TEXT NOT NULL, "
+                "translation TEXT NOT NULL, PRIMARY KEY (source, target, text_hash))"
+            )
+            self._connection.commit()
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT translation FROM translations "
+                "WHERE source = ? AND target = ? AND text_hash = ?",
+                key
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, source: str, target: str, hashes: List[str]) -> Dict[str, str]:
+        found = {}
+        with self._lock:
+            # دفعات أصغر من حد متغيرات SQLite
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                rows = self._connection.execute(
+                    "SELECT text_hash, translation FROM translations "
+                    "WHERE source = ? AND target = ? AND text_hash IN ({})".format(
+                        ", ".join("?" * len(chunk))
+                    ),
+                    (source, target, *chunk)
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def set_many(self, rows: Iterable[Tuple[str, str, str, str]]) -> int:
+        rows = list(rows)
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO translations "
+                "(source, target, text_hash, translation) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._connection.commit()
+        return len(rows)
+
+
+class TranslationMemory:
+    """
+    ذاكرة ترجمة بمستويين (LRU محلي + Redis/SQLite)
+    """
+
+    def __init__(self, cache=None, l1_size: Optional[int] = None,
+                 ttl: Optional[int] = None, backend: Optional[str] = None,
+                 sqlite_path: Optional[str] = None):
+        """
+        تهيئة ذاكرة الترجمة
+
+        Args:
+            cache: مدير التخزين المؤقت (افتراضياً cache_manager)
+            l1_size: عدد الترجمات في المستوى الأول داخل العملية
+            ttl: مدة صلاحية الترجمة في Redis بالثواني (0 بدون انتهاء)
+            backend: المستوى الثاني: auto أو redis أو sqlite
+            sqlite_path: مسار ملف SQLite
+        """
+        self.cache = cache or cache_manager
+        self.enabled = settings.TRANSLATION_MEMORY_ENABLED
+        self.l1_size = l1_size or settings.TRANSLATION_MEMORY_L1_SIZE
+        self.ttl = ttl if ttl is not None else settings.TRANSLATION_MEMORY_TTL
+
+        backend = backend or settings.TRANSLATION_MEMORY_BACKEND
+        if backend == 'auto':
+            backend = 'redis' if self.cache.use_redis else 'sqlite'
+        self.backend = backend
+
+        self._sqlite: Optional[_SQLiteStore] = None
+        if self.enabled and self.backend == 'sqlite':
+            self._sqlite = _SQLiteStore(
+                sqlite_path or settings.TRANSLATION_MEMORY_SQLITE_PATH
+            )
+
+        self._l1: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'l1_hits': 0,
+            'l2_hits': 0,
+            'misses': 0,
+            'stores': 0
+        }
+
+        logger.info(f"تم تهيئة ذاكرة الترجمة (المستوى الثاني: {self.backend})")
+
+    @staticmethod
+    def make_key(source_lang: str, target_lang: str, text: str) -> Tuple[str, str, str]:
+        """
+        بناء مفتاح الترجمة
+
+        Args:
+            source_lang: اللغة المصدر
+            target_lang: اللغة الهدف
+            text: النص الأصلي
+
+        Returns:
+            Tuple[str, str, str]: (المصدر، الهدف، تجزئة النص)
+        """
+        return (source_lang, target_lang, text_hash(text))
+
+    def _redis_key(self, key: Tuple[str, str, str]) -> str:
+        """مفتاح الترجمة في Redis"""
+        return "translation:{}:{}:{}".format(*key)
+
+    def _remember(self, key: Tuple[str, str, str], translation: str):
+        """إضافة ترجمة إلى المستوى الأول"""
+        with self._lock:
+            self._l1[key] = translation
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_size:
+                self._l1.popitem(last=False)
+
+    def get(self, text: str, source_lang: str, target_lang: str) -> Optional[str]:
+        """
+        البحث عن ترجمة محفوظة
+
+        Args:
+            text: النص الأصلي
+            source_lang: اللغة المصدر
+            target_lang: اللغة الهدف
+
+        Returns:
+            Optional[str]: الترجمة أو None
+        """
+        if not self.enabled:
+            return None
+
+        key = self.make_key(source_lang, target_lang, text)
+
+        with self._lock:
+            translation = self._l1.get(key)
+            if translation is not None:
+                self._l1.move_to_end(key)
+                self._stats['l1_hits'] += 1
+                return translation
+
+        if self._sqlite:
+            translation = self._sqlite.get(key)
+        else:
+            translation = self.cache.get(self._redis_key(key))
+
+        if translation is not None:
+            self._stats['l2_hits'] += 1
+            self._remember(key, translation)
+            return translation
+
+        self._stats['misses'] += 1
+        return None
+
+    def get_many(self, texts: List[str], source_lang: str,
+                 target_lang: str) -> List[Optional[str]]:
+        """
+        البحث عن ترجمات عدة نصوص بنفس اللغتين (قراءة واحدة من المستوى الثاني)
+
+        Args:
+            texts: النصوص الأصلية
+            source_lang: اللغة المصدر
+            target_lang: اللغة الهدف
+
+        Returns:
+            List[Optional[str]]: الترجمة أو None لكل نص بنفس الترتيب
+        """
+        if not self.enabled:
+            return [None] * len(texts)
+
+        keys = [self.make_key(source_lang, target_lang, text) for text in texts]
+        translations: List[Optional[str]] = [None] * len(texts)
+        missing = []
+
+        with self._lock:
+            for index, key in enumerate(keys):
+                translation = self._l1.get(key)
+                if translation is not None:
+                    self._l1.move_to_end(key)
+                    self._stats['l1_hits'] += 1
+                    translations[index] = translation
+                else:
+                    missing.append(index)
+
+        if missing:
+            if self._sqlite:
+                found = self._sqlite.get_many(
+                    source_lang, target_lang, [keys[index][2] for index in missing]
+                )
+                stored = [found.get(keys[index][2]) for index in missing]
+            else:
+                found = self.cache.get_many(
+                    [self._redis_key(keys[index]) for index in missing]
+                )
+                stored = [found.get(self._redis_key(keys[index])) for index in missing]
+
+            for index, translation in zip(missing, stored):
+                if translation is not None:
+                    self._stats['l2_hits'] += 1
+                    self._remember(keys[index], translation)
+                    translations[index] = translation
+                else:
+                    self._stats['misses'] += 1
+
+        return translations
+
+    def set(self, text: str, source_lang: str, target_lang: str,
+            translation: str) -> bool:
+        """
+        حفظ ترجمة في المستويين
+
+        Args:
+            text: النص الأصلي
+            source_lang: اللغة المصدر
+            target_lang: اللغة الهدف
+            translation: الترجمة
+
+        Returns:
+            bool: True إذا تم الحفظ
+        """
+        if not self.enabled or not translation:
+            return False
+        return self.preseed([(text, source_lang, target_lang, translation)]) == 1
+
+    def preseed(self, entries: Iterable[Tuple[str, str, str, str]]) -> int:
+        """
+        حفظ مجموعة ترجمات دفعة واحدة (مثل ترجمات الرسائل السابقة)
+
+        Args:
+            entries: عناصر (النص، اللغة المصدر، اللغة الهدف، الترجمة)
+
+        Returns:
+            int: عدد الترجمات المحفوظة
+        """
+        if not self.enabled:
+            return 0
+
+        rows = []
+        for text, source_lang, target_lang, translation in entries:
+            if not text or not translation:
+                continue
+            key = self.make_key(source_lang, target_lang, text)
+            self._remember(key, translation)
+            rows.append((*key, translation))
+
+        if not rows:
+            return 0
+
+        try:
+            if self._sqlite:
+                self._sqlite.set_many(rows)
+            else:
+                self.cache.set_many({
+                    self._redis_key(tuple(key)): translation
+                    for *key, translation in rows
+                }, self.ttl or None)
+        except Exception as e:
+            logger.error(f"خطأ في حفظ الترجمات: {e}")
+            return 0
+
+        self._stats['stores'] += len(rows)
+        return len(rows)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        الحصول على إحصائيات ذاكرة الترجمة
+
+        Returns:
+            Dict[str, Any]: الإحصائيات
+        """
+        hits = self._stats['l1_hits'] + self._stats['l2_hits']
+        lookups = hits + self._stats['misses']
+        return {
+            **self._stats,
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+            'l1_size': len(self._l1),
+            'backend': self.backend
+        }
@@ -4,18 +4,62 @@
 هذا الملف يحتوي على دوال لإدارة المحادثات والرسائل في قاعدة البيانات
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
+from pathlib import Path
+import base64
+import json
 import logging
+import os
+import queue
+import threading
+import time
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.exc import DisconnectionError, InterfaceError, OperationalError
 from sqlalchemy.orm import Session
 
-from src.core.database.models import Conversation, Message, User
+from src.core.config import settings
+from src.core.database.models import Conversation, Message, User, generate_uuid
 from src.core.database.session import get_db_session
 
 # إعداد التسجيل
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def encode_cursor(timestamp: datetime, item_id: str) -> str:
+    """
+    ترميز مؤشر تصفح مبهم (opaque) من المفتاح (timestamp, id)
+    
+    Args:
+        timestamp: قيمة عمود الترتيب (updated_at أو created_at)
+        item_id: معرف آخر عنصر في الصفحة
+        
+    Returns:
+        str: المؤشر بصيغة base64 آمنة للروابط
+    """
+    raw = json.dumps([timestamp.isoformat(), item_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    فك ترميز مؤشر التصفح
+    
+    Args:
+        cursor: المؤشر المبهم
+        
+    Returns:
+        Tuple[datetime, str]: (timestamp, id)
+        
+    Raises:
+        ValueError: إذا كان المؤشر غير صالح
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(timestamp), str(item_id)
+    except Exception:
+        raise ValueError("مؤشر التصفح غير صالح")
+
 class ConversationService:
     """خدمة إدارة المحادثات"""
     
@@ -79,12 +123,31 @@ class ConversationService:
         finally:
             db.close()
     
+    @staticmethod
+    def _paginate(query, limit: int, offset: int, cursor: Optional[str]):
+        """
+        ترتيب المحادثات تنازلياً حسب (updated_at, id) وتطبيق المؤشر أو الإزاحة
+        """
+        if cursor:
+            updated_at, conversation_id = decode_cursor(cursor)
+            query = query.filter(or_(
+                Conversation.updated_at < updated_at,
+                and_(Conversation.updated_at == updated_at,
+                     Conversation.id < conversation_id)
+            ))
+        elif offset:
+            query = query.offset(offset)
+        
+        return query.order_by(Conversation.updated_at.desc(), Conversation.id.desc())\
+                    .limit(limit)
+    
     @staticmethod
     def get_user_conversations(
         user_id: str,
         limit: int = 10,
         offset: int = 0,
-        archived: bool = False
+        archived: bool = False,
+        cursor: Optional[str] = None
     ) -> List[Conversation]:
         """
         الحصول على محادثات المستخدم
@@ -92,11 +155,15 @@ class ConversationService:
         Args:
             user_id: معرف المستخدم
             limit: عدد المحادثات
-            offset: الإزاحة
+            offset: الإزاحة (يُتجاهل عند تمرير cursor)
             archived: تضمين المحادثات المؤرشفة
+            cursor: مؤشر الصفحة التالية (اختياري)
             
         Returns:
             List[Conversation]: قائمة المحادثات
+            
+        Raises:
+            ValueError: إذا كان المؤشر غير صالح
         """
         db = get_db_session()
         try:
@@ -105,18 +172,95 @@ class ConversationService:
             if not archived:
                 query = query.filter(Conversation.is_archived == False)
             
-            conversations = query.order_by(Conversation.updated_at.desc())\
-                                .offset(offset)\
-                                .limit(limit)\
-                                .all()
+            conversations = ConversationService._paginate(
+                query, limit, offset, cursor
+            ).all()
             
             return conversations
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"خطأ في الحصول على محادثات المستخدم {user_id}: {e}")
             return []
         finally:
             db.close()
     
+    @staticmethod
+    def get_user_conversations_with_counts(
+        user_id: str,
+        limit: int = 10,
+        offset: int = 0,
+        archived: bool = False,
+        cursor: Optional[str] = None
+    ) -> List[Tuple[Conversation, int]]:
+        """
+        الحصول على محادثات المستخدم مع عدد رسائل كل محادثة في استعلام واحد
+        
+        Args:
+            user_id: معرف المستخدم
+            limit: عدد المحادثات
+            offset: الإزاحة (يُتجاهل عند تمرير cursor)
+            archived: تضمين المحادثات المؤرشفة
+            cursor: مؤشر الصفحة التالية (اختياري)
+            
+        Returns:
+            List[Tuple[Conversation, int]]: قائمة (المحادثة، عدد الرسائل)
+            
+        Raises:
+            ValueError: إذا كان المؤشر غير صالح
+        """
+        db = get_db_session()
+        try:
+            # استعلام فرعي مرتبط يحسب الرسائل داخل قاعدة البيانات لكل صف فقط
+            message_count = select(func.count(Message.id))\
+                                .where(Message.conversation_id == Conversation.id)\
+                                .correlate(Conversation)\
+                                .scalar_subquery()
+            
+            query = db.query(Conversation, message_count)\
+                      .filter(Conversation.user_id == user_id)
+            
+            if not archived:
+                query = query.filter(Conversation.is_archived == False)
+            
+            rows = ConversationService._paginate(query, limit, offset, cursor).all()
+            
+            return [(conversation, count or 0) for conversation, count in rows]
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"خطأ في الحصول على محادثات المستخدم {user_id}: {e}")
+            return []
+        finally:
+            db.close()
+    
+    @staticmethod
+    def count_user_conversations(user_id: str, archived: bool = False) -> int:
+        """
+        حساب العدد الإجمالي لمحادثات المستخدم
+        
+        Args:
+            user_id: معرف المستخدم
+            archived: تضمين المحادثات المؤرشفة
+            
+        Returns:
+            int: عدد المحادثات
+        """
+        db = get_db_session()
+        try:
+            query = db.query(func.count(Conversation.id))\
+                      .filter(Conversation.user_id == user_id)
+            
+            if not archived:
+                query = query.filter(Conversation.is_archived == False)
+            
+            return query.scalar() or 0
+        except Exception as e:
+            logger.error(f"خطأ في حساب محادثات المستخدم {user_id}: {e}")
+            return 0
+        finally:
+            db.close()
+    
     @staticmethod
     def update_conversation(
         conversation_id: str,
@@ -230,7 +374,7 @@ class MessageService:
                 sender=sender,
                 content=content,
                 language=language,
-                metadata=metadata or {}
+                message_metadata=metadata or {}
             )
             
             db.add(message)
@@ -251,11 +395,56 @@ class MessageService:
         finally:
             db.close()
     
+    @staticmethod
+    def create_message_deferred(
+        conversation_id: str,
+        sender: str,
+        content: str,
+        language: str = "auto",
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        إنشاء رسالة جديدة عبر طابور الكتابة المؤجلة
+        
+        الرسالة تحصل على معرفها فوراً وتُكتب في ملف spool قبل العودة،
+        ثم تُحفظ في قاعدة البيانات ضمن دفعة لاحقة
+        
+        Args:
+            conversation_id: معرف المحادثة
+            sender: المرسل (user أو assistant)
+            content: محتوى الرسالة
+            language: لغة الرسالة
+            metadata: بيانات إضافية
+            
+        Returns:
+            Dict[str, Any]: بيانات الرسالة (id, created_at, ...)
+        """
+        if not settings.MESSAGE_WRITE_BEHIND_ENABLED:
+            message = MessageService.create_message(
+                conversation_id, sender, content, language, metadata
+            )
+            if not message:
+                return None
+            return {
+                'id': message.id,
+                'conversation_id': message.conversation_id,
+                'sender': message.sender,
+                'content': message.content,
+                'language': message.language,
+                'message_metadata': message.message_metadata,
+                'created_at': message.created_at
+            }
+        
+        return message_write_queue.enqueue(
+            conversation_id, sender, content, language, metadata
+        )
+    
     @staticmethod
     def get_conversation_messages(
         conversation_id: str,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[Message]:
         """
         الحصول على رسائل المحادثة
@@ -263,27 +452,90 @@ class MessageService:
         Args:
             conversation_id: معرف المحادثة
             limit: عدد الرسائل
-            offset: الإزاحة
+            offset: الإزاحة (يُتجاهل عند تمرير cursor)
+            cursor: مؤشر الصفحة التالية (اختياري)
             
         Returns:
             List[Message]: قائمة الرسائل
+            
+        Raises:
+            ValueError: إذا كان المؤشر غير صالح
         """
         db = get_db_session()
         try:
-            messages = db.query(Message)\
-                        .filter(Message.conversation_id == conversation_id)\
-                        .order_by(Message.created_at.asc())\
-                        .offset(offset)\
-                        .limit(limit)\
-                        .all()
+            query = db.query(Message).filter(Message.conversation_id == conversation_id)
+            
+            # ترتيب تصاعدي حسب (created_at, id) مع مؤشر keyset أو إزاحة
+            if cursor:
+                created_at, message_id = decode_cursor(cursor)
+                query = query.filter(or_(
+                    Message.created_at > created_at,
+                    and_(Message.created_at == created_at, Message.id > message_id)
+                ))
+            elif offset:
+                query = query.offset(offset)
+            
+            messages = query.order_by(Message.created_at.asc(), Message.id.asc())\
+                            .limit(limit)\
+                            .all()
             
             return messages
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"خطأ في الحصول على رسائل المحادثة {conversation_id}: {e}")
             return []
         finally:
             db.close()
     
+    @staticmethod
+    def get_recent_messages(conversation_id: str, limit: int = 20) -> List[Message]:
+        """
+        الحصول على آخر رسائل المحادثة بالترتيب الزمني
+
+        Args:
+            conversation_id: معرف المحادثة
+            limit: عدد الرسائل
+
+        Returns:
+            List[Message]: آخر الرسائل من الأقدم إلى الأحدث
+        """
+        db = get_db_session()
+        try:
+            messages = db.query(Message)\
+                         .filter(Message.conversation_id == conversation_id)\
+                         .order_by(Message.created_at.desc(), Message.id.desc())\
+                         .limit(limit)\
+                         .all()
+            return list(reversed(messages))
+        except Exception as e:
+            logger.error(f"خطأ في الحصول على آخر رسائل المحادثة {conversation_id}: {e}")
+            return []
+        finally:
+            db.close()
+
+    @staticmethod
+    def count_conversation_messages(conversation_id: str) -> int:
+        """
+        حساب عدد رسائل المحادثة
+        
+        Args:
+            conversation_id: معرف المحادثة
+            
+        Returns:
+            int: عدد الرسائل
+        """
+        db = get_db_session()
+        try:
+            return db.query(func.count(Message.id))\
+                     .filter(Message.conversation_id == conversation_id)\
+                     .scalar() or 0
+        except Exception as e:
+            logger.error(f"خطأ في حساب رسائل المحادثة {conversation_id}: {e}")
+            return 0
+        finally:
+            db.close()
+    
     @staticmethod
     def get_message(message_id: str) -> Optional[Message]:
         """
@@ -304,3 +556,399 @@ class MessageService:
             return None
         finally:
             db.close()
+
+
+class MessageWriteBehindQueue:
+    """
+    طابور الكتابة المؤجلة للرسائل
+    
+    يجمع الرسائل في الذاكرة ويحفظها في قاعدة البيانات بإدراج جماعي
+    ضمن معاملة واحدة لكل دفعة، مع تحديث conversations.updated_at مرة
+    واحدة لكل محادثة في الدفعة. كل رسالة تُلحق أولاً بملف spool (append-only) حتى
+    يمكن استعادتها بعد أي انهيار قبل الحفظ، وتُحذف منه بعد حفظ دفعتها.
+    الدفعة التي تفشل لسبب غير انقطاع الاتصال تُقسم بعد عدة محاولات حتى
+    تُعزل السجلات الفاشلة في ملف dead-letter دون إيقاف بقية الرسائل
+    """
+    
+    def __init__(self, spool_path: Optional[str] = None,
+                 batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None,
+                 fsync: Optional[bool] = None,
+                 dead_letter_path: Optional[str] = None,
+                 max_attempts: Optional[int] = None):
+        """
+        تهيئة الطابور
+        
+        Args:
+            spool_path: مسار ملف spool
+            batch_size: الحد الأقصى للرسائل في الدفعة الواحدة
+            flush_interval: أقصى مدة انتظار قبل الحفظ بالثواني
+            fsync: استدعاء fsync بعد كل كتابة في ملف spool
+            dead_letter_path: مسار ملف السجلات التي تعذر حفظها
+            max_attempts: عدد محاولات حفظ الدفعة قبل تقسيمها (لغير أخطاء الاتصال)
+        """
+        self.spool_path = Path(spool_path or settings.MESSAGE_SPOOL_PATH)
+        self.batch_size = batch_size or settings.MESSAGE_WRITE_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.MESSAGE_WRITE_FLUSH_INTERVAL
+        self.fsync = settings.MESSAGE_SPOOL_FSYNC if fsync is None else fsync
+        self.dead_letter_path = Path(
+            dead_letter_path or settings.MESSAGE_DEAD_LETTER_PATH
+        )
+        self.max_attempts = max_attempts or settings.MESSAGE_WRITE_MAX_ATTEMPTS
+        
+        self._queue: queue.Queue = queue.Queue()
+        self._spool_lock = threading.Lock()
+        self._unflushed = 0  # رسائل في spool لم تُحفظ بعد
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._stats = {
+            'enqueued': 0,
+            'flushed': 0,
+            'batches': 0,
+            'failed_batches': 0,
+            'dropped': 0,
+            'dead_lettered': 0
+        }
+    
+    def enqueue(
+        self,
+        conversation_id: str,
+        sender: str,
+        content: str,
+        language: str = "auto",
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        إضافة رسالة إلى الطابور
+        
+        Args:
+            conversation_id: معرف المحادثة
+            sender: المرسل (user أو assistant)
+            content: محتوى الرسالة
+            language: لغة الرسالة
+            metadata: بيانات إضافية
+            
+        Returns:
+            Dict[str, Any]: بيانات الرسالة مع المعرف المولد
+        """
+        record = {
+            'id': generate_uuid(),
+            'conversation_id': conversation_id,
+            'sender': sender,
+            'content': content,
+            'language': language,
+            'message_metadata': metadata or {},
+            'created_at': datetime.utcnow()
+        }
+        
+        self._append_to_spool([record])
+        self._ensure_started()
+        self._queue.put(record)
+        self._stats['enqueued'] += 1
+        
+        return record
+    
+    @staticmethod
+    def _serialize(record: Dict[str, Any]) -> str:
+        """سطر JSON للسجل في ملفات spool و dead-letter"""
+        return json.dumps(
+            {**record, 'created_at': record['created_at'].isoformat()},
+            ensure_ascii=False,
+            default=str
+        ) + "\n"
+    
+    def _append_lines(self, path: Path, records: List[Dict[str, Any]]):
+        """إلحاق السجلات بملف (تحت قفل spool)"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(self._serialize(record))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+    
+    def _append_to_spool(self, records: List[Dict[str, Any]]):
+        """إلحاق السجلات بملف spool قبل قبولها"""
+        with self._spool_lock:
+            self._append_lines(self.spool_path, records)
+            self._unflushed += len(records)
+    
+    def _mark_flushed(self, records: List[Dict[str, Any]]):
+        """
+        تسجيل انتهاء السجلات (حفظها أو عزلها) وحذفها من spool
+        
+        يُضغط الملف بعد كل دفعة حتى لا ينمو بلا حد تحت الضغط المستمر
+        ولا تعيد الاستعادة تشغيل رسائل محفوظة بالفعل
+        """
+        done_ids = {record['id'] for record in records}
+        with self._spool_lock:
+            self._unflushed = max(0, self._unflushed - len(records))
+            if not self.spool_path.exists():
+                return
+            if self._unflushed == 0:
+                # كل ما في spool أصبح في قاعدة البيانات
+                self.spool_path.write_text('', encoding='utf-8')
+                return
+            
+            remaining_lines = []
+            with open(self.spool_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        if json.loads(line)['id'] in done_ids:
+                            continue
+                    except (json.JSONDecodeError, KeyError, TypeError):
+                        continue
+                    remaining_lines.append(line)
+            
+            # كتابة ملف جديد ثم استبداله ذرياً حتى لا يضيع spool عند الانهيار
+            compacted_path = self.spool_path.with_name(
+                self.spool_path.name + '.compact'
+            )
+            with open(compacted_path, 'w', encoding='utf-8') as f:
+                f.writelines(remaining_lines)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            os.replace(compacted_path, self.spool_path)
+    
+    def _dead_letter(self, records: List[Dict[str, Any]], error: Exception):
+        """نقل سجلات تعذر حفظها إلى ملف dead-letter وإزالتها من spool"""
+        with self._spool_lock:
+            self._append_lines(self.dead_letter_path, records)
+        self._stats['dead_lettered'] += len(records)
+        logger.error(
+            f"تعذر حفظ {len(records)} رسالة ونُقلت إلى {self.dead_letter_path}: {error}"
+        )
+        self._mark_flushed(records)
+    
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        """أخطاء الاتصال بقاعدة البيانات تستحق إعادة المحاولة بلا حد"""
+        return isinstance(error, (OperationalError, InterfaceError, DisconnectionError))
+    
+    def _ensure_started(self):
+        """تشغيل خيط الحفظ عند أول استخدام"""
+        if self._thread and self._thread.is_alive():
+            return
+        with self._spool_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name="boai-message-writer",
+                daemon=True
+            )
+            self._thread.start()
+    
+    def _drain(self, first: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """تجميع دفعة من الطابور بدءاً من السجل الأول"""
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        """حلقة خيط الحفظ"""
+        # دفعات تنتظر الحفظ (الدفعة الفاشلة تُستبدل بنصفيها)
+        pending: List[List[Dict[str, Any]]] = []
+        attempts = 0
+        retry_delay = self.flush_interval
+        
+        while not self._stop_event.is_set() or pending or not self._queue.empty():
+            if not pending:
+                try:
+                    first = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                pending = [self._drain(first)]
+            
+            batch = pending[0]
+            error = self._write_batch(batch)
+            if error is None:
+                pending.pop(0)
+                attempts = 0
+                retry_delay = self.flush_interval
+                continue
+            
+            attempts += 1
+            if self._is_transient(error) or attempts < self.max_attempts:
+                # قاعدة البيانات غير متاحة: السجلات باقية في spool
+                # وإعادة المحاولة لاحقاً
+                if self._stop_event.is_set():
+                    break
+                time.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 30)
+                continue
+            
+            # خطأ في البيانات نفسها: تقسيم الدفعة حتى يُعزل السجل الفاشل
+            pending.pop(0)
+            attempts = 0
+            retry_delay = self.flush_interval
+            if len(batch) > 1:
+                middle = len(batch) // 2
+                pending[:0] = [batch[:middle], batch[middle:]]
+            else:
+                self._dead_letter(batch, error)
+    
+    def _write_batch(self, records: List[Dict[str, Any]]) -> Optional[Exception]:
+        """
+        حفظ دفعة من الرسائل في معاملة واحدة
+        
+        Args:
+            records: سجلات الرسائل
+            
+        Returns:
+            Optional[Exception]: None إذا تم الحفظ بنجاح، وإلا الخطأ
+        """
+        db = get_db_session()
+        try:
+            conversation_ids = {record['conversation_id'] for record in records}
+            existing_ids = {
+                row[0] for row in db.query(Conversation.id)
+                                    .filter(Conversation.id.in_(conversation_ids))
+                                    .all()
+            }
+            
+            # رسائل حُفظت بالفعل (مثلاً قبل انهيار وإعادة تشغيل من spool)
+            message_ids = [record['id'] for record in records]
+            already_saved = {
+                row[0] for row in db.query(Message.id)
+                                    .filter(Message.id.in_(message_ids))
+                                    .all()
+            }
+            
+            # إزالة التكرار داخل الدفعة نفسها (نفس السجل مستعاد مرتين)
+            unique_records = list({record['id']: record for record in records}.values())
+            rows = [record for record in unique_records
+                    if record['conversation_id'] in existing_ids
+                    and record['id'] not in already_saved]
+            dropped = len(unique_records) - len(rows) - len(already_saved)
+            if dropped:
+                self._stats['dropped'] += dropped
+                logger.warning(f"تم تجاهل {dropped} رسالة لمحادثات غير موجودة")
+            
+            if rows:
+                db.execute(insert(Message), rows)
+                # آخر رسالة لكل محادثة (وليس آخر رسالة في الدفعة كلها)
+                latest = {}
+                for row in rows:
+                    conversation_id = row['conversation_id']
+                    if (conversation_id not in latest
+                            or row['created_at'] > latest[conversation_id]):
+                        latest[conversation_id] = row['created_at']
+                db.execute(
+                    update(Conversation),
+                    [{'id': conversation_id, 'updated_at': updated_at}
+                     for conversation_id, updated_at in latest.items()]
+                )
+            db.commit()
+            
+            self._stats['flushed'] += len(rows)
+            self._stats['batches'] += 1
+            self._mark_flushed(records)
+            logger.debug(f"تم حفظ دفعة من {len(rows)} رسالة")
+            return None
+            
+        except Exception as e:
+            db.rollback()
+            self._stats['failed_batches'] += 1
+            logger.error(f"خطأ في حفظ دفعة الرسائل: {e}")
+            return e
+        finally:
+            db.close()
+    
+    def recover(self) -> int:
+        """
+        استعادة الرسائل من ملف spool بعد إعادة التشغيل
+        
+        Returns:
+            int: عدد الرسائل المستعادة
+        """
+        if not self.spool_path.exists():
+            return 0
+        
+        records = []
+        with self._spool_lock:
+            with open(self.spool_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # سطر مبتور من انهيار أثناء الكتابة
+                        logger.warning("تم تجاهل سطر تالف في ملف spool")
+                        continue
+                    record['created_at'] = datetime.fromisoformat(record['created_at'])
+                    records.append(record)
+        
+        if not records:
+            return 0
+        
+        # السجلات المستعادة تُعامل كرسائل جديدة؛
+        # _write_batch يتجاهل ما حُفظ قبل الانهيار
+        with self._spool_lock:
+            self._unflushed += len(records)
+        self._ensure_started()
+        for record in records:
+            self._queue.put(record)
+        
+        logger.info(f"تم استعادة {len(records)} رسالة من ملف spool")
+        return len(records)
+    
+    def flush(self, timeout: float = 10.0) -> bool:
+        """
+        انتظار حفظ جميع الرسائل الموجودة في الطابور
+        
+        Args:
+            timeout: أقصى مدة انتظار بالثواني
+            
+        Returns:
+            bool: True إذا تم حفظ كل شيء
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._spool_lock:
+                if self._unflushed == 0:
+                    return True
+            time.sleep(0.05)
+        return False
+    
+    def stop(self, timeout: float = 10.0):
+        """
+        إيقاف خيط الحفظ بعد حفظ الرسائل المنتظرة
+        
+        Args:
+            timeout: أقصى مدة انتظار بالثواني
+        """
+        self.flush(timeout)
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        الحصول على إحصائيات الطابور
+        
+        Returns:
+            Dict[str, Any]: الإحصائيات
+        """
+        with self._spool_lock:
+            unflushed = self._unflushed
+        return {
+            **self._stats,
+            'queued': self._queue.qsize(),
+            'unflushed': unflushed
+        }
+
+# إنشاء instance عالمي
+message_write_queue = MessageWriteBehindQueue()
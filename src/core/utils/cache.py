@@ -2,36 +2,115 @@
 نظام التخزين المؤقت لـ BoAI - إدارة الذاكرة المؤقتة
 
 هذا الملف يحتوي على نظام التخزين المؤقت باستخدام Redis
-مع دعم للتخزين المحلي كبديل عند عدم توفر Redis
+مع دعم للتخزين المحلي كبديل عند عدم توفر Redis، وواجهة غير
+متزامنة (AsyncCacheManager) لمعالجات FastAPI غير المتزامنة
 """
 
+import inspect
 import logging
 import json
+import threading
 import time
-from typing import Any, Optional, Dict, Union
+from typing import Any, Optional, Dict, Iterable, List, Tuple, Union
 from datetime import datetime, timedelta
 import redis
+import redis.asyncio as aioredis
 from functools import wraps
 
 from src.core.config import settings
 from src.core.utils.helpers import generate_uuid, get_timestamp
+from src.core.utils.cache_codec import CacheCodec, EncodedValue, is_immutable
+from src.core.utils.local_cache import BoundedLocalCache
 
 # إعداد التسجيل
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# قيمة تمييز غياب المفتاح في التخزين المحلي (None قيمة مخزنة صالحة)
+_MISSING = object()
+
+class CachePipeline:
+    """
+    تجميع عمليات كتابة متعددة وتنفيذها معاً عند الخروج من كتلة with
+    
+    مع Redis تُرسل كل العمليات ورسالة إبطال واحدة في رحلة واحدة (pipeline)،
+    وبدونه تُطبق على التخزين المحلي؛ لا يُنفذ شيء إذا رُفع استثناء داخل الكتلة
+    """
+    
+    def __init__(self, manager: "CacheManager"):
+        """
+        Args:
+            manager: مدير التخزين المؤقت المنفذ للعمليات
+        """
+        self.manager = manager
+        self._commands: List[Tuple[str, str, Any, Optional[int]]] = []
+        self.results: List[Any] = []
+    
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> "CachePipeline":
+        """إضافة عملية تخزين"""
+        self._commands.append(('set', key, value, ttl))
+        return self
+    
+    def delete(self, key: str) -> "CachePipeline":
+        """إضافة عملية حذف"""
+        self._commands.append(('delete', key, None, None))
+        return self
+    
+    def increment(self, key: str, amount: int = 1) -> "CachePipeline":
+        """إضافة عملية زيادة"""
+        self._commands.append(('increment', key, amount, None))
+        return self
+    
+    def execute(self) -> List[Any]:
+        """
+        تنفيذ العمليات المجمعة
+        
+        Returns:
+            List[Any]: نتيجة كل عملية بالترتيب
+                (bool للتخزين والحذف، القيمة الجديدة للزيادة)
+        """
+        commands, self._commands = self._commands, []
+        self.results = self.manager._execute_pipeline(commands) if commands else []
+        return self.results
+    
+    def __enter__(self) -> "CachePipeline":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.execute()
+        return False
+
+
 class CacheManager:
     """
     مدير التخزين المؤقت - يدعم Redis والتخزين المحلي
+    
+    مع Redis يمكن تفعيل طبقة أولى (L1) صغيرة داخل العامل أمام Redis (L2)؛
+    كل set أو delete يُبطل نسخة L1 في العمال الآخرين عبر Redis pub/sub
     """
     
     def __init__(self):
         """تهيئة مدير التخزين المؤقت"""
         self.redis_client = None
-        self.local_cache = {}
+        self.codec = CacheCodec()  # orjson/msgpack مع ضغط اختياري للقيم الكبيرة
+        self.local_cache = BoundedLocalCache()  # محدود بالعدد والحجم مع طرد LRU
+        self.local_locks = {}  # أقفال التخزين المحلي: الاسم -> (الرمز، وقت الانتهاء)
+        self._local_locks_guard = threading.Lock()
         self.use_redis = False
         
+        # الطبقة الأولى داخل العامل (تُفعّل فقط مع Redis واشتراك الإبطال)
+        self.l1: Optional[BoundedLocalCache] = None
+        self.instance_id = generate_uuid()
+        self._pubsub_thread = None
+        self._l1_stats = {
+            'invalidations_published': 0,
+            'invalidations_received': 0,
+            'subscriber_errors': 0
+        }
+        
         self._init_redis()
+        self._init_l1()
     
     def _init_redis(self) -> bool:
         """
@@ -41,9 +120,10 @@ class CacheManager:
             bool: True إذا تم الاتصال بنجاح
         """
         try:
+            # القيم تُخزن بايتات مرمّزة (CacheCodec) لا نصوصاً
             self.redis_client = redis.Redis.from_url(
                 settings.REDIS_URL,
-                decode_responses=True,
+                decode_responses=False,
                 socket_timeout=5,
                 socket_connect_timeout=5,
                 retry_on_timeout=True
@@ -64,6 +144,161 @@ class CacheManager:
             self.use_redis = False
             return False
     
+    def _init_l1(self) -> bool:
+        """
+        تهيئة الطبقة الأولى والاشتراك في قناة الإبطال
+        
+        بدون اشتراك لا تُفعّل L1 لأن العامل لن يعلم بتحديثات العمال الآخرين
+        
+        Returns:
+            bool: True إذا فُعّلت الطبقة الأولى
+        """
+        if not (settings.CACHE_L1_ENABLED and self.use_redis and self.redis_client):
+            return False
+        
+        self.l1 = BoundedLocalCache(
+            max_entries=settings.CACHE_L1_MAX_ENTRIES,
+            max_bytes=settings.CACHE_L1_MAX_BYTES
+        )
+        try:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(
+                **{settings.CACHE_INVALIDATION_CHANNEL: self._on_invalidation}
+            )
+            self._pubsub_thread = pubsub.run_in_thread(
+                sleep_time=1,
+                daemon=True,
+                exception_handler=self._on_subscriber_error
+            )
+            logger.info("تم تفعيل الطبقة الأولى للتخزين المؤقت مع إبطال عبر pub/sub")
+            return True
+        except Exception as e:
+            logger.warning(f"تعذر الاشتراك في قناة الإبطال: {e}. تعطيل الطبقة الأولى.")
+            self.l1 = None
+            return False
+    
+    def _on_invalidation(self, message: Dict[str, Any]):
+        """
+        حذف المفاتيح المُبطلة من الطبقة الأولى عند وصول رسالة من عامل آخر
+        
+        Args:
+            message: رسالة pub/sub تحتوي على المصدر والمفاتيح
+        """
+        try:
+            payload = json.loads(message['data'])
+        except (TypeError, ValueError) as e:
+            logger.warning(f"رسالة إبطال غير صالحة: {e}")
+            return
+        
+        if payload.get('origin') == self.instance_id or self.l1 is None:
+            return
+        
+        for key in payload.get('keys', []):
+            self.l1.delete(key)
+        self._l1_stats['invalidations_received'] += 1
+    
+    def _on_subscriber_error(self, error: BaseException, pubsub, thread):
+        """
+        التعامل مع انقطاع الاشتراك: قد تكون رسائل إبطال فُقدت فتُمسح L1 كاملة
+        
+        Args:
+            error: الخطأ
+            pubsub: كائن الاشتراك (يعيد الاتصال تلقائياً في المحاولة التالية)
+            thread: خيط الاستماع
+        """
+        self._l1_stats['subscriber_errors'] += 1
+        logger.warning(f"انقطاع اشتراك الإبطال: {error}. مسح الطبقة الأولى.")
+        if self.l1 is not None:
+            self.l1.clear()
+        time.sleep(1)
+    
+    def _queue_invalidation(self, pipe, keys: list):
+        """
+        إضافة رسالة إبطال إلى نفس pipeline الكتابة (رحلة واحدة إلى Redis)
+        
+        Args:
+            pipe: pipeline الخاص بـ Redis
+            keys: المفاتيح المتغيرة
+        """
+        pipe.publish(
+            settings.CACHE_INVALIDATION_CHANNEL,
+            json.dumps({'origin': self.instance_id, 'keys': keys}, ensure_ascii=False)
+        )
+        self._l1_stats['invalidations_published'] += 1
+    
+    def _l1_ttl(self, ttl: Optional[int]) -> int:
+        """مدة صلاحية نسخة L1 (قصيرة ولا تتجاوز صلاحية المفتاح في Redis)"""
+        return min(ttl, settings.CACHE_L1_TTL) if ttl else settings.CACHE_L1_TTL
+    
+    def _queue_fetch(self, pipe, keys: List[str]):
+        """
+        إضافة قراءة المفاتيح إلى pipeline مع صلاحيتها المتبقية (PTTL)
+        
+        الصلاحية المتبقية تُقرأ في نفس الرحلة فقط عند وجود طبقة أولى
+        """
+        pipe.mget(keys)
+        if self.l1 is not None:
+            for key in keys:
+                pipe.pttl(key)
+    
+    def _store_fetched(self, keys: List[str], results: List[Any]) -> Dict[str, Any]:
+        """
+        فك ترميز نتائج _queue_fetch ونسخها إلى الطبقة الأولى
+        
+        نسخة L1 لا تعيش أكثر من الصلاحية المتبقية للمفتاح في Redis، والمفاتيح
+        التي توشك على الانتهاء لا تُنسخ
+        
+        Args:
+            keys: المفاتيح بنفس ترتيب القراءة
+            results: نتائج الـ pipeline (MGET ثم PTTL لكل مفتاح)
+        
+        Returns:
+            Dict[str, Any]: المفاتيح الموجودة فقط مع قيمها
+        """
+        encoded_values, pttls = results[0], results[1:]
+        values = {}
+        for index, (key, encoded_value) in enumerate(zip(keys, encoded_values)):
+            if encoded_value is None:
+                continue
+            values[key] = self.codec.decode(encoded_value)
+            if self.l1 is None:
+                continue
+            # -1: بدون انتهاء في Redis، -2: انتهى المفتاح بعد قراءته
+            pttl = pttls[index]
+            if pttl == -1:
+                ttl = settings.CACHE_L1_TTL
+            else:
+                ttl = min(settings.CACHE_L1_TTL, pttl / 1000) if pttl > 0 else 0
+            if ttl > 0:
+                self.l1.set(key, self._local_form(values[key], encoded_value), ttl)
+        return values
+    
+    def _local_form(self, value: Any, encoded: Optional[bytes] = None) -> Any:
+        """
+        صيغة التخزين المحلي (التخزين البديل والطبقة الأولى)
+        
+        القيم غير القابلة للتعديل تُخزن كما هي فلا تحتاج فك ترميز عند القراءة؛
+        القوائم والقواميس تُخزن مرمّزة حتى لا يغير المستدعي النسخة المخزنة
+        
+        Args:
+            value: القيمة
+            encoded: القيمة مرمّزة مسبقاً (اختياري)
+        
+        Returns:
+            Any: القيمة نفسها أو EncodedValue
+        """
+        if is_immutable(value):
+            return value
+        return EncodedValue(
+            encoded if encoded is not None else self.codec.encode(value)
+        )
+    
+    def _from_local(self, stored: Any) -> Any:
+        """القيمة الأصلية من صيغة التخزين المحلي"""
+        if isinstance(stored, EncodedValue):
+            return self.codec.decode(stored)
+        return stored
+    
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """
         تخزين قيمة في الذاكرة المؤقتة
@@ -77,20 +312,25 @@ class CacheManager:
             bool: True إذا تم التخزين بنجاح
         """
         try:
-            serialized_value = json.dumps(value, ensure_ascii=False)
-            
             if self.use_redis and self.redis_client:
+                encoded_value = self.codec.encode(value)
+                client = (self.redis_client.pipeline(transaction=False)
+                          if self.l1 is not None else self.redis_client)
                 if ttl:
-                    self.redis_client.setex(key, ttl, serialized_value)
+                    client.setex(key, ttl, encoded_value)
                 else:
-                    self.redis_client.set(key, serialized_value)
+                    client.set(key, encoded_value)
+                
+                if self.l1 is not None:
+                    self._queue_invalidation(client, [key])
+                    client.execute()
+                    self.l1.set(
+                        key, self._local_form(value, encoded_value), self._l1_ttl(ttl)
+                    )
             else:
                 # التخزين المحلي
-                expire_time = time.time() + ttl if ttl else None
-                self.local_cache[key] = {
-                    'value': serialized_value,
-                    'expire_time': expire_time
-                }
+                if not self.local_cache.set(key, self._local_form(value), ttl):
+                    return False
             
             logger.debug(f"تم تخزين المفتاح: {key} (TTL: {ttl}s)")
             return True
@@ -112,26 +352,28 @@ class CacheManager:
         """
         try:
             if self.use_redis and self.redis_client:
-                serialized_value = self.redis_client.get(key)
-                if serialized_value is None:
-                    return default
-            else:
-                # الاسترجاع من التخزين المحلي
-                if key not in self.local_cache:
-                    return default
+                # القراءة من الطبقة الأولى أولاً ثم من Redis
+                if self.l1 is not None:
+                    stored = self.l1.get(key, _MISSING)
+                    if stored is not _MISSING:
+                        return self._from_local(stored)
                 
-                cache_item = self.local_cache[key]
+                if self.l1 is None:
+                    encoded_value = self.redis_client.get(key)
+                    if encoded_value is None:
+                        return default
+                    # إعادة القيمة إلى نوعها الأصلي
+                    return self.codec.decode(encoded_value)
                 
-                # التحقق من انتهاء الصلاحية
-                if (cache_item['expire_time'] and 
-                    time.time() > cache_item['expire_time']):
-                    del self.local_cache[key]
-                    return default
-                
-                serialized_value = cache_item['value']
+                pipe = self.redis_client.pipeline(transaction=False)
+                self._queue_fetch(pipe, [key])
+                return self._store_fetched([key], pipe.execute()).get(key, default)
             
-            # إعادة القيمة إلى نوعها الأصلي
-            return json.loads(serialized_value)
+            # الاسترجاع من التخزين المحلي (يتجاهل المنتهي الصلاحية)
+            stored = self.local_cache.get(key, _MISSING)
+            if stored is _MISSING:
+                return default
+            return self._from_local(stored)
             
         except Exception as e:
             logger.error(f"خطأ في استرجاع القيمة: {e}")
@@ -149,11 +391,16 @@ class CacheManager:
         """
         try:
             if self.use_redis and self.redis_client:
-                deleted = self.redis_client.delete(key) > 0
+                if self.l1 is not None:
+                    self.l1.delete(key)
+                    pipe = self.redis_client.pipeline(transaction=False)
+                    pipe.delete(key)
+                    self._queue_invalidation(pipe, [key])
+                    deleted = pipe.execute()[0] > 0
+                else:
+                    deleted = self.redis_client.delete(key) > 0
             else:
-                deleted = key in self.local_cache
-                if deleted:
-                    del self.local_cache[key]
+                deleted = self.local_cache.delete(key)
             
             if deleted:
                 logger.debug(f"تم حذف المفتاح: {key}")
@@ -178,19 +425,11 @@ class CacheManager:
         """
         try:
             if self.use_redis and self.redis_client:
+                if self.l1 is not None and self.l1.contains(key):
+                    return True
                 return self.redis_client.exists(key) > 0
             else:
-                if key not in self.local_cache:
-                    return False
-                
-                # التحقق من انتهاء الصلاحية
-                cache_item = self.local_cache[key]
-                if (cache_item['expire_time'] and 
-                    time.time() > cache_item['expire_time']):
-                    del self.local_cache[key]
-                    return False
-                
-                return True
+                return self.local_cache.contains(key)
                 
         except Exception as e:
             logger.error(f"خطأ في التحقق من المفتاح: {e}")
@@ -209,6 +448,12 @@ class CacheManager:
         """
         try:
             if self.use_redis and self.redis_client:
+                if self.l1 is not None:
+                    self.l1.delete(key)
+                    pipe = self.redis_client.pipeline(transaction=False)
+                    pipe.incrby(key, amount)
+                    self._queue_invalidation(pipe, [key])
+                    return pipe.execute()[0]
                 return self.redis_client.incrby(key, amount)
             else:
                 current = self.get(key, 0)
@@ -223,6 +468,257 @@ class CacheManager:
             logger.error(f"خطأ في زيادة القيمة: {e}")
             return None
     
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        استرجاع عدة قيم في رحلة واحدة (MGET بعد الطبقة الأولى)
+        
+        Args:
+            keys: المفاتيح
+        
+        Returns:
+            Dict[str, Any]: المفاتيح الموجودة فقط مع قيمها
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        
+        try:
+            if not (self.use_redis and self.redis_client):
+                # قراءة التخزين المحلي في تمريرة واحدة
+                return {key: self._from_local(stored)
+                        for key, stored in self.local_cache.get_many(keys).items()}
+            
+            stored_values = self.l1.get_many(keys) if self.l1 is not None else {}
+            values = {
+                key: self._from_local(stored) for key, stored in stored_values.items()
+            }
+            missing = [key for key in keys if key not in values]
+            if missing:
+                pipe = self.redis_client.pipeline(transaction=False)
+                self._queue_fetch(pipe, missing)
+                values.update(self._store_fetched(missing, pipe.execute()))
+            return values
+            
+        except Exception as e:
+            logger.error(f"خطأ في استرجاع القيم: {e}")
+            return {}
+    
+    def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """
+        تخزين عدة قيم في رحلة واحدة (MSET، أو pipeline عند وجود وقت انتهاء)
+        
+        Args:
+            items: المفتاح -> القيمة
+            ttl: وقت الانتهاء بالثواني لكل المفاتيح (اختياري)
+        
+        Returns:
+            bool: True إذا تم تخزين كل القيم
+        """
+        if not items:
+            return True
+        
+        try:
+            if self.use_redis and self.redis_client:
+                encoded_items = {
+                    key: self.codec.encode(value) for key, value in items.items()
+                }
+                pipe = self.redis_client.pipeline(transaction=False)
+                if ttl:
+                    for key, encoded_value in encoded_items.items():
+                        pipe.setex(key, ttl, encoded_value)
+                else:
+                    pipe.mset(encoded_items)
+                if self.l1 is not None:
+                    self._queue_invalidation(pipe, list(encoded_items))
+                pipe.execute()
+                if self.l1 is not None:
+                    self.l1.set_many({
+                        key: self._local_form(items[key], encoded_value)
+                        for key, encoded_value in encoded_items.items()
+                    }, self._l1_ttl(ttl))
+            else:
+                local_items = {
+                    key: self._local_form(value) for key, value in items.items()
+                }
+                if self.local_cache.set_many(local_items, ttl) < len(local_items):
+                    return False
+            
+            logger.debug(f"تم تخزين {len(items)} مفتاح (TTL: {ttl}s)")
+            return True
+            
+        except Exception as e:
+            logger.error(f"خطأ في تخزين القيم: {e}")
+            return False
+    
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        حذف عدة مفاتيح في رحلة واحدة
+        
+        Args:
+            keys: المفاتيح المراد حذفها
+        
+        Returns:
+            int: عدد المفاتيح المحذوفة
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return 0
+        
+        try:
+            if self.use_redis and self.redis_client:
+                if self.l1 is not None:
+                    self.l1.delete_many(keys)
+                    pipe = self.redis_client.pipeline(transaction=False)
+                    pipe.delete(*keys)
+                    self._queue_invalidation(pipe, keys)
+                    return pipe.execute()[0]
+                return self.redis_client.delete(*keys)
+            return self.local_cache.delete_many(keys)
+            
+        except Exception as e:
+            logger.error(f"خطأ في حذف المفاتيح: {e}")
+            return 0
+    
+    def pipeline(self) -> CachePipeline:
+        """
+        تجميع عمليات كتابة وتنفيذها في رحلة واحدة
+        
+        مثال:
+            with cache_manager.pipeline() as pipe:
+                pipe.set("a", 1, ttl=60)
+                pipe.delete("b")
+        
+        Returns:
+            CachePipeline: مجمع العمليات
+        """
+        return CachePipeline(self)
+    
+    def _execute_pipeline(self, commands: List[Tuple[str, str, Any, Optional[int]]]
+                          ) -> List[Any]:
+        """
+        تنفيذ عمليات CachePipeline
+        
+        Args:
+            commands: عناصر (العملية، المفتاح، القيمة أو المقدار، وقت الانتهاء)
+        
+        Returns:
+            List[Any]: نتيجة كل عملية بالترتيب
+        """
+        if not (self.use_redis and self.redis_client):
+            # التخزين المحلي: تنفيذ العمليات مباشرة بالترتيب
+            operations = {
+                'set': lambda key, value, ttl: self.set(key, value, ttl),
+                'delete': lambda key, value, ttl: self.delete(key),
+                'increment': lambda key, value, ttl: self.increment(key, value)
+            }
+            return [operations[operation](key, value, ttl)
+                    for operation, key, value, ttl in commands]
+        
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            written: Dict[str, Tuple[Any, Optional[int]]] = {}
+            for operation, key, value, ttl in commands:
+                if operation == 'set':
+                    encoded_value = self.codec.encode(value)
+                    if ttl:
+                        pipe.setex(key, ttl, encoded_value)
+                    else:
+                        pipe.set(key, encoded_value)
+                    written[key] = (self._local_form(value, encoded_value), ttl)
+                elif operation == 'delete':
+                    pipe.delete(key)
+                    written.pop(key, None)
+                else:
+                    pipe.incrby(key, value)
+                    written.pop(key, None)
+            
+            keys = list(dict.fromkeys(key for _, key, _, _ in commands))
+            if self.l1 is not None:
+                self.l1.delete_many(keys)
+                self._queue_invalidation(pipe, keys)
+            raw_results = pipe.execute()[:len(commands)]
+            
+            if self.l1 is not None:
+                for key, (stored, ttl) in written.items():
+                    self.l1.set(key, stored, self._l1_ttl(ttl))
+            
+            results = []
+            for (operation, _, _, _), result in zip(commands, raw_results):
+                if operation == 'set':
+                    results.append(bool(result))
+                elif operation == 'delete':
+                    results.append(result > 0)
+                else:
+                    results.append(result)
+            return results
+            
+        except Exception as e:
+            logger.error(f"خطأ في تنفيذ عمليات pipeline: {e}")
+            return [None] * len(commands)
+    
+    def acquire_lock(self, name: str, ttl: int = 30) -> Optional[str]:
+        """
+        محاولة الحصول على قفل موزع (SET NX PX في Redis)
+        
+        Args:
+            name: اسم القفل
+            ttl: مدة صلاحية القفل بالثواني (تحرير تلقائي عند انهيار المالك)
+        
+        Returns:
+            Optional[str]: رمز القفل عند النجاح، None إذا كان القفل محجوزاً
+        """
+        token = generate_uuid()
+        if self.use_redis and self.redis_client:
+            try:
+                acquired = self.redis_client.set(
+                    name, token, nx=True, px=int(ttl * 1000)
+                )
+                return token if acquired else None
+            except Exception as e:
+                # عند تعذر الوصول إلى Redis نكتفي بالقفل المحلي داخل العامل
+                logger.error(
+                    f"خطأ في الحصول على القفل {name}: {e}. استخدام القفل المحلي."
+                )
+        
+        with self._local_locks_guard:
+            current = self.local_locks.get(name)
+            if current and current[1] > time.time():
+                return None
+            self.local_locks[name] = (token, time.time() + ttl)
+            return token
+    
+    def release_lock(self, name: str, token: str) -> bool:
+        """
+        تحرير قفل إذا كان ما زال مملوكاً لنفس الرمز
+        
+        Args:
+            name: اسم القفل
+            token: الرمز المعاد من acquire_lock
+        
+        Returns:
+            bool: True إذا تم التحرير
+        """
+        with self._local_locks_guard:
+            current = self.local_locks.get(name)
+            if current and current[0] == token:
+                del self.local_locks[name]
+                return True
+        
+        try:
+            if self.use_redis and self.redis_client:
+                # المقارنة والحذف في عملية ذرية واحدة
+                released = self.redis_client.eval(
+                    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+                    "return redis.call('del', KEYS[1]) else return 0 end",
+                    1, name, token
+                )
+                return bool(released)
+            return False
+                
+        except Exception as e:
+            logger.error(f"خطأ في تحرير القفل {name}: {e}")
+            return False
+    
     def get_ttl(self, key: str) -> Optional[int]:
         """
         الحصول على الوقت المتبقي للمفتاح بالثواني
@@ -238,15 +734,8 @@ class CacheManager:
                 ttl = self.redis_client.ttl(key)
                 return ttl if ttl >= 0 else None
             else:
-                if key not in self.local_cache:
-                    return None
-                
-                cache_item = self.local_cache[key]
-                if not cache_item['expire_time']:
-                    return None
-                
-                remaining = cache_item['expire_time'] - time.time()
-                return int(remaining) if remaining > 0 else None
+                remaining = self.local_cache.ttl(key)
+                return int(remaining) if remaining is not None else None
                 
         except Exception as e:
             logger.error(f"خطأ في الحصول على TTL: {e}")
@@ -262,18 +751,11 @@ class CacheManager:
         if self.use_redis:
             return 0  # Redis يدير انتهاء الصلاحية تلقائياً
         
-        expired_keys = []
-        current_time = time.time()
-        
-        for key, item in self.local_cache.items():
-            if item['expire_time'] and current_time > item['expire_time']:
-                expired_keys.append(key)
-        
-        for key in expired_keys:
-            del self.local_cache[key]
+        # العناصر المنتهية تُمسح تلقائياً مع العمليات العادية عبر عجلة الانتهاء
+        expired_count = self.local_cache.clear_expired()
         
-        logger.info(f"تم مسح {len(expired_keys)} عنصر منتهي الصلاحية")
-        return len(expired_keys)
+        logger.info(f"تم مسح {expired_count} عنصر منتهي الصلاحية")
+        return expired_count
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -291,21 +773,22 @@ class CacheManager:
                     'connected': True,
                     'keys_count': info['db0']['keys'] if 'db0' in info else 0,
                     'memory_used': info['used_memory_human'],
-                    'uptime': info['uptime_in_seconds']
+                    'uptime': info['uptime_in_seconds'],
+                    'l1': ({**self.l1.get_stats(), **self._l1_stats}
+                           if self.l1 is not None else None),
+                    'codec': self.codec.get_stats()
                 }
             else:
                 # إحصائيات التخزين المحلي
-                expired_count = sum(
-                    1 for item in self.local_cache.values() 
-                    if item['expire_time'] and time.time() > item['expire_time']
-                )
+                local_stats = self.local_cache.get_stats()
                 
                 return {
                     'type': 'local',
                     'connected': False,
-                    'keys_count': len(self.local_cache),
-                    'expired_keys': expired_count,
-                    'memory_usage': 'N/A'
+                    'keys_count': local_stats['entries'],
+                    'memory_usage': local_stats['bytes'],
+                    'local_cache': local_stats,
+                    'codec': self.codec.get_stats()
                 }
                 
         except Exception as e:
@@ -315,11 +798,221 @@ class CacheManager:
 # إنشاء instance عالمي
 cache_manager = CacheManager()
 
+
+class AsyncCacheManager:
+    """
+    مدير التخزين المؤقت غير المتزامن - مبني على redis.asyncio
+    
+    يستخدم مجمع اتصالات مشتركاً داخل حلقة الأحداث فلا تحجبها عمليات
+    التخزين، ويشارك CacheManager التخزين المحلي والطبقة الأولى ورسائل
+    الإبطال؛ CacheManager يبقى الواجهة المتزامنة للخيوط الخلفية
+    """
+    
+    def __init__(self, sync_manager: Optional[CacheManager] = None, redis_client=None):
+        """
+        تهيئة المدير غير المتزامن
+        
+        Args:
+            sync_manager: المدير المتزامن المشارك (افتراضياً cache_manager)
+            redis_client: عميل redis.asyncio (افتراضياً يُنشأ عند أول استخدام)
+        """
+        self.sync_manager = sync_manager or cache_manager
+        self.redis_client = redis_client
+        self._pool = None
+    
+    @property
+    def use_redis(self) -> bool:
+        """توفر Redis كما حدده المدير المتزامن عند الاتصال"""
+        return self.sync_manager.use_redis
+    
+    def _client(self):
+        """
+        عميل Redis غير المتزامن (يُنشأ داخل حلقة الأحداث عند أول استخدام)
+        
+        Returns:
+            redis.asyncio.Redis: العميل المشترك
+        """
+        if self.redis_client is None:
+            self._pool = aioredis.ConnectionPool.from_url(
+                settings.REDIS_URL,
+                decode_responses=False,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                socket_timeout=5,
+                socket_connect_timeout=5
+            )
+            self.redis_client = aioredis.Redis(connection_pool=self._pool)
+        return self.redis_client
+    
+    async def _write(self, items: Dict[str, Any], ttl: Optional[int] = None):
+        """
+        ترميز القيم وكتابتها مع رسالة الإبطال في pipeline واحد
+        
+        Args:
+            items: المفتاح -> القيمة
+            ttl: وقت الانتهاء بالثواني (اختياري)
+        """
+        sync_manager = self.sync_manager
+        encoded_items = {
+            key: sync_manager.codec.encode(value) for key, value in items.items()
+        }
+        pipe = self._client().pipeline(transaction=False)
+        for key, encoded_value in encoded_items.items():
+            pipe.set(key, encoded_value, ex=ttl)
+        if sync_manager.l1 is not None:
+            sync_manager._queue_invalidation(pipe, list(items))
+        await pipe.execute()
+        
+        if sync_manager.l1 is not None:
+            sync_manager.l1.set_many({
+                key: sync_manager._local_form(items[key], encoded_value)
+                for key, encoded_value in encoded_items.items()
+            }, sync_manager._l1_ttl(ttl))
+    
+    async def get(self, key: str, default: Any = None) -> Any:
+        """
+        استرجاع قيمة من الذاكرة المؤقتة
+        
+        Args:
+            key: المفتاح
+            default: القيمة الافتراضية إذا لم يوجد المفتاح
+        
+        Returns:
+            Any: القيمة المسترجعة أو القيمة الافتراضية
+        """
+        values = await self.mget([key], default)
+        return values[0]
+    
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """
+        تخزين قيمة في الذاكرة المؤقتة
+        
+        Args:
+            key: المفتاح
+            value: القيمة (يمكن أن تكون أي نوع قابل للتسلسل)
+            ttl: وقت الانتهاء بالثواني (اختياري)
+        
+        Returns:
+            bool: True إذا تم التخزين بنجاح
+        """
+        return await self.mset({key: value}, ttl)
+    
+    async def delete(self, key: str) -> bool:
+        """
+        حذف مفتاح من الذاكرة المؤقتة
+        
+        Args:
+            key: المفتاح المراد حذفه
+        
+        Returns:
+            bool: True إذا تم الحذف بنجاح
+        """
+        if not self.use_redis:
+            return self.sync_manager.delete(key)
+        
+        try:
+            l1 = self.sync_manager.l1
+            if l1 is not None:
+                l1.delete(key)
+            pipe = self._client().pipeline(transaction=False)
+            pipe.delete(key)
+            if l1 is not None:
+                self.sync_manager._queue_invalidation(pipe, [key])
+            results = await pipe.execute()
+            return results[0] > 0
+            
+        except Exception as e:
+            logger.error(f"خطأ في حذف المفتاح: {e}")
+            return False
+    
+    async def mget(self, keys: List[str], default: Any = None) -> List[Any]:
+        """
+        استرجاع عدة قيم في رحلة واحدة إلى Redis (بعد الطبقة الأولى)
+        
+        Args:
+            keys: المفاتيح
+            default: القيمة لكل مفتاح غير موجود
+        
+        Returns:
+            List[Any]: القيم بنفس ترتيب المفاتيح
+        """
+        if not self.use_redis:
+            # التخزين المحلي في الذاكرة لا يحجب حلقة الأحداث
+            found = self.sync_manager.get_many(keys)
+            return [found.get(key, default) for key in keys]
+        
+        try:
+            sync_manager = self.sync_manager
+            stored_values = (sync_manager.l1.get_many(keys)
+                             if sync_manager.l1 is not None else {})
+            values = {
+                key: sync_manager._from_local(stored)
+                for key, stored in stored_values.items()
+            }
+            missing = list(dict.fromkeys(key for key in keys if key not in values))
+            
+            if missing:
+                pipe = self._client().pipeline(transaction=False)
+                sync_manager._queue_fetch(pipe, missing)
+                results = await pipe.execute()
+                values.update(sync_manager._store_fetched(missing, results))
+            
+            return [values.get(key, default) for key in keys]
+            
+        except Exception as e:
+            logger.error(f"خطأ في استرجاع القيم: {e}")
+            return [default] * len(keys)
+    
+    async def mset(self, items: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """
+        تخزين عدة قيم في رحلة واحدة إلى Redis
+        
+        Args:
+            items: المفتاح -> القيمة
+            ttl: وقت الانتهاء بالثواني لكل المفاتيح (اختياري)
+        
+        Returns:
+            bool: True إذا تم التخزين بنجاح
+        """
+        if not self.use_redis:
+            return self.sync_manager.set_many(items, ttl)
+        
+        try:
+            await self._write(items, ttl)
+            logger.debug(f"تم تخزين {len(items)} مفتاح (TTL: {ttl}s)")
+            return True
+            
+        except Exception as e:
+            logger.error(f"خطأ في تخزين القيم: {e}")
+            return False
+    
+    async def aclose(self):
+        """إغلاق مجمع اتصالات Redis غير المتزامن"""
+        if self.redis_client is not None:
+            await self.redis_client.aclose()
+            self.redis_client = None
+        if self._pool is not None:
+            await self._pool.disconnect()
+            self._pool = None
+
+# إنشاء instance عالمي
+async_cache_manager = AsyncCacheManager(cache_manager)
+
+
+def _make_cache_key(func, key_prefix: str, args: tuple, kwargs: dict) -> str:
+    """إنشاء مفتاح فريد بناء على الدالة ومدخلاتها"""
+    func_name = func.__name__
+    args_str = str(args)
+    kwargs_str = str(sorted(kwargs.items()))
+    return f"{key_prefix}:{func_name}:{hash(args_str + kwargs_str)}"
+
 # ديكورator للتخزين المؤقت
 def cached(ttl: int = 300, key_prefix: str = "cache"):
     """
     ديكورator لتخزين نتائج الدالة مؤقتاً
     
+    الدوال غير المتزامنة (async def) تستخدم async_cache_manager فلا تحجب
+    حلقة الأحداث، والدوال العادية تستخدم cache_manager
+    
     Args:
         ttl: وقت الانتهاء بالثواني
         key_prefix: بادئة المفتاح
@@ -328,13 +1021,28 @@ def cached(ttl: int = 300, key_prefix: str = "cache"):
         function: الدالة المزينة
     """
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                cache_key = _make_cache_key(func, key_prefix, args, kwargs)
+                
+                cached_result = await async_cache_manager.get(cache_key)
+                if cached_result is not None:
+                    logger.debug(f"تم استرجاع النتيجة من الذاكرة المؤقتة: {cache_key}")
+                    return cached_result
+                
+                result = await func(*args, **kwargs)
+                
+                await async_cache_manager.set(cache_key, result, ttl)
+                logger.debug(f"تم تخزين النتيجة في الذاكرة المؤقتة: {cache_key}")
+                
+                return result
+            return async_wrapper
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
             # إنشاء مفتاح فريد بناء على الدالة ومدخلاتها
-            func_name = func.__name__
-            args_str = str(args)
-            kwargs_str = str(sorted(kwargs.items()))
-            cache_key = f"{key_prefix}:{func_name}:{hash(args_str + kwargs_str)}"
+            cache_key = _make_cache_key(func, key_prefix, args, kwargs)
             
             # محاولة الاسترجاع من الذاكرة المؤقتة
             cached_result = cache_manager.get(cache_key)
@@ -0,0 +1,298 @@
+"""
+ترميز قيم التخزين المؤقت (Cache Codec) - تسلسل ثنائي سريع وضغط اختياري
+
+هذا الملف يحتوي على طبقة ترميز قابلة للاستبدال لقيم CacheManager:
+orjson افتراضياً (أو msgpack اختيارياً)، مع ضغط zstd أو lz4 للقيم الأكبر
+من حد معين. كل قيمة مرمّزة تبدأ بترويسة قصيرة تحدد صيغتها، والقيم
+القديمة (JSON نصي بدون ترويسة) والأعداد الصحيحة (نص عشري يفهمه INCRBY)
+تُقرأ كـ JSON مباشرة
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.core.config import settings
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+# إعداد التسجيل
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# أول بايت في ترويسة القيم المرمّزة (لا يبدأ به أي نص JSON)
+HEADER_MAGIC = 0x00
+
+# رموز صيغة التسلسل والضغط في الترويسة
+SERIALIZER_TAGS = {'json': ord('j'), 'msgpack': ord('m')}
+COMPRESSION_TAGS = {'none': ord('-'), 'zstd': ord('z'), 'lz4': ord('l')}
+
+# أنواع غير قابلة للتعديل يمكن تخزينها في الذاكرة المحلية بدون ترميز
+IMMUTABLE_TYPES = (str, int, float, bool, bytes, type(None))
+
+
+class EncodedValue(bytes):
+    """قيمة مرمّزة مخزنة محلياً (تمييزاً لها عن القيم المخزنة كما هي)"""
+
+
+def is_immutable(value: Any) -> bool:
+    """
+    التحقق مما إذا كان تخزين القيمة كما هي آمناً (لا يمكن تعديلها بعد التخزين)
+
+    Args:
+        value: القيمة
+
+    Returns:
+        bool: True للأنواع البسيطة غير القابلة للتعديل
+    """
+    return isinstance(value, IMMUTABLE_TYPES)
+
+
+def _json_dumps(value: Any) -> bytes:
+    """تسلسل JSON بـ orjson إذا توفر"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+
+def _json_loads(data: bytes) -> Any:
+    """قراءة JSON بـ orjson إذا توفر"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class CacheCodec:
+    """
+    ترميز القيم إلى بايتات وفكها مع قياس الزمن
+    """
+
+    def __init__(self, serializer: Optional[str] = None,
+                 compression: Optional[str] = None,
+                 threshold: Optional[int] = None,
+                 level: Optional[int] = None):
+        """
+        تهيئة طبقة الترميز
+
+        Args:
+            serializer: orjson (أو json) أو msgpack
+            compression: auto أو zstd أو lz4 أو none
+            threshold: أقل حجم بالبايت يُضغط
+            level: مستوى ضغط zstd
+        """
+        self.serializer = self._resolve_serializer(
+            serializer or settings.CACHE_SERIALIZER
+        )
+        self.compression = self._resolve_compression(
+            compression or settings.CACHE_COMPRESSION
+        )
+        self.threshold = (threshold if threshold is not None
+                          else settings.CACHE_COMPRESSION_THRESHOLD)
+        self.level = level or settings.CACHE_COMPRESSION_LEVEL
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {
+            'encodes': 0,
+            'decodes': 0,
+            'encode_seconds': 0.0,
+            'decode_seconds': 0.0,
+            'compressed': 0,
+            'raw_bytes': 0,
+            'stored_bytes': 0
+        }
+
+    @staticmethod
+    def _resolve_serializer(name: str) -> str:
+        """صيغة التسلسل المتاحة فعلياً"""
+        name = name.lower()
+        if name == 'msgpack':
+            if MSGPACK_AVAILABLE:
+                return 'msgpack'
+            logger.warning("msgpack غير مثبت. استخدام JSON لترميز التخزين المؤقت.")
+        elif name not in ('orjson', 'json'):
+            logger.warning(f"صيغة تسلسل غير معروفة: {name}. استخدام JSON.")
+        return 'json'
+
+    @staticmethod
+    def _resolve_compression(name: str) -> str:
+        """خوارزمية الضغط المتاحة فعلياً"""
+        name = name.lower()
+        if name == 'auto':
+            return 'zstd' if ZSTD_AVAILABLE else 'lz4' if LZ4_AVAILABLE else 'none'
+        if ((name == 'zstd' and not ZSTD_AVAILABLE)
+                or (name == 'lz4' and not LZ4_AVAILABLE)):
+            logger.warning(f"مكتبة الضغط {name} غير مثبتة. تخزين القيم بدون ضغط.")
+            return 'none'
+        if name not in COMPRESSION_TAGS:
+            logger.warning(f"خوارزمية ضغط غير معروفة: {name}. تخزين القيم بدون ضغط.")
+            return 'none'
+        return name
+
+    def _zstd_compressor(self):
+        """ضاغط zstd لكل خيط (كائنات zstandard غير آمنة للاستخدام المتزامن)"""
+        compressor = getattr(self._local, 'zstd_compressor', None)
+        if compressor is None:
+            compressor = self._local.zstd_compressor = zstandard.ZstdCompressor(
+                level=self.level
+            )
+        return compressor
+
+    def _zstd_decompressor(self):
+        """فاك ضغط zstd لكل خيط"""
+        decompressor = getattr(self._local, 'zstd_decompressor', None)
+        if decompressor is None:
+            decompressor = self._local.zstd_decompressor = zstandard.ZstdDecompressor()
+        return decompressor
+
+    def _compress(self, payload: bytes) -> bytes:
+        """ضغط الحمولة بالخوارزمية المختارة"""
+        if self.compression == 'zstd':
+            return self._zstd_compressor().compress(payload)
+        return lz4.frame.compress(payload)
+
+    def _decompress(self, compression_tag: int, payload: bytes) -> bytes:
+        """فك ضغط الحمولة حسب رمزها في الترويسة"""
+        if compression_tag == COMPRESSION_TAGS['none']:
+            return payload
+        if compression_tag == COMPRESSION_TAGS['zstd']:
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("قيمة مضغوطة بـ zstd لكن zstandard غير مثبت")
+            return self._zstd_decompressor().decompress(payload)
+        if compression_tag == COMPRESSION_TAGS['lz4']:
+            if not LZ4_AVAILABLE:
+                raise RuntimeError("قيمة مضغوطة بـ lz4 لكن lz4 غير مثبت")
+            return lz4.frame.decompress(payload)
+        raise ValueError(f"رمز ضغط غير معروف: {compression_tag}")
+
+    def _record(self, operation: str, started: float, raw_size: int = 0,
+                stored_size: int = 0, compressed: bool = False):
+        """تسجيل زمن وحجم عملية ترميز أو فك"""
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._stats[f'{operation}s'] += 1
+            self._stats[f'{operation}_seconds'] += elapsed
+            self._stats['raw_bytes'] += raw_size
+            self._stats['stored_bytes'] += stored_size
+            if compressed:
+                self._stats['compressed'] += 1
+
+    def encode(self, value: Any) -> bytes:
+        """
+        ترميز قيمة إلى بايتات
+
+        الأعداد الصحيحة تُرمّز نصاً عشرياً بدون ترويسة ليبقى INCRBY ممكناً عليها
+
+        Args:
+            value: القيمة
+
+        Returns:
+            bytes: القيمة المرمّزة
+        """
+        started = time.perf_counter()
+        if isinstance(value, int) and not isinstance(value, bool):
+            data = str(value).encode('ascii')
+            self._record('encode', started, len(data), len(data))
+            return data
+
+        if self.serializer == 'msgpack':
+            payload = msgpack.packb(value, use_bin_type=True)
+        else:
+            payload = _json_dumps(value)
+
+        compression = 'none'
+        stored = payload
+        if self.compression != 'none' and len(payload) >= self.threshold:
+            compressed = self._compress(payload)
+            # الضغط يُستخدم فقط إذا وفّر مساحة فعلاً
+            if len(compressed) < len(payload):
+                compression, stored = self.compression, compressed
+
+        data = bytes((HEADER_MAGIC, SERIALIZER_TAGS[self.serializer],
+                      COMPRESSION_TAGS[compression])) + stored
+        self._record('encode', started, len(payload), len(data), compression != 'none')
+        return data
+
+    def decode(self, data: Any) -> Any:
+        """
+        فك ترميز قيمة مخزنة
+
+        Args:
+            data: البايتات المخزنة (أو نص JSON قديم)
+
+        Returns:
+            Any: القيمة الأصلية
+        """
+        started = time.perf_counter()
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        elif type(data) is not bytes:
+            # orjson لا يقبل الأنواع المشتقة من bytes (مثل EncodedValue)
+            data = bytes(data)
+
+        if not data or data[0] != HEADER_MAGIC:
+            # قيمة قديمة (JSON نصي) أو عدد صحيح
+            value = _json_loads(data)
+        else:
+            serializer_tag, compression_tag = data[1], data[2]
+            payload = self._decompress(compression_tag, data[3:])
+            if serializer_tag == SERIALIZER_TAGS['msgpack']:
+                if not MSGPACK_AVAILABLE:
+                    raise RuntimeError("قيمة مرمّزة بـ msgpack لكن msgpack غير مثبت")
+                value = msgpack.unpackb(payload, raw=False, strict_map_key=False)
+            else:
+                value = _json_loads(payload)
+
+        self._record('decode', started)
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        الحصول على إحصائيات الترميز
+
+        Returns:
+            Dict[str, Any]: الصيغة وعدد العمليات ومتوسط زمنها ونسبة الضغط
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            'serializer': ('orjson' if self.serializer == 'json' and ORJSON_AVAILABLE
+                           else self.serializer),
+            'compression': self.compression,
+            'threshold': self.threshold,
+            'encodes': stats['encodes'],
+            'decodes': stats['decodes'],
+            'compressed': stats['compressed'],
+            'avg_encode_us': round(stats['encode_seconds'] / stats['encodes'] * 1e6, 2)
+            if stats['encodes'] else 0.0,
+            'avg_decode_us': round(stats['decode_seconds'] / stats['decodes'] * 1e6, 2)
+            if stats['decodes'] else 0.0,
+            'compression_ratio': round(stats['stored_bytes'] / stats['raw_bytes'], 3)
+            if stats['raw_bytes'] else 1.0
+        }
@@ -0,0 +1,336 @@
+"""
+التخزين المحلي المحدود (Bounded Local Cache) - بديل Redis داخل العامل
+
+هذا الملف يحتوي على مخزن محلي محدود بعدد العناصر وبالحجم بالبايت،
+يطرد الأقل استخداماً مؤخراً (LRU) عند تجاوز أي حد، ويمسح العناصر
+المنتهية الصلاحية عبر عجلة انتهاء (خانات زمنية مرتبة في كومة) تُفحص
+بكلفة ثابتة تقريباً مع العمليات العادية بدلاً من مسح كامل للمخزن
+"""
+
+import heapq
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from src.core.config import settings
+
+# إعداد التسجيل
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(key: str, value: Any) -> int:
+    """
+    تقدير حجم العنصر بالبايت (المفتاح والقيمة)
+
+    Args:
+        key: المفتاح
+        value: القيمة المخزنة
+
+    Returns:
+        int: الحجم التقديري بالبايت
+    """
+    if isinstance(value, str):
+        value_size = len(value.encode('utf-8'))
+    elif isinstance(value, (bytes, bytearray)):
+        value_size = len(value)
+    else:
+        value_size = sys.getsizeof(value)
+    return len(key.encode('utf-8')) + value_size
+
+
+class _Entry:
+    """عنصر مخزن مع وقت انتهائه وحجمه"""
+
+    __slots__ = ('value', 'expire_time', 'size', 'slot')
+
+    def __init__(self, value: Any, expire_time: Optional[float], size: int,
+                 slot: Optional[int]):
+        self.value = value
+        self.expire_time = expire_time
+        self.size = size
+        self.slot = slot
+
+
+class BoundedLocalCache:
+    """
+    مخزن محلي محدود بعدد العناصر والحجم مع طرد LRU وعجلة انتهاء
+    """
+
+    def __init__(self, max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None,
+                 resolution: Optional[float] = None):
+        """
+        تهيئة المخزن
+
+        Args:
+            max_entries: أقصى عدد للعناصر
+            max_bytes: أقصى حجم كلي تقديري بالبايت
+            resolution: عرض خانة عجلة الانتهاء بالثواني
+        """
+        self.max_entries = max_entries or settings.LOCAL_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or settings.LOCAL_CACHE_MAX_BYTES
+        self.resolution = resolution or settings.LOCAL_CACHE_EXPIRY_RESOLUTION
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._slots: Dict[int, Set[str]] = {}  # خانة زمنية -> المفاتيح المنتهية فيها
+        self._slot_heap: List[int] = []  # الخانات غير الفارغة مرتبة زمنياً
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'rejected': 0
+        }
+
+    def _slot_of(self, expire_time: float) -> int:
+        """خانة عجلة الانتهاء لوقت معين"""
+        return int(expire_time // self.resolution)
+
+    def _remove(self, key: str) -> Optional[_Entry]:
+        """حذف عنصر وتحديث الحجم وخانة الانتهاء (تحت القفل)"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self._bytes -= entry.size
+        if entry.slot is not None:
+            keys = self._slots.get(entry.slot)
+            if keys is not None:
+                keys.discard(key)
+        return entry
+
+    def _advance_wheel(self, now: float) -> int:
+        """مسح كل الخانات التي انتهى وقتها (تحت القفل)"""
+        current_slot = self._slot_of(now)
+        expired = 0
+        while self._slot_heap and self._slot_heap[0] < current_slot:
+            slot = heapq.heappop(self._slot_heap)
+            for key in self._slots.pop(slot, ()):
+                self._remove_expired(key)
+                expired += 1
+        # الخانة الحالية قد تحتوي عناصر لم تنتهِ بعد
+        keys = self._slots.get(current_slot)
+        if keys:
+            for key in [key for key in keys
+                        if self._entries[key].expire_time <= now]:
+                self._remove_expired(key)
+                expired += 1
+        return expired
+
+    def _remove_expired(self, key: str):
+        """حذف عنصر منتهي الصلاحية وعدّه (تحت القفل)"""
+        if self._remove(key) is not None:
+            self._stats['expirations'] += 1
+
+    def _evict(self):
+        """طرد الأقل استخداماً مؤخراً حتى العودة تحت الحدود (تحت القفل)"""
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or self._bytes > self.max_bytes):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self._stats['evictions'] += 1
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """
+        تخزين قيمة
+
+        Args:
+            key: المفتاح
+            value: القيمة
+            ttl: مدة الصلاحية بالثواني (اختياري)
+
+        Returns:
+            bool: False إذا كانت القيمة أكبر من الحجم الأقصى للمخزن
+        """
+        size = estimate_size(key, value)
+        now = time.time()
+        with self._lock:
+            self._advance_wheel(now)
+            self._remove(key)
+
+            if size > self.max_bytes:
+                self._stats['rejected'] += 1
+                logger.warning(f"القيمة أكبر من حجم التخزين المحلي ولن تُخزن: {key}")
+                return False
+
+            expire_time = now + ttl if ttl else None
+            slot = None
+            if expire_time is not None:
+                slot = self._slot_of(expire_time)
+                keys = self._slots.get(slot)
+                if keys is None:
+                    keys = self._slots[slot] = set()
+                    heapq.heappush(self._slot_heap, slot)
+                keys.add(key)
+
+            self._entries[key] = _Entry(value, expire_time, size, slot)
+            self._bytes += size
+            self._evict()
+            return True
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> int:
+        """
+        تخزين عدة قيم تحت قفل واحد
+
+        Args:
+            items: المفتاح -> القيمة
+            ttl: مدة الصلاحية بالثواني لكل المفاتيح (اختياري)
+
+        Returns:
+            int: عدد القيم المخزنة
+        """
+        with self._lock:
+            return sum(1 for key, value in items.items() if self.set(key, value, ttl))
+
+    def _live_entry(self, key: str, now: float) -> Optional[_Entry]:
+        """العنصر إذا كان موجوداً ولم تنته صلاحيته (تحت القفل)"""
+        self._advance_wheel(now)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expire_time and now >= entry.expire_time:
+            self._remove_expired(key)
+            return None
+        return entry
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        استرجاع قيمة وتحديث ترتيب استخدامها
+
+        Args:
+            key: المفتاح
+            default: القيمة عند الغياب أو انتهاء الصلاحية
+
+        Returns:
+            Any: القيمة المخزنة أو default
+        """
+        with self._lock:
+            entry = self._live_entry(key, time.time())
+            if entry is None:
+                self._stats['misses'] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry.value
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        استرجاع عدة قيم تحت قفل واحد
+
+        Args:
+            keys: المفاتيح
+
+        Returns:
+            Dict[str, Any]: المفاتيح الموجودة فقط مع قيمها
+        """
+        now = time.time()
+        found = {}
+        with self._lock:
+            self._advance_wheel(now)
+            for key in keys:
+                entry = self._live_entry(key, now)
+                if entry is None:
+                    self._stats['misses'] += 1
+                    continue
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                found[key] = entry.value
+        return found
+
+    def contains(self, key: str) -> bool:
+        """
+        التحقق من وجود مفتاح صالح (بدون تغيير ترتيب الاستخدام)
+
+        Args:
+            key: المفتاح
+
+        Returns:
+            bool: True إذا كان موجوداً ولم تنته صلاحيته
+        """
+        with self._lock:
+            return self._live_entry(key, time.time()) is not None
+
+    def delete(self, key: str) -> bool:
+        """
+        حذف مفتاح
+
+        Args:
+            key: المفتاح
+
+        Returns:
+            bool: True إذا كان موجوداً
+        """
+        with self._lock:
+            return self._remove(key) is not None
+
+    def ttl(self, key: str) -> Optional[float]:
+        """
+        الوقت المتبقي لصلاحية المفتاح
+
+        Args:
+            key: المفتاح
+
+        Returns:
+            Optional[float]: الثواني المتبقية، أو None إذا لم يوجد
+                أو لم يكن له وقت انتهاء
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._live_entry(key, now)
+            if entry is None or entry.expire_time is None:
+                return None
+            return entry.expire_time - now
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        حذف عدة مفاتيح تحت قفل واحد
+
+        Args:
+            keys: المفاتيح
+
+        Returns:
+            int: عدد المفاتيح المحذوفة
+        """
+        with self._lock:
+            return sum(1 for key in keys if self._remove(key) is not None)
+
+    def clear_expired(self) -> int:
+        """
+        مسح العناصر المنتهية الصلاحية فوراً
+
+        Returns:
+            int: عدد العناصر الممسوحة
+        """
+        with self._lock:
+            return self._advance_wheel(time.time())
+
+    def clear(self):
+        """مسح كل العناصر"""
+        with self._lock:
+            self._entries.clear()
+            self._slots.clear()
+            self._slot_heap.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        الحصول على إحصائيات المخزن
+
+        Returns:
+            Dict[str, Any]: الحجم والحدود وعدد مرات الطرد والانتهاء
+        """
+        with self._lock:
+            return {
+                'policy': 'lru',
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                **self._stats
+            }
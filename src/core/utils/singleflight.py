@@ -0,0 +1,183 @@
+"""
+دمج الطلبات المتطابقة الجارية (Single-Flight)
+
+هذا الملف يحتوي على طبقة تضمن أن الطلبات المتطابقة المتزامنة تشترك
+في عملية حساب واحدة: داخل العامل عبر انتظار نفس النتيجة، وعبر العمال
+عبر قفل Redis في CacheManager مع نشر النتيجة للعمال المنتظرين
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from src.core.config import settings
+from src.core.utils.cache import cache_manager
+
+# إعداد التسجيل
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# قيمة تمييز غياب النتيجة في الذاكرة المؤقتة
+_MISSING = object()
+
+
+class _Call:
+    """عملية حساب جارية يشترك فيها عدة طلبات"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    تنفيذ دالة مرة واحدة لكل مفتاح بين الطلبات المتزامنة
+    """
+
+    def __init__(self, cache=None, lock_ttl: Optional[int] = None,
+                 wait_timeout: Optional[float] = None,
+                 result_ttl: Optional[int] = None,
+                 poll_interval: float = 0.05):
+        """
+        تهيئة طبقة الدمج
+
+        Args:
+            cache: مدير التخزين المؤقت (افتراضياً cache_manager)
+            lock_ttl: مدة صلاحية القفل الموزع بالثواني
+            wait_timeout: أقصى انتظار لنتيجة طلب مطابق جارٍ (في نفس العامل أو
+                          عامل آخر) قبل الحساب محلياً
+            result_ttl: مدة بقاء النتيجة المنشورة للعمال الآخرين
+            poll_interval: الفاصل بين محاولات قراءة النتيجة بالثواني
+        """
+        self.cache = cache or cache_manager
+        self.enabled = settings.SINGLE_FLIGHT_ENABLED
+        self.lock_ttl = lock_ttl or settings.SINGLE_FLIGHT_LOCK_TTL
+        self.wait_timeout = wait_timeout or settings.SINGLE_FLIGHT_WAIT_TIMEOUT
+        self.result_ttl = result_ttl or settings.SINGLE_FLIGHT_RESULT_TTL
+        self.poll_interval = poll_interval
+
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'executed': 0,
+            'shared_local': 0,
+            'shared_remote': 0
+        }
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None,
+           shareable: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        تنفيذ fn مرة واحدة لجميع الطلبات المتزامنة بنفس المفتاح
+
+        Args:
+            key: مفتاح الطلب بعد التطبيع
+            fn: الدالة المنتجة للنتيجة
+            timeout: الوقت المتبقي للمستدعي بالثواني؛ الانتظار لا يتجاوزه
+            shareable: يحدد ما إذا كانت النتيجة تُنشر للعمال الآخرين
+                       (افتراضياً كل النتائج)
+
+        Returns:
+            Any: النتيجة المشتركة
+        """
+        if not self.enabled:
+            return fn()
+
+        wait_timeout = (self.wait_timeout if timeout is None
+                        else min(self.wait_timeout, timeout))
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            # طلب مطابق جارٍ في نفس العامل
+            if not call.event.wait(wait_timeout):
+                # الطلب الجاري معلق: الحساب محلياً بدل حجز الخيط إلى الأبد
+                logger.warning(f"انتهت مهلة انتظار طلب مطابق جارٍ للمفتاح {key[:16]}")
+                self._stats['executed'] += 1
+                return fn()
+            self._stats['shared_local'] += 1
+            if call.error:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._do_across_workers(key, fn, wait_timeout, shareable)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def _do_across_workers(self, key: str, fn: Callable[[], Any], wait_timeout: float,
+                           shareable: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        التنسيق بين العمال عبر قفل موزع
+
+        العامل الذي يحصل على القفل يحسب النتيجة وينشرها؛ البقية ينتظرون
+        النتيجة المنشورة حتى يتحرر القفل أو تنتهي مهلة الانتظار. النتيجة
+        المنشورة تخص الطلبات المتزامنة فقط وليست ذاكرة مؤقتة للطلبات اللاحقة
+        """
+        if not self.cache.use_redis:
+            self._stats['executed'] += 1
+            return fn()
+
+        lock_name = f"singleflight:lock:{key}"
+        result_key = f"singleflight:result:{key}"
+        deadline = time.monotonic() + wait_timeout
+        waited = False
+
+        while True:
+            token = self.cache.acquire_lock(lock_name, self.lock_ttl)
+            if token:
+                try:
+                    if waited:
+                        # انتظرنا عاملاً آخر وربما نشر نتيجته قبل تحرير القفل مباشرة
+                        result = self.cache.get(result_key, _MISSING)
+                        if result is not _MISSING:
+                            self._stats['shared_remote'] += 1
+                            return result
+                    else:
+                        # نتيجة طلب سابق غير متزامن مع هذا الطلب لا تُستخدم
+                        self.cache.delete(result_key)
+                    self._stats['executed'] += 1
+                    result = fn()
+                    if shareable is None or shareable(result):
+                        self.cache.set(result_key, result, self.result_ttl)
+                    return result
+                finally:
+                    self.cache.release_lock(lock_name, token)
+
+            waited = True
+
+            # عامل آخر يحسب نفس الطلب
+            result = self.cache.get(result_key, _MISSING)
+            if result is not _MISSING:
+                self._stats['shared_remote'] += 1
+                return result
+
+            if time.monotonic() >= deadline:
+                logger.warning(f"انتهت مهلة انتظار نتيجة عامل آخر للمفتاح {key[:16]}")
+                self._stats['executed'] += 1
+                return fn()
+
+            time.sleep(self.poll_interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        الحصول على إحصائيات الدمج
+
+        Returns:
+            Dict[str, Any]: الإحصائيات
+        """
+        with self._lock:
+            in_flight = len(self._calls)
+        return {**self._stats, 'in_flight': in_flight}
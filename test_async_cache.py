@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+اختبار التخزين المؤقت غير المتزامن - عمليات redis.asyncio والديكورator
+"""
+
+import sys
+import os
+import asyncio
+import json
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.utils import cache as cache_module
+from src.core.utils.cache import AsyncCacheManager, CacheManager, cached
+from src.core.utils.local_cache import BoundedLocalCache
+
+
+class FakeAsyncRedis:
+    """عميل redis.asyncio وهمي يسجل رحلات الشبكة"""
+
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+        self.published = []
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(key) for key in keys]
+
+    def pttl(self, key):
+        return -1 if key in self.data else -2
+
+    def pipeline(self, transaction=True):
+        return FakeAsyncPipeline(self)
+
+
+class FakeAsyncPipeline:
+    """pipeline وهمي ينفذ أوامره في رحلة واحدة"""
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.commands = []
+
+    def set(self, key, value, ex=None):
+        self.commands.append(
+            lambda: self.redis_client.data.__setitem__(key, value) or True
+        )
+        return self
+
+    def delete(self, key):
+        self.commands.append(lambda: 1 if self.redis_client.data.pop(key, None) else 0)
+        return self
+
+    def mget(self, keys):
+        self.commands.append(
+            lambda: [self.redis_client.data.get(key) for key in keys]
+        )
+        return self
+
+    def pttl(self, key):
+        self.commands.append(lambda: self.redis_client.pttl(key))
+        return self
+
+    def publish(self, channel, message):
+        self.commands.append(
+            lambda: self.redis_client.published.append(json.loads(message))
+        )
+        return self
+
+    async def execute(self):
+        self.redis_client.round_trips += 1
+        return [command() for command in self.commands]
+
+
+def make_local_manager():
+    """مدير متزامن بتخزين محلي فقط"""
+    manager = CacheManager()
+    manager.redis_client = None
+    manager.use_redis = False
+    manager.l1 = None
+    return manager
+
+
+def make_redis_manager():
+    """مدير غير متزامن بـ Redis وهمي وطبقة أولى مشتركة مع المدير المتزامن"""
+    sync_manager = CacheManager()
+    sync_manager.use_redis = True
+    sync_manager.l1 = BoundedLocalCache(max_entries=100, max_bytes=10000)
+    redis_client = FakeAsyncRedis()
+    return AsyncCacheManager(sync_manager, redis_client=redis_client), redis_client
+
+
+def test_mget_uses_one_round_trip_and_fills_l1():
+    """اختبار جلب عدة مفاتيح في رحلة واحدة ثم من الطبقة الأولى"""
+    manager, redis_client = make_redis_manager()
+    redis_client.data.update({"a": b"1", "b": json.dumps({"x": 2}).encode("utf-8")})
+
+    async def scenario():
+        assert await manager.mget(["a", "b", "c"]) == [1, {"x": 2}, None]
+        assert await manager.get("b") == {"x": 2}
+
+    asyncio.run(scenario())
+    assert redis_client.round_trips == 1
+
+
+def test_mset_publishes_invalidation_in_same_pipeline():
+    """اختبار التخزين ورسالة الإبطال في رحلة واحدة"""
+    manager, redis_client = make_redis_manager()
+
+    async def scenario():
+        assert await manager.mset({"a": [1], "b": "two"}, ttl=60)
+        assert await manager.delete("a") is True
+
+    asyncio.run(scenario())
+    assert redis_client.round_trips == 2
+    assert redis_client.published[0]["keys"] == ["a", "b"]
+    assert manager.sync_manager.l1.get("a") is None
+    assert manager.sync_manager.l1.get("b") == "two"
+
+
+def test_local_fallback_shared_with_sync_manager():
+    """اختبار مشاركة التخزين المحلي بين الواجهتين عند غياب Redis"""
+    sync_manager = make_local_manager()
+    manager = AsyncCacheManager(sync_manager)
+
+    async def scenario():
+        await manager.set("k", {"v": 1})
+        assert sync_manager.get("k") == {"v": 1}
+        assert await manager.mget(["k", "missing"], default=0) == [{"v": 1}, 0]
+
+    asyncio.run(scenario())
+
+
+def test_cached_decorator_awaits_async_functions():
+    """اختبار أن الديكورator يخزن نتائج الدوال غير المتزامنة"""
+    calls = []
+    original = cache_module.async_cache_manager
+    cache_module.async_cache_manager = AsyncCacheManager(make_local_manager())
+
+    @cached(ttl=60, key_prefix="test")
+    async def lookup(item_id):
+        calls.append(item_id)
+        return {"id": item_id}
+
+    async def scenario():
+        assert await lookup(7) == {"id": 7}
+        assert await lookup(7) == {"id": 7}
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        cache_module.async_cache_manager = original
+    assert calls == [7]
+
+
+if __name__ == "__main__":
+    print("🧪 بدء اختبار التخزين المؤقت غير المتزامن")
+    test_mget_uses_one_round_trip_and_fills_l1()
+    test_mset_publishes_invalidation_in_same_pipeline()
+    test_local_fallback_shared_with_sync_manager()
+    test_cached_decorator_awaits_async_functions()
+    print("🎉 جميع الاختبارات اكتملت بنجاح!")
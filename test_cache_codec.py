@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+اختبار ترميز قيم التخزين المؤقت - التسلسل والضغط والتوافق مع القيم القديمة
+"""
+
+import sys
+import os
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.utils.cache import CacheManager
+from src.core.utils.cache_codec import (
+    LZ4_AVAILABLE, ZSTD_AVAILABLE, CacheCodec, EncodedValue
+)
+from src.core.utils.local_cache import BoundedLocalCache
+
+
+def test_round_trip_and_legacy_values():
+    """اختبار الترميز وفكه وقراءة قيم JSON النصية القديمة"""
+    codec = CacheCodec(serializer="orjson", compression="none")
+    value = {"name": "مرحبا", "items": [1, 2.5, None, True], "nested": {"k": "v"}}
+
+    encoded = codec.encode(value)
+    assert isinstance(encoded, bytes) and encoded[0] == 0
+    assert codec.decode(encoded) == value
+    assert codec.decode('{"old": "json"}') == {"old": "json"}
+
+
+def test_integers_stay_incrementable():
+    """اختبار ترميز الأعداد الصحيحة نصاً عشرياً يفهمه INCRBY"""
+    codec = CacheCodec(compression="none")
+    assert codec.encode(42) == b"42"
+    assert codec.decode(b"42") == 42
+    assert codec.decode(codec.encode(True)) is True
+
+
+def test_large_values_compressed_when_available():
+    """اختبار ضغط القيم الكبيرة فقط (أو تعطيله بصمت عند غياب المكتبة)"""
+    codec = CacheCodec(compression="auto", threshold=100)
+    small, large = {"v": "x"}, {"v": "abc " * 1000}
+
+    assert codec.decode(codec.encode(small)) == small
+    encoded = codec.encode(large)
+    assert codec.decode(encoded) == large
+
+    if ZSTD_AVAILABLE or LZ4_AVAILABLE:
+        assert len(encoded) < len("abc " * 1000)
+        assert codec.get_stats()["compressed"] == 1
+    else:
+        assert codec.compression == "none"
+        assert CacheCodec(compression="zstd").compression == "none"
+
+
+def test_local_tier_stores_native_immutables_only():
+    """اختبار تخزين القيم البسيطة كما هي والقوائم والقواميس مرمّزة"""
+    manager = CacheManager()
+    manager.redis_client = None
+    manager.local_cache = BoundedLocalCache(max_entries=100, max_bytes=100000)
+
+    manager.set("text", "hello")
+    manager.set("profile", {"topics": ["python"]})
+    manager.set("nothing", None)
+
+    assert manager.local_cache.get("text") == "hello"
+    assert isinstance(manager.local_cache.get("profile"), EncodedValue)
+
+    # تعديل النسخة المسترجعة لا يغير النسخة المخزنة
+    profile = manager.get("profile")
+    profile["topics"].append("java")
+    assert manager.get("profile") == {"topics": ["python"]}
+
+    # None قيمة مخزنة وليست غياباً للمفتاح
+    assert manager.get("nothing", "default") is None
+    assert manager.get("missing", "default") == "default"
+
+    stats = manager.get_stats()["codec"]
+    assert stats["encodes"] >= 1 and stats["decodes"] >= 2
+    assert stats["avg_encode_us"] > 0
+
+
+if __name__ == "__main__":
+    print("🧪 بدء اختبار ترميز قيم التخزين المؤقت")
+    test_round_trip_and_legacy_values()
+    test_integers_stay_incrementable()
+    test_large_values_compressed_when_available()
+    test_local_tier_stores_native_immutables_only()
+    print("🎉 جميع الاختبارات اكتملت بنجاح!")
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+اختبار الطبقة الأولى للتخزين المؤقت - القراءة من L1 والإبطال بين العمال
+"""
+
+import sys
+import os
+import json
+import time
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.utils.cache import CacheManager
+from src.core.utils.local_cache import BoundedLocalCache
+
+
+class FakeRedis:
+    """Redis وهمي مشترك بين العمال يسجل القراءات والرسائل المنشورة"""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.reads = 0
+        self.subscribers = []
+
+    def _expire(self, key):
+        if key in self.expires and self.expires[key] <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key)
+
+    def get(self, key):
+        self.reads += 1
+        self._expire(key)
+        return self.data.get(key)
+
+    def mget(self, keys):
+        self.reads += 1
+        for key in keys:
+            self._expire(key)
+        return [self.data.get(key) for key in keys]
+
+    def pttl(self, key):
+        self._expire(key)
+        if key not in self.data:
+            return -2
+        if key not in self.expires:
+            return -1
+        return int((self.expires[key] - time.monotonic()) * 1000)
+
+    def mset(self, mapping):
+        self.data.update(mapping)
+        for key in mapping:
+            self.expires.pop(key, None)
+        return True
+
+    def set(self, key, value):
+        self.data[key] = value
+        self.expires.pop(key, None)
+        return True
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+        self.expires[key] = time.monotonic() + ttl
+        return True
+
+    def delete(self, *keys):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    def incrby(self, key, amount):
+        self.data[key] = str(int(self.data.get(key, 0)) + amount)
+        return int(self.data[key])
+
+    def exists(self, key):
+        return 1 if key in self.data else 0
+
+    def publish(self, channel, message):
+        for subscriber in self.subscribers:
+            subscriber({'data': message})
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """pipeline وهمي ينفذ الأوامر عند execute"""
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.commands.append((name, args))
+        return queue
+
+    def execute(self):
+        self.redis_client.round_trips = getattr(self.redis_client, 'round_trips', 0) + 1
+        return [getattr(self.redis_client, name)(*args) for name, args in self.commands]
+
+
+def make_worker(redis_client):
+    """عامل بطبقة أولى متصل بـ Redis الوهمي"""
+    manager = CacheManager()
+    manager.redis_client = redis_client
+    manager.use_redis = True
+    manager.l1 = BoundedLocalCache(max_entries=100, max_bytes=10000)
+    redis_client.subscribers.append(manager._on_invalidation)
+    return manager
+
+
+def test_hot_reads_served_from_l1():
+    """اختبار أن القراءات المتكررة لا تصل إلى Redis"""
+    redis_client = FakeRedis()
+    worker = make_worker(redis_client)
+    redis_client.data["catalog"] = json.dumps({"items": [1, 2]}).encode("utf-8")
+
+    for _ in range(5):
+        assert worker.get("catalog") == {"items": [1, 2]}
+    assert redis_client.reads == 1
+
+
+def test_l1_copy_expires_with_redis_key():
+    """اختبار أن نسخة L1 لا تعيش بعد انتهاء المفتاح في Redis"""
+    redis_client = FakeRedis()
+    worker = make_worker(redis_client)
+    redis_client.setex("otp", 0.2, b'"1234"')
+
+    assert worker.get("otp") == "1234"
+    assert worker.get("otp") == "1234"
+    assert redis_client.reads == 1
+
+    time.sleep(0.3)
+    assert worker.get("otp") is None
+
+    # المفتاح الذي انتهى بين MGET و PTTL لا يُنسخ إلى L1
+    assert worker._store_fetched(["gone"], [[b'"x"'], -2]) == {"gone": "x"}
+    assert worker.l1.get("gone") is None
+
+
+def test_set_invalidates_other_workers():
+    """اختبار أن set في عامل يُبطل نسخة L1 في العمال الآخرين فقط"""
+    redis_client = FakeRedis()
+    first, second = make_worker(redis_client), make_worker(redis_client)
+
+    first.set("profile", {"v": 1}, ttl=60)
+    assert second.get("profile") == {"v": 1}
+
+    first.set("profile", {"v": 2}, ttl=60)
+    assert second.get("profile") == {"v": 2}
+    assert first.get("profile") == {"v": 2}
+    assert second._l1_stats['invalidations_received'] == 2
+    assert first._l1_stats['invalidations_received'] == 0
+
+
+def test_delete_and_increment_invalidate():
+    """اختبار إبطال النسخ المحلية عند الحذف والزيادة"""
+    redis_client = FakeRedis()
+    first, second = make_worker(redis_client), make_worker(redis_client)
+
+    first.set("counter", 1)
+    assert second.get("counter") == 1
+    assert first.increment("counter", 2) == 3
+    assert second.get("counter") == 3
+
+    assert first.delete("counter") is True
+    assert second.get("counter") is None
+
+
+def test_batch_operations_use_one_round_trip():
+    """اختبار get_many و set_many و delete_many برحلة واحدة لكل عملية"""
+    redis_client = FakeRedis()
+    first, second = make_worker(redis_client), make_worker(redis_client)
+
+    assert first.set_many({"p:1": {"n": 1}, "p:2": {"n": 2}}, ttl=60)
+    assert redis_client.round_trips == 1
+
+    assert second.get_many(["p:1", "p:2", "p:3"]) == {"p:1": {"n": 1}, "p:2": {"n": 2}}
+    assert second.get_many(["p:1", "p:2"]) == {"p:1": {"n": 1}, "p:2": {"n": 2}}
+    assert redis_client.reads == 1
+
+    assert first.delete_many(["p:1", "p:3"]) == 1
+    assert second.get_many(["p:1", "p:2"]) == {"p:2": {"n": 2}}
+
+
+def test_pipeline_executes_on_exit():
+    """اختبار تنفيذ عمليات pipeline معاً عند الخروج وإبطالها في العمال الآخرين"""
+    redis_client = FakeRedis()
+    first, second = make_worker(redis_client), make_worker(redis_client)
+    first.set("old", 1)
+    assert second.get("old") == 1
+
+    with first.pipeline() as pipe:
+        pipe.set("new", "value", ttl=60).delete("old").increment("hits", 2)
+    assert pipe.results == [True, True, 2]
+    assert second.get("old") is None
+    assert second.get("new") == "value"
+
+    try:
+        with first.pipeline() as pipe:
+            pipe.set("never", 1)
+            raise RuntimeError("abort")
+    except RuntimeError:
+        pass
+    assert first.get("never") is None
+
+
+if __name__ == "__main__":
+    print("🧪 بدء اختبار الطبقة الأولى للتخزين المؤقت")
+    test_hot_reads_served_from_l1()
+    test_l1_copy_expires_with_redis_key()
+    test_set_invalidates_other_workers()
+    test_delete_and_increment_invalidate()
+    test_batch_operations_use_one_round_trip()
+    test_pipeline_executes_on_exit()
+    print("🎉 جميع الاختبارات اكتملت بنجاح!")
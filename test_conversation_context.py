@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+اختبار سياق المحادثة - ميزانية الرموز وتخزين الأدوار المرمّزة
+"""
+
+import sys
+import os
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.nlp.conversation_context import ConversationContextBuilder
+from src.core.utils.cache import CacheManager
+
+
+class CountingTokenizer:
+    """محلل وهمي بالكلمات يعد استدعاءات الترميز"""
+
+    name_or_path = "fake-tokenizer"
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, text, add_special_tokens=False):
+        self.encoded.append(text)
+        return text.split()
+
+    def decode(self, ids, skip_special_tokens=True):
+        return " ".join(ids)
+
+
+def make_builder(turns, **kwargs):
+    """باني بذاكرة محلية ومحمّل وهمي يسجل قراءات قاعدة البيانات"""
+    cache = CacheManager()
+    cache.redis_client = None
+    tokenizer = CountingTokenizer()
+    loads = []
+
+    def loader(conversation_id, limit):
+        loads.append(conversation_id)
+        return turns[-limit:]
+
+    builder = ConversationContextBuilder(lambda: tokenizer, loader=loader,
+                                         cache=cache, ttl=60, **kwargs)
+    return builder, tokenizer, loads
+
+
+def test_history_loaded_once_and_only_new_turns_tokenized():
+    """اختبار قراءة قاعدة البيانات مرة واحدة وترميز الرسالة الجديدة فقط"""
+    builder, tokenizer, loads = make_builder(
+        [("user", "what is python"), ("assistant", "a language")], max_tokens=100
+    )
+
+    assert builder.build("c1") == "User: what is python\nAssistant: a language"
+    assert len(tokenizer.encoded) == 2
+
+    builder.append_turn("c1", "user", "and java")
+    assert builder.build("c1").endswith("User: and java")
+    assert loads == ["c1"]
+    assert tokenizer.encoded[2:] == ["User: and java"]
+
+
+def test_oldest_turns_truncated_first():
+    """اختبار حذف الأدوار الأقدم أولاً ضمن الميزانية"""
+    builder, _, _ = make_builder(
+        [("user", "one two three four"), ("assistant", "five six"), ("user", "seven")],
+        max_tokens=6
+    )
+
+    # الأحدث كاملاً (User: seven + Assistant: five six = 5 رموز) ثم نهاية الأقدم
+    assert builder.build("c1") == "four\nAssistant: five six\nUser: seven"
+
+
+def test_older_turns_summarized():
+    """اختبار تلخيص ما لا يتسع بدلاً من حذفه"""
+    summarized = []
+
+    def summarizer(text):
+        summarized.append(text)
+        return "greeting"
+
+    builder, _, _ = make_builder(
+        [("user", "hello there friend"), ("assistant", "hi"), ("user", "bye")],
+        max_tokens=6, strategy="summarize", summarizer=summarizer
+    )
+
+    assert builder.build("c1") == "Summary: greeting\nAssistant: hi\nUser: bye"
+    assert summarized == ["User: hello there friend"]
+
+
+def test_new_conversation_skips_database():
+    """اختبار عدم قراءة قاعدة البيانات لمحادثة جديدة"""
+    builder, _, loads = make_builder([("user", "stale")])
+    builder.start("new")
+    assert builder.build("new") is None
+
+    builder.append_turn("new", "user", "hello")
+    assert builder.build("new") == "User: hello"
+    assert loads == []
+
+
+if __name__ == "__main__":
+    print("🧪 بدء اختبار سياق المحادثة")
+    test_history_loaded_once_and_only_new_turns_tokenized()
+    test_oldest_turns_truncated_first()
+    test_older_turns_summarized()
+    test_new_conversation_skips_database()
+    print("🎉 جميع الاختبارات اكتملت بنجاح!")
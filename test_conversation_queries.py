@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+اختبار استعلامات المحادثات - عدد الرسائل والعدد الإجمالي والتصفح بالمؤشر
+"""
+
+import sys
+import os
+import importlib
+import tempfile
+
+import pytest
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.config import settings
+
+
+def use_sqlite_database(directory, patch=setattr):
+    """
+    توجيه الإعدادات وجلسات قاعدة البيانات إلى SQLite مؤقتة
+
+    Args:
+        directory: مجلد ملف قاعدة البيانات
+        patch: دالة الاستبدال (monkeypatch.setattr لإرجاع القيم بعد الاختبار)
+
+    Returns:
+        module: وحدة conversation_service متصلة بقاعدة الاختبار
+    """
+    database_path = os.path.join(directory, 'test.db')
+    patch(settings, "DATABASE_URL", f"sqlite:///{database_path}")
+    # استيراد الجلسة بعد تعديل الإعدادات (تنشئ المحرك عند أول استيراد)
+    session = importlib.import_module("src.core.database.session")
+    engine = session.create_engine_from_settings()
+    patch(session, "engine", engine)
+    patch(session, "ScopedSession", scoped_session(
+        sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    ))
+    session.init_db()
+    return importlib.import_module("src.core.services.conversation_service")
+
+
+@pytest.fixture
+def services(tmp_path, monkeypatch):
+    """خدمات المحادثات على قاعدة SQLite مؤقتة لكل اختبار"""
+    return use_sqlite_database(str(tmp_path), monkeypatch.setattr)
+
+
+def _create_conversations(services, user_id, message_counts):
+    """إنشاء محادثات بعدد الرسائل المحدد لكل منها"""
+    conversations = []
+    for count in message_counts:
+        conversation = services.ConversationService.create_conversation(
+            user_id=user_id
+        )
+        for i in range(count):
+            services.MessageService.create_message(
+                conversation.id, "user", f"رسالة {i}"
+            )
+        conversations.append(conversation)
+    return conversations
+
+
+def test_counts_are_not_capped(services):
+    """اختبار حساب عدد الرسائل بدون حد الـ 50 رسالة"""
+    user_id = "counts-user"
+    created = _create_conversations(services, user_id, [0, 3, 60])
+
+    rows = services.ConversationService.get_user_conversations_with_counts(
+        user_id, limit=10
+    )
+    counts = {conversation.id: count for conversation, count in rows}
+
+    assert counts == {created[0].id: 0, created[1].id: 3, created[2].id: 60}
+    assert services.MessageService.count_conversation_messages(created[2].id) == 60
+
+
+def test_total_count_ignores_page_size(services):
+    """اختبار العدد الإجمالي الحقيقي للمحادثات"""
+    user_id = "total-user"
+    _create_conversations(services, user_id, [1] * 5)
+
+    page = services.ConversationService.get_user_conversations_with_counts(
+        user_id, limit=2
+    )
+    assert len(page) == 2
+    assert services.ConversationService.count_user_conversations(user_id) == 5
+
+
+def test_conversation_cursor_walks_every_page_once(services):
+    """اختبار التصفح بالمؤشر عبر جميع المحادثات دون تكرار أو فقدان"""
+    user_id = "cursor-user"
+    created = _create_conversations(services, user_id, [0] * 7)
+
+    seen, cursor = [], None
+    while True:
+        page = services.ConversationService.get_user_conversations(
+            user_id, limit=3, cursor=cursor
+        )
+        seen.extend(conversation.id for conversation in page)
+        if len(page) < 3:
+            break
+        cursor = services.encode_cursor(page[-1].updated_at, page[-1].id)
+
+    assert sorted(seen) == sorted(conversation.id for conversation in created)
+    assert len(seen) == len(set(seen))
+
+
+def test_message_cursor_is_ascending(services):
+    """اختبار التصفح بالمؤشر في رسائل المحادثة بترتيب تصاعدي"""
+    conversation = _create_conversations(services, "messages-user", [5])[0]
+
+    first_page = services.MessageService.get_conversation_messages(
+        conversation.id, limit=2
+    )
+    cursor = services.encode_cursor(first_page[-1].created_at, first_page[-1].id)
+    second_page = services.MessageService.get_conversation_messages(
+        conversation.id, limit=2, cursor=cursor
+    )
+
+    assert [m.content for m in first_page + second_page] == [
+        f"رسالة {i}" for i in range(4)
+    ]
+
+
+def test_invalid_cursor_is_rejected(services):
+    """اختبار رفض المؤشر غير الصالح"""
+    try:
+        services.decode_cursor("not-a-cursor")
+        raise AssertionError("كان يجب رفض المؤشر")
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    print("🧪 بدء اختبار استعلامات المحادثات")
+    services = use_sqlite_database(tempfile.mkdtemp())
+    test_counts_are_not_capped(services)
+    test_total_count_ignores_page_size(services)
+    test_conversation_cursor_walks_every_page_once(services)
+    test_message_cursor_is_ascending(services)
+    test_invalid_cursor_is_rejected(services)
+    print("🎉 جميع الاختبارات اكتملت بنجاح!")
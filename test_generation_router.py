@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+اختبار موجّه التوليد - المهلة الكلية والانتقال بين المستويات
+"""
+
+import sys
+import os
+import time
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.nlp.generation_router import (
+    Deadline, GenerationRouter, PartialResponse, parse_tier_budgets
+)
+
+
+def test_parse_tier_budgets():
+    """اختبار قراءة الشرائح الزمنية من الإعدادات"""
+    assert parse_tier_budgets("openai:10, t5:2.5,") == {"openai": 10.0, "t5": 2.5}
+
+
+def test_failed_tier_falls_through_within_slice():
+    """اختبار الانتقال إلى المستوى التالي وتمرير شريحة لا تتجاوز المهلة"""
+    router = GenerationRouter({"openai": 10, "t5": 3}, deadline_seconds=5)
+    slices = []
+
+    def openai(time_slice):
+        slices.append(time_slice)
+        raise TimeoutError("slow")
+
+    def t5(time_slice):
+        slices.append(time_slice)
+        return "hello"
+
+    response, tier = router.generate([("openai", openai), ("t5", t5)])
+    assert (response, tier) == ("hello", "t5")
+    assert slices[0] <= 5 and slices[1] <= 3
+    assert router.get_stats()["openai"]["failed"] == 1
+    assert router.get_stats()["t5"]["served"] == 1
+
+
+def test_exhausted_deadline_skips_tiers():
+    """اختبار تخطي المستويات عند نفاد المهلة الكلية"""
+    router = GenerationRouter({"openai": 10, "t5": 10}, deadline_seconds=5)
+    deadline = Deadline(0.6)
+
+    def openai(time_slice):
+        time.sleep(0.2)
+        raise TimeoutError("slow")
+
+    def t5(time_slice):
+        assert False, "يجب ألا يُستدعى"
+
+    assert router.generate([("openai", openai), ("t5", t5)], deadline) == (None, None)
+    assert router.get_stats()["t5"]["skipped"] == 1
+
+
+def test_stream_falls_through_before_first_token():
+    """اختبار البث من المستوى التالي وتسجيل المستوى في البيانات"""
+    router = GenerationRouter({"openai": 10, "gpt2": 10}, deadline_seconds=5)
+    metadata = {}
+
+    def openai(time_slice):
+        raise ConnectionError("down")
+        yield
+
+    def gpt2(time_slice):
+        yield "a"
+        yield "b"
+
+    tokens = list(
+        router.stream([("openai", openai), ("gpt2", gpt2)], metadata=metadata)
+    )
+    assert tokens == ["a", "b"]
+    assert metadata == {"tier": "gpt2"}
+
+
+def test_partial_response_keeps_its_marker():
+    """اختبار أن الرد المقطوع عند max_time يصل إلى المستدعي مميزاً (فلا يُخزن)"""
+    router = GenerationRouter({"t5": 3}, deadline_seconds=5)
+
+    response, tier = router.generate(
+        [("t5", lambda time_slice: PartialResponse("half an"))]
+    )
+    assert (response, tier) == ("half an", "t5")
+    assert isinstance(response, PartialResponse)
+
+
+if __name__ == "__main__":
+    print("🧪 بدء اختبار موجّه التوليد")
+    test_parse_tier_budgets()
+    test_failed_tier_falls_through_within_slice()
+    test_exhausted_deadline_skips_tiers()
+    test_stream_falls_through_before_first_token()
+    test_partial_response_keeps_its_marker()
+    print("🎉 جميع الاختبارات اكتملت بنجاح!")
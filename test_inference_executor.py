@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+اختبار منفذ الاستدلال - التأكد من الطابور المحدود والمهلة
+"""
+
+import sys
+import os
+import asyncio
+import gc
+import time
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.nlp.inference_executor import (
+    InferenceExecutor, InferenceQueueFullError, InferenceTimeoutError
+)
+
+
+def test_run_returns_result():
+    """اختبار تشغيل دالة متزامنة وإرجاع نتيجتها"""
+    executor = InferenceExecutor(max_workers=1, max_queue_size=1, timeout=5)
+
+    result = asyncio.run(executor.run(lambda a, b: a + b, 2, b=3))
+    assert result == 5
+
+    stats = executor.get_stats()
+    assert stats['submitted'] == 1
+    assert stats['pending'] == 0
+    executor.shutdown()
+
+
+def test_queue_full_is_rejected():
+    """اختبار رفض الطلبات عند امتلاء الطابور"""
+    executor = InferenceExecutor(
+        max_workers=1, max_queue_size=1, timeout=5, retry_after=7
+    )
+
+    async def scenario():
+        slow = [asyncio.create_task(executor.run(time.sleep, 0.3)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        try:
+            await executor.run(time.sleep, 0.3)
+            raise AssertionError("كان يجب رفض الطلب")
+        except InferenceQueueFullError as e:
+            assert e.retry_after == 7
+        await asyncio.gather(*slow)
+
+    asyncio.run(scenario())
+    assert executor.get_stats()['rejected'] == 1
+    executor.shutdown()
+
+
+def test_timeout_releases_slot_when_done():
+    """اختبار المهلة وتحرير المكان بعد انتهاء الخيط"""
+    executor = InferenceExecutor(max_workers=1, max_queue_size=0, timeout=0.05)
+
+    async def scenario():
+        try:
+            await executor.run(time.sleep, 0.2)
+            raise AssertionError("كان يجب أن تنتهي المهلة")
+        except InferenceTimeoutError:
+            pass
+        # الخيط ما زال يعمل، لذا المنفذ ممتلئ
+        assert executor.is_saturated()
+        await asyncio.sleep(0.3)
+        assert not executor.is_saturated()
+
+    asyncio.run(scenario())
+    assert executor.get_stats()['timed_out'] == 1
+    executor.shutdown()
+
+
+def test_stream_yields_items_in_order():
+    """اختبار بث عناصر مولد متزامن إلى حلقة الأحداث"""
+    executor = InferenceExecutor(max_workers=1, max_queue_size=0, timeout=5)
+
+    def tokens(count):
+        for i in range(count):
+            time.sleep(0.01)
+            yield f"t{i}"
+
+    async def scenario():
+        stream = executor.stream(tokens, 3)
+        # المكان محجوز قبل بدء الاستهلاك
+        try:
+            executor.stream(tokens, 1)
+            raise AssertionError("كان يجب رفض الطلب")
+        except InferenceQueueFullError:
+            pass
+        return [item async for item in stream]
+
+    assert asyncio.run(scenario()) == ["t0", "t1", "t2"]
+    executor.shutdown(wait=True)
+    assert executor.get_stats()['pending'] == 0
+
+
+def test_unconsumed_stream_releases_slot():
+    """اختبار تحرير المكان إذا أُغلق البث أو جُمع قبل استهلاكه"""
+    executor = InferenceExecutor(max_workers=1, max_queue_size=0, timeout=5)
+
+    async def scenario():
+        stream = executor.stream(lambda: iter(["t"]))
+        assert executor.is_saturated()
+        await stream.aclose()
+        assert not executor.is_saturated()
+
+        executor.stream(lambda: iter(["t"]))
+        gc.collect()
+        assert not executor.is_saturated()
+
+    asyncio.run(scenario())
+    assert executor.get_stats()['pending'] == 0
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    print("🧪 بدء اختبار منفذ الاستدلال")
+    test_run_returns_result()
+    test_queue_full_is_rejected()
+    test_timeout_releases_slot_when_done()
+    test_stream_yields_items_in_order()
+    test_unconsumed_stream_releases_slot()
+    print("🎉 جميع الاختبارات اكتملت بنجاح!")
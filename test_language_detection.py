@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+اختبار كشف اللغة المتدرج - نظام الكتابة أولاً ثم n-gram
+"""
+
+import sys
+import os
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.nlp.language_detection import LanguageDetector, detect_by_script
+
+
+SUPPORTED = ['ar', 'en', 'fr', 'es', 'de', 'it', 'ru']
+
+
+def test_script_resolves_non_latin_text():
+    """اختبار حسم العربية والروسية من نظام الكتابة"""
+    assert detect_by_script("مرحباً، كيف أتعلم البرمجة؟") == 'ar'
+    assert detect_by_script("Привет, как дела?") == 'ru'
+    # سؤال عربي يحتوي على أسماء لاتينية
+    assert detect_by_script("ما الفرق بين list و tuple في Python") == 'ar'
+    # النص اللاتيني يحتاج n-gram
+    assert detect_by_script("How do I learn Python?") is None
+    assert detect_by_script("12345 !!!") is None
+
+
+def test_ngram_only_for_latin_text():
+    """اختبار استدعاء n-gram للنصوص اللاتينية فقط"""
+    detector = LanguageDetector(SUPPORTED)
+
+    assert detector.detect("مرحباً، أنا مهتم بتعلم البرمجة") == 'ar'
+    assert detector.detect("Bonjour, je voudrais apprendre la programmation") == 'fr'
+
+    stats = detector.get_stats()
+    assert stats['script_hits'] == 1
+    assert stats['ngram_calls'] == 1
+
+
+def test_results_are_memoized():
+    """اختبار حفظ النتائج وحدود الذاكرة"""
+    detector = LanguageDetector(SUPPORTED, memo_size=2)
+
+    for _ in range(3):
+        assert detector.detect("I want to learn programming with Python") == 'en'
+    assert detector.get_stats()['memo_hits'] == 2
+    assert detector.get_stats()['ngram_calls'] == 1
+
+    detector.detect("مرحبا بك")
+    detector.detect("Привет мир")
+    assert detector.get_stats()['memo_size'] == 2
+
+
+if __name__ == "__main__":
+    print("🧪 بدء اختبار كشف اللغة المتدرج")
+    test_script_resolves_non_latin_text()
+    test_ngram_only_for_latin_text()
+    test_results_are_memoized()
+    print("🎉 جميع الاختبارات اكتملت بنجاح!")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+اختبار التخزين المحلي المحدود - الطرد وحدود الحجم وعجلة الانتهاء
+"""
+
+import sys
+import os
+import time
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.utils.cache import CacheManager
+from src.core.utils.local_cache import BoundedLocalCache
+
+
+def test_least_recently_used_evicted_first():
+    """اختبار طرد الأقل استخداماً مؤخراً عند تجاوز عدد العناصر"""
+    cache = BoundedLocalCache(max_entries=2, max_bytes=10000)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_byte_limit_enforced():
+    """اختبار حد الحجم بالبايت ورفض القيم الأكبر من المخزن"""
+    cache = BoundedLocalCache(max_entries=100, max_bytes=30)
+    cache.set("k1", "x" * 10)
+    cache.set("k2", "y" * 10)
+    cache.set("k3", "z" * 10)
+
+    stats = cache.get_stats()
+    assert stats["bytes"] <= 30
+    assert stats["entries"] == 2 and cache.get("k1") is None
+
+    assert cache.set("big", "w" * 100) is False
+    assert cache.get_stats()["rejected"] == 1
+
+
+def test_expiry_wheel_sweeps_without_access():
+    """اختبار مسح العناصر المنتهية مع العمليات الأخرى دون قراءتها"""
+    cache = BoundedLocalCache(max_entries=100, max_bytes=10000, resolution=0.05)
+    for index in range(10):
+        cache.set(f"short:{index}", "v", ttl=0.05)
+    cache.set("long", "v", ttl=60)
+
+    time.sleep(0.15)
+    cache.set("other", "v")
+    assert len(cache) == 2
+    assert cache.get_stats()["expirations"] == 10
+
+
+def test_reset_key_keeps_new_expiry():
+    """اختبار أن إعادة تخزين مفتاح لا تُبقي وقت انتهائه القديم"""
+    cache = BoundedLocalCache(max_entries=100, max_bytes=10000, resolution=0.05)
+    cache.set("k", "old", ttl=0.05)
+    cache.set("k", "new", ttl=60)
+    time.sleep(0.15)
+    assert cache.get("k") == "new"
+
+
+def test_cache_manager_uses_bounded_store():
+    """اختبار استخدام CacheManager للمخزن المحدود عند غياب Redis"""
+    manager = CacheManager()
+    manager.redis_client = None
+    manager.local_cache = BoundedLocalCache(max_entries=2, max_bytes=10000)
+
+    manager.set("a", {"n": 1}, ttl=60)
+    manager.set("b", [1, 2])
+    manager.set("c", "three")
+
+    assert manager.get("a") is None
+    assert manager.get("b") == [1, 2]
+    assert manager.exists("c") and manager.get_ttl("b") is None
+    assert manager.get_stats()["local_cache"]["evictions"] == 1
+
+
+def test_batch_operations_on_local_tier():
+    """اختبار العمليات المجمعة على التخزين المحلي عند غياب Redis"""
+    manager = CacheManager()
+    manager.redis_client = None
+    manager.local_cache = BoundedLocalCache(max_entries=100, max_bytes=10000)
+
+    assert manager.set_many({"a": 1, "b": [2]}, ttl=60)
+    assert manager.get_many(["a", "b", "c"]) == {"a": 1, "b": [2]}
+    assert manager.delete_many(["a", "c"]) == 1
+
+    with manager.pipeline() as pipe:
+        pipe.set("c", "three").increment("n", 5)
+    assert pipe.results == [True, 5]
+    assert manager.get_many(["b", "c", "n"]) == {"b": [2], "c": "three", "n": 5}
+
+
+if __name__ == "__main__":
+    print("🧪 بدء اختبار التخزين المحلي المحدود")
+    test_least_recently_used_evicted_first()
+    test_byte_limit_enforced()
+    test_expiry_wheel_sweeps_without_access()
+    test_reset_key_keeps_new_expiry()
+    test_cache_manager_uses_bounded_store()
+    test_batch_operations_on_local_tier()
+    print("🎉 جميع الاختبارات اكتملت بنجاح!")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+اختبار الترجمة المحلية - تحميل النماذج عبر ModelManager والدفعات
+"""
+
+import sys
+import os
+import tempfile
+import threading
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.models.model_manager import ModelManager
+from src.core.nlp.local_translation import LocalTranslator, parse_model_pairs
+
+
+class FakeLocalTranslator(LocalTranslator):
+    """محرك بنموذج وهمي يسجل أحجام الدفعات"""
+
+    def __init__(self, *args, **kwargs):
+        self.loaded_paths = []
+        self.batch_sizes = []
+        super().__init__(*args, **kwargs)
+        self.enabled = True
+
+    def _load_pair(self, pair):
+        self.loaded_paths.append(self._resolve_model_path(pair))
+        return pair
+
+    def _run_model(self, bundle, texts):
+        self.batch_sizes.append(len(texts))
+        return [f"{bundle[1]}:{text}" for text in texts]
+
+
+def test_parse_model_pairs():
+    """اختبار قراءة أزواج اللغات من الإعدادات"""
+    pairs = parse_model_pairs("ar-en:Helsinki-NLP/opus-mt-ar-en, en-ar:local/en-ar")
+    assert pairs == {
+        ('ar', 'en'): "Helsinki-NLP/opus-mt-ar-en",
+        ('en', 'ar'): "local/en-ar",
+    }
+
+
+def test_model_path_prefers_model_manager_copy():
+    """اختبار استخدام النسخة المحلية في مجلد النماذج قبل Hub"""
+    with tempfile.TemporaryDirectory() as directory:
+        manager = ModelManager(directory)
+        os.makedirs(os.path.join(directory, "translation-ar-en", "v1", "model"))
+
+        translator = FakeLocalTranslator(
+            model_manager=manager,
+            model_pairs={('ar', 'en'): "hub/ar-en", ('en', 'ar'): "hub/en-ar"}
+        )
+
+        assert translator.translate("مرحبا", "ar", "en") == "en:مرحبا"
+        assert translator.translate("hello", "en", "ar") == "ar:hello"
+        assert translator.translate("bonjour", "fr", "en") is None
+
+        assert translator.loaded_paths[0].endswith(
+            os.path.join("translation-ar-en", "v1", "model")
+        )
+        assert translator.loaded_paths[1] == "hub/en-ar"
+
+
+def test_concurrent_requests_share_a_batch():
+    """اختبار دمج طلبات الترجمة المتزامنة في تمريرة واحدة"""
+    with tempfile.TemporaryDirectory() as directory:
+        translator = FakeLocalTranslator(
+            model_manager=ModelManager(directory),
+            model_pairs={('ar', 'en'): "hub/ar-en"},
+            max_batch_size=8,
+            batch_window_ms=50
+        )
+        # تحميل النموذج مسبقاً حتى لا يؤثر على نافذة التجميع
+        translator.translate_batch(["تسخين"], "ar", "en")
+
+        results = [None] * 4
+
+        def run(index):
+            results[index] = translator.translate(f"نص {index}", "ar", "en")
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [f"en:نص {i}" for i in range(4)]
+        assert translator.batch_sizes[1:] == [4]
+
+
+if __name__ == "__main__":
+    print("🧪 بدء اختبار الترجمة المحلية")
+    test_parse_model_pairs()
+    test_model_path_prefers_model_manager_copy()
+    test_concurrent_requests_share_a_batch()
+    print("🎉 جميع الاختبارات اكتملت بنجاح!")
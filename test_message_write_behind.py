@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+اختبار الكتابة المؤجلة للرسائل - الحفظ الجماعي والاستعادة من spool
+"""
+
+import sys
+import os
+import json
+import importlib
+import tempfile
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.config import settings
+
+
+def use_sqlite_database(directory, patch=setattr):
+    """
+    توجيه الإعدادات وجلسات قاعدة البيانات إلى SQLite مؤقتة
+
+    Args:
+        directory: مجلد ملف قاعدة البيانات
+        patch: دالة الاستبدال (monkeypatch.setattr لإرجاع القيم بعد الاختبار)
+
+    Returns:
+        module: وحدة conversation_service متصلة بقاعدة الاختبار
+    """
+    database_path = os.path.join(directory, 'test.db')
+    patch(settings, "DATABASE_URL", f"sqlite:///{database_path}")
+    # استيراد الجلسة بعد تعديل الإعدادات (تنشئ المحرك عند أول استيراد)
+    session = importlib.import_module("src.core.database.session")
+    engine = session.create_engine_from_settings()
+    patch(session, "engine", engine)
+    patch(session, "ScopedSession", scoped_session(
+        sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    ))
+    session.init_db()
+    return importlib.import_module("src.core.services.conversation_service")
+
+
+@pytest.fixture
+def services(tmp_path, monkeypatch):
+    """خدمات المحادثات على قاعدة SQLite مؤقتة لكل اختبار"""
+    return use_sqlite_database(str(tmp_path), monkeypatch.setattr)
+
+
+def test_batch_is_flushed_and_spool_truncated(services, tmp_path):
+    """اختبار حفظ الرسائل في دفعة وتفريغ ملف spool بعدها"""
+    spool_path = os.path.join(tmp_path, "spool_flush.jsonl")
+    writer = services.MessageWriteBehindQueue(
+        spool_path=spool_path, batch_size=10, flush_interval=0.05
+    )
+    conversation = services.ConversationService.create_conversation(
+        user_id=None, title="write-behind"
+    )
+
+    first = writer.enqueue(conversation.id, "user", "سؤال", "ar", {"context": None})
+    second = writer.enqueue(conversation.id, "assistant", "جواب", "ar")
+    assert first['id'] != second['id']
+
+    assert writer.flush(timeout=5)
+    messages = services.MessageService.get_conversation_messages(conversation.id)
+    assert [m.id for m in messages] == [first['id'], second['id']]
+    assert messages[0].message_metadata == {"context": None}
+    assert open(spool_path, encoding='utf-8').read() == ''
+    writer.stop()
+
+
+def test_spool_is_replayed_after_crash(services, tmp_path):
+    """اختبار استعادة الرسائل من spool دون تكرار ما حُفظ"""
+    spool_path = os.path.join(tmp_path, "spool_recover.jsonl")
+    conversation = services.ConversationService.create_conversation(
+        user_id=None, title="recover"
+    )
+
+    # محاكاة انهيار: الرسالة كُتبت في spool ولم تصل إلى قاعدة البيانات
+    crashed = services.MessageWriteBehindQueue(spool_path=spool_path)
+    record = {
+        'id': 'crashed-message',
+        'conversation_id': conversation.id,
+        'sender': 'user',
+        'content': 'رسالة قبل الانهيار',
+        'language': 'ar',
+        'message_metadata': {},
+        'created_at': datetime.utcnow()
+    }
+    crashed._append_to_spool([record, record])
+
+    writer = services.MessageWriteBehindQueue(
+        spool_path=spool_path, flush_interval=0.05
+    )
+    assert writer.recover() == 2
+    assert writer.flush(timeout=5)
+
+    messages = services.MessageService.get_conversation_messages(conversation.id)
+    assert [m.id for m in messages] == ['crashed-message']
+    writer.stop()
+
+
+def test_updated_at_is_per_conversation(services, tmp_path):
+    """اختبار أن كل محادثة في الدفعة تأخذ وقت آخر رسالة فيها فقط"""
+    spool_path = os.path.join(tmp_path, "spool_updated_at.jsonl")
+    writer = services.MessageWriteBehindQueue(
+        spool_path=spool_path, batch_size=2, flush_interval=1
+    )
+    create_conversation = services.ConversationService.create_conversation
+    older = create_conversation(user_id=None, title="older")
+    newer = create_conversation(user_id=None, title="newer")
+
+    first = writer.enqueue(older.id, "user", "أولاً", "en")
+    second = writer.enqueue(newer.id, "user", "ثانياً", "en")
+    assert writer.flush(timeout=5)
+    assert writer.get_stats()['batches'] == 1
+
+    older_conversation = services.ConversationService.get_conversation(older.id)
+    newer_conversation = services.ConversationService.get_conversation(newer.id)
+    assert older_conversation.updated_at == first['created_at']
+    assert newer_conversation.updated_at == second['created_at']
+    writer.stop()
+
+
+def test_bad_record_is_dead_lettered_without_blocking_others(services, tmp_path):
+    """اختبار عزل السجل الفاشل في dead-letter وحفظ بقية الدفعة"""
+    spool_path = os.path.join(tmp_path, "spool_dead.jsonl")
+    dead_letter_path = os.path.join(tmp_path, "dead_letter.jsonl")
+    writer = services.MessageWriteBehindQueue(spool_path=spool_path, batch_size=3,
+                                              flush_interval=0.05,
+                                              dead_letter_path=dead_letter_path,
+                                              max_attempts=1)
+    conversation = services.ConversationService.create_conversation(
+        user_id=None, title="dead-letter"
+    )
+
+    first = writer.enqueue(conversation.id, "user", "قبل", "ar")
+    bad = writer.enqueue(conversation.id, "user", None, "ar")  # content إلزامي
+    last = writer.enqueue(conversation.id, "assistant", "بعد", "ar")
+    assert writer.flush(timeout=5)
+
+    messages = services.MessageService.get_conversation_messages(conversation.id)
+    assert [m.id for m in messages] == [first['id'], last['id']]
+    dead = open(dead_letter_path, encoding='utf-8').read().splitlines()
+    assert len(dead) == 1 and json.loads(dead[0])['id'] == bad['id']
+    assert writer.get_stats()['dead_lettered'] == 1
+    assert open(spool_path, encoding='utf-8').read() == ''
+    writer.stop()
+
+
+def test_spool_compacted_after_each_batch(services, tmp_path):
+    """اختبار حذف السجلات المحفوظة من spool حتى مع وجود رسائل أحدث لم تُحفظ"""
+    spool_path = os.path.join(tmp_path, "spool_compact.jsonl")
+    writer = services.MessageWriteBehindQueue(spool_path=spool_path)
+    saved, waiting = [
+        {'id': message_id, 'conversation_id': 'c', 'sender': 'user', 'content': 'x',
+         'language': 'en', 'message_metadata': {}, 'created_at': datetime.utcnow()}
+        for message_id in ('saved', 'waiting')
+    ]
+    writer._append_to_spool([saved, waiting])
+
+    writer._mark_flushed([saved])
+    lines = open(spool_path, encoding='utf-8').read().splitlines()
+    assert [json.loads(line)['id'] for line in lines] == ['waiting']
+    assert writer.get_stats()['unflushed'] == 1
+
+
+if __name__ == "__main__":
+    print("🧪 بدء اختبار الكتابة المؤجلة للرسائل")
+    services = use_sqlite_database(tempfile.mkdtemp())
+    test_batch_is_flushed_and_spool_truncated(services, tempfile.mkdtemp())
+    test_spool_is_replayed_after_crash(services, tempfile.mkdtemp())
+    test_updated_at_is_per_conversation(services, tempfile.mkdtemp())
+    test_bad_record_is_dead_lettered_without_blocking_others(
+        services, tempfile.mkdtemp()
+    )
+    test_spool_compacted_after_each_batch(services, tempfile.mkdtemp())
+    print("🎉 جميع الاختبارات اكتملت بنجاح!")
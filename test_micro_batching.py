@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+اختبار مجمّع الدفعات الصغيرة - دمج الطلبات المتزامنة في دفعة واحدة
+"""
+
+import sys
+import os
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.nlp.batching import MicroBatcher
+
+
+def test_concurrent_requests_share_a_batch():
+    """اختبار تجميع الطلبات المتزامنة وإعادة كل نتيجة لصاحبها"""
+    seen_batches = []
+
+    def batch_fn(items):
+        seen_batches.append(list(items))
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=100, name="test")
+    results = {}
+
+    def worker(prompt):
+        results[prompt] = batcher.submit(prompt, timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(f"p{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {f"p{i}": f"P{i}" for i in range(4)}
+    assert len(seen_batches) < 4
+    assert batcher.get_stats()['items'] == 4
+    batcher.stop()
+
+
+def test_batch_errors_reach_every_caller():
+    """اختبار وصول خطأ الدفعة إلى جميع الطلبات"""
+    def batch_fn(items):
+        raise RuntimeError("model failure")
+
+    batcher = MicroBatcher(
+        batch_fn, max_batch_size=2, max_wait_ms=1, name="test-errors"
+    )
+    try:
+        batcher.submit("prompt", timeout=5)
+        raise AssertionError("كان يجب رفع الخطأ")
+    except RuntimeError as e:
+        assert str(e) == "model failure"
+    assert batcher.get_stats()['errors'] == 1
+    batcher.stop()
+
+
+def test_timed_out_items_are_dropped():
+    """اختبار إلغاء العناصر المنتهية المهلة حتى لا تدخل التمريرة الأمامية"""
+    seen_items = []
+    release = threading.Event()
+
+    def batch_fn(items):
+        seen_items.extend(items)
+        release.wait(5)
+        return items
+
+    batcher = MicroBatcher(
+        batch_fn, max_batch_size=1, max_wait_ms=1, name="test-cancel"
+    )
+    first = threading.Thread(
+        target=batcher.submit, args=("busy",), kwargs={"timeout": 5}
+    )
+    first.start()
+    try:
+        batcher.submit("abandoned", timeout=0.05)
+        raise AssertionError("كان يجب أن تنتهي المهلة")
+    except FutureTimeoutError:
+        pass
+    release.set()
+    first.join()
+    batcher.stop()
+    assert seen_items == ["busy"]
+
+
+def test_batches_grouped_by_deadline():
+    """اختبار تقسيم الدفعة حسب المهلة حتى لا يقطع العنصر الأقرب انتهاءً توليد البقية"""
+    seen = []
+    lock = threading.Lock()
+
+    def batch_fn(items, max_time=None):
+        with lock:
+            seen.append((sorted(items), max_time))
+        return items
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=100,
+                           name="test-deadline", pass_max_time=True, deadline_bucket=1)
+    results = {}
+
+    def worker(prompt, timeout):
+        results[prompt] = batcher.submit(prompt, timeout=timeout)
+
+    threads = [threading.Thread(target=worker, args=args) for args in
+               [("short", 2), ("short2", 2.5), ("long", 10), ("unbounded", None)]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.stop()
+
+    assert results == {name: name for name in ("short", "short2", "long", "unbounded")}
+    groups = {tuple(items): max_time for items, max_time in seen}
+    assert set(groups) == {("short", "short2"), ("long",), ("unbounded",)}
+    assert 0 < groups[("short", "short2")] <= 2
+    assert 2 < groups[("long",)] <= 10
+    assert groups[("unbounded",)] is None
+
+
+if __name__ == "__main__":
+    print("🧪 بدء اختبار مجمّع الدفعات")
+    test_concurrent_requests_share_a_batch()
+    test_batch_errors_reach_every_caller()
+    test_timed_out_items_are_dropped()
+    test_batches_grouped_by_deadline()
+    print("🎉 جميع الاختبارات اكتملت بنجاح!")
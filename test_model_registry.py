@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+اختبار سجل النماذج الكسول - التحميل عند أول استخدام والتسخين في الخلفية
+"""
+
+import sys
+import os
+import threading
+import time
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.nlp.model_registry import LazyModelRegistry, parse_language_models
+
+
+def test_model_loaded_once_on_first_use():
+    """اختبار تحميل النموذج مرة واحدة للطلبات المتزامنة"""
+    registry = LazyModelRegistry()
+    loads = []
+
+    def load():
+        loads.append(1)
+        time.sleep(0.05)
+        return "model"
+
+    registry.register("t5", load)
+    assert registry.get_status()["t5"]["state"] == "not_loaded"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("t5")))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["model"] * 5
+    assert len(loads) == 1
+    assert registry.is_ready("t5")
+
+
+def test_failed_load_is_reported_and_retried():
+    """اختبار تقرير فشل التحميل وإعادة المحاولة بعد المهلة"""
+    registry = LazyModelRegistry(retry_interval=0.05)
+    attempts = []
+
+    def load():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("download failed")
+        return "model"
+
+    registry.register("ner", load)
+
+    assert registry.get("ner") is None
+    assert registry.get("ner") is None  # لا إعادة محاولة قبل انتهاء المهلة
+    status = registry.get_status()["ner"]
+    assert status["state"] == "failed"
+    assert "download failed" in status["error"]
+
+    time.sleep(0.06)
+    assert registry.get("ner") == "model"
+    assert len(attempts) == 2
+
+
+def test_warm_up_loads_selected_models_only():
+    """اختبار تسخين النماذج المحددة فقط في الخلفية"""
+    registry = LazyModelRegistry()
+    registry.register("t5", lambda: "t5")
+    registry.register("summarization", lambda: "bart")
+
+    registry.warm_up("t5, unknown").join(timeout=5)
+
+    status = registry.get_status()
+    assert status["t5"]["state"] == "ready"
+    assert status["summarization"]["state"] == "not_loaded"
+
+
+def test_parse_language_models():
+    """اختبار قراءة نماذج كل لغة من الإعدادات"""
+    models = parse_language_models(
+        "ar:CAMeL-Lab/bert-base-arabic-camelbert-mix-ner, fr:org/model,"
+    )
+    assert models == {
+        "ar": "CAMeL-Lab/bert-base-arabic-camelbert-mix-ner",
+        "fr": "org/model",
+    }
+    assert parse_language_models("") == {}
+
+
+if __name__ == "__main__":
+    print("🧪 بدء اختبار سجل النماذج الكسول")
+    test_model_loaded_once_on_first_use()
+    test_failed_load_is_reported_and_retried()
+    test_warm_up_loads_selected_models_only()
+    test_parse_language_models()
+    print("🎉 جميع الاختبارات اكتملت بنجاح!")
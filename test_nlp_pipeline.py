@@ -84,6 +84,30 @@ def test_multilingual():
             print("❌ كشف اللغة فشل")
         print()
 
+def test_batch_processing():
+    """اختبار معالجة مجموعة نصوص في دفعات"""
+    print("📦 اختبار المعالجة في دفعات...")
+    
+    nlp = NLPPipeline()
+    
+    texts = [
+        "مرحباً بك في نظام BoAI",
+        "Welcome to BoAI system in London",
+        "أحمد يتعلم البرمجة في القاهرة",
+        "Bienvenue dans le système BoAI"
+    ]
+    
+    results = list(
+        nlp.process_texts(texts, operations=['tokenize', 'ner'], batch_size=3)
+    )
+    
+    # النتائج بنفس ترتيب المدخلات
+    assert [result['original_text'] for result in results] == texts
+    for result in results:
+        print(f"النص ({result['language']}): {result['original_text']}")
+        print(f"الكيانات: {result['entities']}")
+        print()
+
 if __name__ == "__main__":
     print("🧪 بدء اختبار نظام المعالجة اللغوية المحسن")
     print("=" * 60)
@@ -92,6 +116,7 @@ if __name__ == "__main__":
         test_translation()
         test_response_generation()
         test_multilingual()
+        test_batch_processing()
         
         print("🎉 جميع الاختبارات اكتملت بنجاح!")
         
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+اختبار واجهة ONNX - اكتشاف النسخ المصدّرة في مجلد النماذج
+"""
+
+import sys
+import os
+import tempfile
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.models.model_manager import ModelManager
+from src.core.nlp.onnx_backend import ONNX_AVAILABLE, ort_model_class
+
+
+def test_onnx_path_uses_latest_exported_version():
+    """اختبار إيجاد مجلد onnx لأحدث إصدار فقط إذا احتوى على رسوم"""
+    with tempfile.TemporaryDirectory() as directory:
+        manager = ModelManager(directory)
+        assert manager.get_onnx_path("t5") is None
+
+        os.makedirs(os.path.join(directory, "t5", "v1.0", "onnx"))
+        onnx_dir = os.path.join(directory, "t5", "v1.0", "onnx")
+        open(os.path.join(onnx_dir, "encoder_model.onnx"), "w").close()
+        assert str(manager.get_onnx_path("t5")).endswith(
+            os.path.join("t5", "v1.0", "onnx")
+        )
+
+        # إصدار أحدث بدون تصدير: لا يُستخدم إصدار قديم بصمت
+        os.makedirs(os.path.join(directory, "t5", "v2.0", "onnx"))
+        assert manager.get_onnx_path("t5") is None
+        assert manager.get_onnx_path("t5", "v1.0") is not None
+
+
+def test_unavailable_runtime_is_reported():
+    """اختبار رسالة واضحة عند غياب ONNX Runtime أو المهمة"""
+    try:
+        ort_model_class("text-classification")
+    except (RuntimeError, ValueError) as e:
+        expected = ValueError if ONNX_AVAILABLE else RuntimeError
+        assert isinstance(e, expected)
+    else:
+        assert False, "يجب رفع خطأ"
+
+
+if __name__ == "__main__":
+    print("🧪 بدء اختبار واجهة ONNX")
+    test_onnx_path_uses_latest_exported_version()
+    test_unavailable_runtime_is_reported()
+    print("🎉 جميع الاختبارات اكتملت بنجاح!")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+اختبار ذاكرة الردود المؤقتة - المطابقة التامة وشبه المتطابقة والإبطال
+"""
+
+import sys
+import os
+import tempfile
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.utils.cache import CacheManager
+from src.core.models.model_manager import ModelManager
+from src.core.nlp.response_cache import GENERATION_KEY, ResponseCache
+
+
+def _make_cache(**kwargs):
+    """إنشاء ذاكرة ردود بتخزين مستقل"""
+    cache = ResponseCache(cache=CacheManager(), **kwargs)
+    cache.enabled = True
+    return cache
+
+
+def test_normalized_prompts_share_an_entry():
+    """اختبار تطابق الأسئلة بعد التطبيع"""
+    cache = _make_cache(semantic_enabled=False)
+    cache.set("How do I start learning Python?", None, "en", "Start with the basics.")
+
+    messy_prompt = "  how do i start   learning python "
+    assert cache.get(messy_prompt, None, "en") == "Start with the basics."
+    assert cache.get("How do I start learning Python?", None, "ar") is None
+    assert cache.get("How do I start learning Python?", "web context", "en") is None
+
+
+def test_near_duplicates_match_above_threshold():
+    """اختبار مطابقة الأسئلة شبه المتطابقة"""
+    cache = _make_cache(semantic_enabled=True, similarity_threshold=0.8)
+    cache.set("how do i start learning python", None, "en", "Start with the basics.")
+
+    similar_prompt = "how can i start learning python"
+    assert cache.get(similar_prompt, None, "en") == "Start with the basics."
+    assert cache.get("what is a linked list", None, "en") is None
+    assert cache.get_stats()['semantic_hits'] == 1
+
+
+def test_model_version_switch_invalidates():
+    """اختبار الإبطال عند تبديل ModelManager لإصدار النموذج"""
+    cache = _make_cache(semantic_enabled=False)
+    manager = ModelManager(tempfile.mkdtemp())
+    cache.bind_model_manager(manager, model_name="tutor")
+
+    cache.set("what is python", None, "en", "A language.")
+    manager._notify_version_change("tutor", cache.model_version, "v2.0")
+
+    assert cache.model_version == "v2.0"
+    assert cache.get("what is python", None, "en") is None
+
+
+def test_generation_read_once_per_ttl():
+    """اختبار قراءة جيل الإبطال مرة واحدة خلال مدته المحلية"""
+    cache = _make_cache(semantic_enabled=False, generation_ttl=60)
+    reads = []
+    original_get = cache.cache.get
+
+    def counting_get(key, default=None):
+        if key == GENERATION_KEY:
+            reads.append(key)
+        return original_get(key, default)
+
+    cache.cache.get = counting_get
+    cache.set("what is python", None, "en", "A language.")
+    for _ in range(3):
+        assert cache.get("what is python", None, "en") == "A language."
+    assert len(reads) == 1
+
+    # الإبطال المحلي يحدّث الجيل فوراً دون انتظار انتهاء المدة
+    cache.invalidate()
+    reads.clear()
+    assert cache.get("what is python", None, "en") is None
+    assert reads == []
+
+
+if __name__ == "__main__":
+    print("🧪 بدء اختبار ذاكرة الردود المؤقتة")
+    test_normalized_prompts_share_an_entry()
+    test_near_duplicates_match_above_threshold()
+    test_model_version_switch_invalidates()
+    test_generation_read_once_per_ttl()
+    print("🎉 جميع الاختبارات اكتملت بنجاح!")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+اختبار دمج الطلبات المتطابقة الجارية (single-flight)
+"""
+
+import sys
+import os
+import threading
+import time
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.utils.cache import CacheManager
+from src.core.utils.singleflight import SingleFlight
+
+
+def _run_concurrently(functions):
+    """تشغيل الدوال في خيوط متزامنة وإرجاع نتائجها"""
+    results = [None] * len(functions)
+
+    def runner(index, function):
+        results[index] = function()
+
+    threads = [
+        threading.Thread(target=runner, args=(i, f)) for i, f in enumerate(functions)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_identical_requests_share_one_computation():
+    """اختبار تنفيذ الحساب مرة واحدة لطلبات متطابقة داخل العامل"""
+    flight = SingleFlight(cache=CacheManager())
+    flight.enabled = True
+    calls = []
+
+    def generate():
+        calls.append(1)
+        time.sleep(0.1)
+        return "answer"
+
+    results = _run_concurrently([lambda: flight.do("same", generate)] * 10)
+
+    assert results == ["answer"] * 10
+    assert len(calls) == 1
+    assert flight.get_stats()['shared_local'] == 9
+
+
+def test_workers_share_through_distributed_lock():
+    """اختبار مشاركة النتيجة بين عاملين عبر القفل الموزع"""
+    shared_cache = CacheManager()
+    # محاكاة Redis مشترك: الأقفال والنتائج تمر عبر نفس التخزين
+    shared_cache.redis_client = None
+    shared_cache.use_redis = True
+    workers = [SingleFlight(cache=shared_cache, poll_interval=0.01) for _ in range(2)]
+    calls = []
+
+    def generate():
+        calls.append(1)
+        time.sleep(0.1)
+        return "answer"
+
+    for worker in workers:
+        worker.enabled = True
+
+    results = _run_concurrently([lambda w=w: w.do("same", generate) for w in workers])
+
+    assert results == ["answer", "answer"]
+    assert len(calls) == 1
+
+
+def test_local_follower_stops_waiting_for_hung_leader():
+    """اختبار حساب النتيجة محلياً إذا تجاوز الطلب الجاري مهلة الانتظار"""
+    flight = SingleFlight(cache=CacheManager(), wait_timeout=0.05)
+    flight.enabled = True
+    release = threading.Event()
+
+    leader = threading.Thread(target=flight.do, args=("same", lambda: release.wait(5)))
+    leader.start()
+    time.sleep(0.02)
+
+    started = time.monotonic()
+    assert flight.do("same", lambda: "local") == "local"
+    assert time.monotonic() - started < 1
+    release.set()
+    leader.join()
+
+
+def _shared_cache():
+    """تخزين مشترك يحاكي Redis بين العمال"""
+    cache = CacheManager()
+    cache.redis_client = None
+    cache.use_redis = True
+    return cache
+
+
+def test_lock_winner_ignores_earlier_results():
+    """اختبار أن الفائز بالقفل يحسب النتيجة ولا يعيد نتيجة طلب سابق غير متزامن"""
+    cache = _shared_cache()
+    flight = SingleFlight(cache=cache)
+    flight.enabled = True
+    cache.set("singleflight:result:same", "stale", 60)
+
+    assert flight.do("same", lambda: "fresh") == "fresh"
+
+
+def test_unshareable_results_not_published():
+    """اختبار عدم نشر النتائج غير القابلة للمشاركة (مثل الرد البديل)"""
+    cache = _shared_cache()
+    flight = SingleFlight(cache=cache)
+    flight.enabled = True
+
+    flight.do("fallback", lambda: {"tier": "fallback"},
+              shareable=lambda result: result["tier"] != "fallback")
+    flight.do("model", lambda: {"tier": "t5"},
+              shareable=lambda result: result["tier"] != "fallback")
+
+    assert cache.get("singleflight:result:fallback") is None
+    assert cache.get("singleflight:result:model") == {"tier": "t5"}
+
+
+def test_wait_bounded_by_caller_deadline():
+    """اختبار أن انتظار الطلب المطابق لا يتجاوز الوقت المتبقي للمستدعي"""
+    flight = SingleFlight(cache=CacheManager(), wait_timeout=30)
+    flight.enabled = True
+    release = threading.Event()
+
+    leader = threading.Thread(target=flight.do, args=("same", lambda: release.wait(5)))
+    leader.start()
+    time.sleep(0.02)
+
+    started = time.monotonic()
+    assert flight.do("same", lambda: "local", timeout=0.05) == "local"
+    assert time.monotonic() - started < 1
+    release.set()
+    leader.join()
+
+
+if __name__ == "__main__":
+    print("🧪 بدء اختبار دمج الطلبات المتطابقة")
+    test_identical_requests_share_one_computation()
+    test_workers_share_through_distributed_lock()
+    test_local_follower_stops_waiting_for_hung_leader()
+    test_lock_winner_ignores_earlier_results()
+    test_unshareable_results_not_published()
+    test_wait_bounded_by_caller_deadline()
+    print("🎉 جميع الاختبارات اكتملت بنجاح!")
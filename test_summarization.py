@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+اختبار التلخيص المجزأ - التقسيم عند حدود الجمل وتخزين ملخصات الأجزاء
+"""
+
+import sys
+import os
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.nlp.summarization import (
+    ChunkedSummarizer, chunk_text, model_key, split_sentences
+)
+from src.core.utils.cache import CacheManager
+
+
+def count_words(text):
+    """عد الرموز بعدد الكلمات"""
+    return len(text.split())
+
+
+def make_summarizer(calls, chunk_tokens=10):
+    """ملخص وهمي يعيد أول كلمتين من كل نص ويسجل الدفعات"""
+    cache = CacheManager()
+    cache.redis_client = None
+
+    def summarize_batch(texts):
+        calls.append(list(texts))
+        return [" ".join(text.split()[:2]) for text in texts]
+
+    return ChunkedSummarizer(summarize_batch, count_words, model_key="fake",
+                             chunk_tokens=chunk_tokens, cache=cache, cache_ttl=60)
+
+
+def test_split_sentences():
+    """اختبار التقسيم بعلامات الترقيم العربية واللاتينية"""
+    text = "مرحبا بك. كيف حالك؟ Fine thanks!\nNew line"
+    assert split_sentences(text) == [
+        "مرحبا بك.", "كيف حالك؟", "Fine thanks!", "New line"
+    ]
+
+
+def test_chunks_respect_token_budget():
+    """اختبار عدم تجاوز الأجزاء لميزانية الرموز"""
+    text = "one two three. four five six. seven eight. " + " ".join(["long"] * 12) + "."
+    chunks = chunk_text(text, 6, count_words)
+    assert chunks[0] == "one two three. four five six."
+    assert all(count_words(chunk) <= 6 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_map_reduce_batches_chunks():
+    """اختبار تلخيص الأجزاء في دفعة واحدة ثم تلخيص الملخصات"""
+    calls = []
+    summarizer = make_summarizer(calls)
+    text = " ".join(f"sentence number {i} has words." for i in range(6))
+
+    assert summarizer.needs_chunking(text)
+    summary = summarizer.summarize(text)
+
+    assert len(calls) == 2
+    assert len(calls[0]) == 3  # map: كل الأجزاء في تمريرة واحدة
+    assert len(calls[1]) == 1  # reduce
+    assert summary == "sentence number"
+
+
+def test_edited_text_recomputes_changed_chunks_only():
+    """اختبار إعادة تلخيص الأجزاء المعدلة فقط"""
+    calls = []
+    summarizer = make_summarizer(calls)
+    sentences = [f"sentence number {i} has words." for i in range(6)]
+    summarizer.summarize(" ".join(sentences))
+
+    calls.clear()
+    sentences[-1] = "edited last sentence here."
+    summarizer.summarize(" ".join(sentences))
+
+    assert len(calls[0]) == 1
+    assert calls[0][0].endswith("edited last sentence here.")
+    assert summarizer.get_stats()['cached_chunks'] >= 2
+
+
+def test_model_key_without_name_or_path():
+    """نموذج ONNX بلا name_or_path يستخدم اسم الإعدادات"""
+    class Config:
+        _name_or_path = "facebook/bart-large-cnn"
+
+    class OnnxModel:
+        config = Config()
+
+    class BareModel:
+        pass
+
+    class Pipeline:
+        def __init__(self, model):
+            self.model = model
+
+    assert model_key(Pipeline(OnnxModel())) == "facebook/bart-large-cnn"
+    assert model_key(Pipeline(BareModel())) == "BareModel"
+
+
+if __name__ == "__main__":
+    print("🧪 بدء اختبار التلخيص المجزأ")
+    test_split_sentences()
+    test_chunks_respect_token_budget()
+    test_map_reduce_batches_chunks()
+    test_edited_text_recomputes_changed_chunks_only()
+    test_model_key_without_name_or_path()
+    print("🎉 جميع الاختبارات اكتملت بنجاح!")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+اختبار عميل الترجمة باستخدام خادم Translate v2 محلي بديل
+
+يمكن تشغيل الخادم البديل كخادم حقيقي ثم توجيه التطبيق إليه:
+    uvicorn test_translation_client:stub_app --port 9000
+    TRANSLATION_API_BASE_URL=http://localhost:9000/language/translate/v2
+"""
+
+import sys
+import os
+import asyncio
+from urllib.parse import parse_qsl
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.nlp.translation_client import GoogleTranslateClient, TranslationAPIError
+
+STUB_URL = "http://translate.stub/language/translate/v2"
+
+# خادم Translate v2 بديل: يعيد النص بأحرف كبيرة مع لغة الهدف
+stub_app = FastAPI()
+stub_state = {'requests': 0, 'fail_next': 0}
+
+
+@stub_app.post("/language/translate/v2")
+async def stub_translate(request: Request):
+    stub_state['requests'] += 1
+    if stub_state['fail_next'] > 0:
+        stub_state['fail_next'] -= 1
+        return JSONResponse({"error": "rate limited"}, status_code=429)
+
+    params = parse_qsl((await request.body()).decode('utf-8'))
+    texts = [value for key, value in params if key == 'q']
+    target = dict(params)['target']
+    return {"data": {"translations": [
+        {"translatedText": f"[{target}] {text.upper()}"} for text in texts
+    ]}}
+
+
+def _client(**kwargs) -> GoogleTranslateClient:
+    stub_state.update(requests=0, fail_next=0)
+    return GoogleTranslateClient(
+        api_key="test-key",
+        base_url=STUB_URL,
+        backoff=0,
+        transport=httpx.ASGITransport(app=stub_app),
+        **kwargs
+    )
+
+
+def test_texts_are_batched_into_few_requests():
+    """اختبار تجميع النصوص في طلبات متعددة الـ q"""
+    client = _client(max_batch_size=3)
+    texts = [f"text {i}" for i in range(7)]
+
+    async def scenario():
+        try:
+            return await client.translate_batch(texts, "en", "ar")
+        finally:
+            await client.aclose()
+
+    translations = asyncio.run(scenario())
+
+    assert translations == [f"[ar] TEXT {i}" for i in range(7)]
+    assert stub_state['requests'] == 3
+    assert client.get_stats()['texts'] == 7
+
+
+def test_retries_with_backoff_then_fails():
+    """اختبار إعادة المحاولة عند 429 ثم الفشل بعد استنفاد المحاولات"""
+    client = _client(max_retries=2)
+
+    async def scenario():
+        try:
+            stub_state['fail_next'] = 2
+            assert await client.translate("hello", "en", "fr") == "[fr] HELLO"
+
+            stub_state['fail_next'] = 5
+            try:
+                await client.translate("hello", "en", "fr")
+                raise AssertionError("كان يجب أن يفشل الطلب")
+            except TranslationAPIError:
+                pass
+        finally:
+            await client.aclose()
+
+    asyncio.run(scenario())
+    stats = client.get_stats()
+    assert stats['retries'] == 4
+    assert stats['failures'] == 1
+
+
+def test_retry_after_is_capped_by_timeout():
+    """اختبار أن Retry-After الكبير لا يتجاوز مهلة الطلب"""
+    client = _client(timeout=2)
+    response = httpx.Response(429, headers={"Retry-After": "3600"})
+    assert client._retry_delay(0, response) == 2
+    response = httpx.Response(429, headers={"Retry-After": "1"})
+    assert client._retry_delay(0, response) == 1
+
+
+if __name__ == "__main__":
+    print("🧪 بدء اختبار عميل الترجمة")
+    test_texts_are_batched_into_few_requests()
+    test_retries_with_backoff_then_fails()
+    test_retry_after_is_capped_by_timeout()
+    print("🎉 جميع الاختبارات اكتملت بنجاح!")
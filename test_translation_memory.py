@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+اختبار ذاكرة الترجمة - المستوى المحلي والمستوى الثاني والتعبئة المسبقة
+"""
+
+import sys
+import os
+import tempfile
+
+# إضافة مسار src إلى sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.core.utils.cache import CacheManager
+from src.core.nlp.translation_memory import TranslationMemory
+
+
+def _sqlite_memory(path, l1_size=100):
+    memory = TranslationMemory(cache=CacheManager(), l1_size=l1_size,
+                               backend='sqlite', sqlite_path=path)
+    memory.enabled = True
+    return memory
+
+
+def test_translation_survives_restart_through_sqlite():
+    """اختبار بقاء الترجمة في SQLite بعد إعادة إنشاء الذاكرة"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "translations.db")
+
+        memory = _sqlite_memory(path)
+        assert memory.get("مرحبا", "ar", "en") is None
+        assert memory.set("مرحبا", "ar", "en", "Hello")
+        assert memory.get("مرحبا", "ar", "en") == "Hello"
+        assert memory.get_stats()['l1_hits'] == 1
+
+        restarted = _sqlite_memory(path)
+        assert restarted.get("مرحبا", "ar", "en") == "Hello"
+        # اتجاه الترجمة جزء من المفتاح
+        assert restarted.get("مرحبا", "en", "ar") is None
+
+        stats = restarted.get_stats()
+        assert stats['l2_hits'] == 1
+        assert stats['misses'] == 1
+
+
+def test_l1_is_bounded_and_backed_by_redis_store():
+    """اختبار حدود المستوى الأول والرجوع إلى مخزن Redis"""
+    memory = TranslationMemory(cache=CacheManager(), l1_size=2, backend='redis')
+    memory.enabled = True
+
+    stored = memory.preseed([
+        ("واحد", "ar", "en", "one"),
+        ("اثنان", "ar", "en", "two"),
+        ("ثلاثة", "ar", "en", "three"),
+        ("", "ar", "en", "ignored"),
+    ])
+
+    assert stored == 3
+    assert memory.get_stats()['l1_size'] == 2
+    # أقدم عنصر خرج من المستوى الأول لكنه ما زال في المستوى الثاني
+    assert memory.get("واحد", "ar", "en") == "one"
+    assert memory.get_stats()['l2_hits'] == 1
+
+
+def test_get_many_reads_l1_and_second_level_together():
+    """اختبار البحث عن عدة ترجمات من المستويين بنفس الترتيب"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "translations.db")
+        _sqlite_memory(path).preseed([
+            ("واحد", "ar", "en", "one"),
+            ("اثنان", "ar", "en", "two"),
+        ])
+
+        memory = _sqlite_memory(path)
+        assert memory.get("واحد", "ar", "en") == "one"
+        assert memory.get_many(["اثنان", "ثلاثة", "واحد"], "ar", "en") == [
+            "two", None, "one"
+        ]
+
+        stats = memory.get_stats()
+        assert stats['l1_hits'] == 1 and stats['l2_hits'] == 2 and stats['misses'] == 1
+
+
+if __name__ == "__main__":
+    print("🧪 بدء اختبار ذاكرة الترجمة")
+    test_translation_survives_restart_through_sqlite()
+    test_l1_is_bounded_and_backed_by_redis_store()
+    test_get_many_reads_l1_and_second_level_together()
+    print("🎉 جميع الاختبارات اكتملت بنجاح!")